@@ -0,0 +1,194 @@
+"""
+Cold-start benchmark for the Lambda handlers.
+
+Each handler is measured in a fresh interpreter: the time to import its
+module, then the time of its first invocation with a representative event.
+AWS is stubbed through aws_clients.set_factory, so no credentials or network
+are needed. Building a real boto3 client costs tens of milliseconds; pass
+--client-cost-ms to charge that per client built, which shows what lazy
+construction saves on each path.
+
+Usage: python3 benchmarks/cold_start_bench.py [--runs N] [--client-cost-ms MS] [handler ...]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+LAMBDAS_DIR = os.path.join(ROOT, 'src', 'lambdas')
+LAYER_DIR = os.path.join(ROOT, 'src', 'layers', 'common', 'python')
+
+ENV = {
+    'TABLE_NAME': 'incidents',
+    'LOGS_BUCKET': 'logs',
+    'KNOWLEDGE_BASE_BUCKET': 'kb',
+    'STATE_MACHINE_ARN': 'arn:aws:states:us-east-1:123456789012:stateMachine:bench',
+    'FINGERPRINT_TABLE_NAME': 'fingerprints',
+    'APPROVALS_TABLE_NAME': 'approvals',
+    'AUDIT_TABLE_NAME': 'audit',
+    'AUTOMATION_TASKS_TABLE_NAME': 'automation-tasks',
+    'LEASE_TABLE_NAME': 'leases',
+    'CONNECTIONS_TABLE_NAME': 'live-connections',
+    'ALARM_STATS_TABLE_NAME': 'alarm-stats',
+    'SLACK_WEBHOOK_URL': 'http://127.0.0.1:9/webhook',
+    'SLACK_OUTBOX_QUEUE_URL': 'https://sqs.us-east-1.amazonaws.com/123456789012/slack-outbox',
+    'AWS_DEFAULT_REGION': 'us-east-1',
+}
+
+ALARM_EVENT = {
+    'account': '123456789012',
+    'detail': {
+        'alarmName': 'HighCPU-web',
+        'state': {'value': 'ALARM', 'reason': 'Threshold crossed', 'timestamp': '2024-01-01T00:00:00.000+0000'},
+        'configuration': {'metrics': [{'metricStat': {'metric': {'dimensions': {'InstanceId': 'i-0123'}}}}]}
+    }
+}
+
+# Representative first event per handler
+EVENTS = {
+    'detector': {'Records': [{'messageId': 'm1', 'body': json.dumps(ALARM_EVENT)}]},
+    'analyzer': {'incident_id': 'inc-1', 'timestamp': '2024-01-01T00:00:00.000+0000',
+                 'alarm_name': 'HighCPU-web', 'action': 'verify'},
+    'healer': {'incident_id': 'inc-1', 'timestamp': '2024-01-01T00:00:00.000+0000',
+               'analysis': {'recommended_action': 'CLEAR_CACHE'}, 'action_type': 'PRIMARY'},
+    'notifier': {'incident_id': 'inc-1', 'status': 'SUCCESS', 'details': {}, 'analysis': {}},
+    'cost_estimator': {'analysis': {'recommended_action': 'SCALE_UP'}, 'alarm_name': 'HighCPU-web'},
+    'send_approval_request': {'taskToken': 't', 'incident_id': 'inc-1', 'analysis': {}, 'risk_assessment': {}},
+    'approval_handler': {'queryStringParameters': {'taskToken': 't', 'action': 'APPROVE'}},
+    'frontend_approval_handler': {'requestContext': {'http': {'method': 'GET'}},
+                                  'pathParameters': {'approvalId': 'a-1'}},
+    'slack_action_handler': {'headers': {}, 'body': ''},
+    'automation_completion_handler': {'detail': {'ExecutionId': 'e-1', 'Status': 'Success'}},
+    'incident_history': {'routeKey': 'GET /incidents', 'queryStringParameters': {'alarm_name': 'HighCPU-web'}},
+    'live_updates': {'Records': [{'eventName': 'MODIFY', 'dynamodb': {'NewImage': {
+        'incident_id': {'S': 'inc-1'}, 'timestamp': {'S': '2024-01-01T00:00:00'}, 'healing_status': {'S': 'SUCCESS'}}}}]},
+}
+
+# Runs inside the child interpreter
+CHILD = r'''
+import json, sys, time
+spec = json.loads(sys.argv[1])
+sys.path[:0] = [spec['lambda_dir'], spec['layer_dir']]
+
+import aws_clients
+
+built = []
+
+class StubError(Exception):
+    pass
+
+class StubExceptions:
+    def __getattr__(self, name):
+        return StubError
+
+class StubTable:
+    def __getattr__(self, operation):
+        return lambda *args, **kwargs: {'Attributes': {}, 'Items': []}
+
+class Stub:
+    def __init__(self, kind, service_name):
+        self.kind, self.service_name = kind, service_name
+        self.exceptions = StubExceptions()
+
+    def Table(self, name):
+        return StubTable()
+
+    @property
+    def meta(self):
+        return self
+
+    @property
+    def client(self):
+        return self
+
+    def __getattr__(self, operation):
+        return lambda *args, **kwargs: spec['responses'].get(f"{self.service_name}.{operation}", {})
+
+def factory(kind, service_name):
+    time.sleep(spec['client_cost_ms'] / 1000.0)
+    built.append(f"{kind}:{service_name}")
+    return Stub(kind, service_name)
+
+aws_clients.set_factory(factory)
+
+class Context:
+    def get_remaining_time_in_millis(self):
+        return 60000
+
+result = {'built': built}
+started = time.perf_counter()
+try:
+    import handler
+except Exception as e:
+    result['error'] = f"import: {type(e).__name__}: {e}"
+    print(json.dumps(result))
+    sys.exit(0)
+result['import_ms'] = (time.perf_counter() - started) * 1000
+result['built_at_import'] = len(built)
+
+started = time.perf_counter()
+try:
+    handler.handler(spec['event'], Context())
+except Exception as e:
+    result['invoke_error'] = f"{type(e).__name__}: {e}"
+result['invoke_ms'] = (time.perf_counter() - started) * 1000
+print(json.dumps(result))
+'''
+
+RESPONSES = {
+    'cloudwatch.describe_alarms': {'MetricAlarms': []},
+    'stepfunctions.start_execution': {'executionArn': 'arn:aws:states:us-east-1:123456789012:execution:bench:1'},
+}
+
+
+def measure(name, client_cost_ms):
+    spec = {
+        'lambda_dir': os.path.join(LAMBDAS_DIR, name),
+        'layer_dir': LAYER_DIR,
+        'event': EVENTS.get(name, {}),
+        'client_cost_ms': client_cost_ms,
+        'responses': RESPONSES,
+    }
+    env = dict(os.environ, **ENV)
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD, json.dumps(spec)],
+        cwd=spec['lambda_dir'], env=env, capture_output=True, text=True
+    )
+    lines = output.stdout.strip().splitlines()
+    if not lines:
+        return {'error': output.stderr.strip().splitlines()[-1] if output.stderr.strip() else 'no output'}
+    return json.loads(lines[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('handlers', nargs='*', help='handlers to measure (default: all)')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--client-cost-ms', type=float, default=0.0,
+                        help='simulated cost of building one AWS client')
+    args = parser.parse_args()
+
+    names = args.handlers or sorted(
+        d for d in os.listdir(LAMBDAS_DIR) if os.path.exists(os.path.join(LAMBDAS_DIR, d, 'handler.py'))
+    )
+
+    print(f"{'handler':32} {'import ms':>10} {'invoke ms':>10} {'total ms':>10}  clients (import/total)  notes")
+    for name in names:
+        runs = [measure(name, args.client_cost_ms) for _ in range(args.runs)]
+        ok = [r for r in runs if 'import_ms' in r]
+        if not ok:
+            print(f"{name:32} {'-':>10} {'-':>10} {'-':>10}  {'-':22}  {runs[0].get('error')}")
+            continue
+        import_ms = statistics.median(r['import_ms'] for r in ok)
+        invoke_ms = statistics.median(r['invoke_ms'] for r in ok)
+        last = ok[-1]
+        clients = f"{last['built_at_import']}/{len(last['built'])}"
+        note = last.get('invoke_error', '')
+        print(f"{name:32} {import_ms:10.1f} {invoke_ms:10.1f} {import_ms + invoke_ms:10.1f}  {clients:22}  {note}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+Throughput benchmark for Slack delivery during an alarm storm.
+
+Replays a burst of notifications against tools/fake_slack_webhook.py, first
+the old way (one immediate POST per event, errors logged and dropped), then
+through slack_delivery's coalescing and token-bucket code, with SQS simulated
+as a list of batches and throttled messages requeued as the Lambda would.
+
+Usage: python3 benchmarks/slack_delivery_bench.py [--events N] [--incidents N] [--rate R] [--burst B]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path[:0] = [os.path.join(ROOT, 'src', 'lambdas', 'slack_delivery'), os.path.join(ROOT, 'tools')]
+
+from delivery import SENT, THROTTLED, SlackDelivery, coalesce  # noqa: E402
+from fake_slack_webhook import FakeSlack, serve  # noqa: E402
+
+
+def post(url, message):
+    request = urllib.request.Request(url, data=json.dumps(message).encode('utf-8'),
+                                     headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, {k.lower(): v for k, v in response.headers.items()}
+    except urllib.error.HTTPError as e:
+        return e.code, {k.lower(): v for k, v in e.headers.items()}
+
+
+def make_events(count, incidents):
+    events = []
+    for i in range(count):
+        incident_id = f"inc-{random.randrange(incidents)}"
+        kind = 'approval' if random.random() < 0.1 else 'notification'
+        events.append((f"m{i}", {
+            'incident_id': incident_id,
+            'kind': kind,
+            'webhook': 'default',
+            'message': {'blocks': [
+                {'type': 'header', 'text': {'type': 'plain_text', 'text': f"{kind} {i}: {incident_id}"}},
+                {'type': 'section', 'text': {'type': 'mrkdwn', 'text': '*Status:*\nHEALED'}}
+            ]}
+        }))
+    return events
+
+
+def run_direct(url, events):
+    delivered = 0
+    for _, body in events:
+        status, _ = post(url, body['message'])
+        delivered += status == 200
+    return delivered
+
+
+def run_outbox(url, events, rate, burst, batch_size, invocation_seconds):
+    slack = SlackDelivery(post, rate=rate, burst=burst)
+    queue = list(events)
+    delivered = invocations = 0
+    while queue:
+        batch, queue = queue[:batch_size], queue[batch_size:]
+        invocations += 1
+        deadline = time.monotonic() + invocation_seconds
+        deliveries = coalesce(batch)
+        for position, (ids, webhook, message) in enumerate(deliveries):
+            outcome, retry_after = slack.deliver(url, message, deadline)
+            if outcome == SENT:
+                delivered += len(ids)
+            elif outcome == THROTTLED:
+                # Back on the queue, as the Lambda's batchItemFailures would do
+                pending = {i for ids_, _, _ in deliveries[position:] for i in ids_}
+                queue = [entry for entry in batch if entry[0] in pending] + queue
+                break
+    return delivered, invocations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--events', type=int, default=200)
+    parser.add_argument('--incidents', type=int, default=15)
+    parser.add_argument('--rate', type=float, default=10.0, help='fake Slack posts per second')
+    parser.add_argument('--burst', type=int, default=5)
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--invocation-seconds', type=float, default=5.0)
+    args = parser.parse_args()
+
+    random.seed(7)
+    events = make_events(args.events, args.incidents)
+    fake = FakeSlack(rate=args.rate, burst=args.burst, retry_after=1)
+    server, base_url = serve(fake)
+    url = f"{base_url}/services/fake"
+
+    print(f"{args.events} events over {args.incidents} incidents; fake Slack allows {args.rate}/s (burst {args.burst})")
+    print(f"{'mode':10} {'delivered':>10} {'posts':>7} {'429s':>6} {'seconds':>8}")
+
+    started = time.perf_counter()
+    delivered = run_direct(url, events)
+    stats = fake.snapshot()
+    print(f"{'direct':10} {delivered:>10} {stats['accepted']:>7} {stats['throttled']:>6} {time.perf_counter() - started:8.2f}")
+
+    time.sleep(args.burst / args.rate)
+    fake.reset()
+    started = time.perf_counter()
+    delivered, invocations = run_outbox(url, events, args.rate, args.burst, args.batch_size, args.invocation_seconds)
+    stats = fake.snapshot()
+    print(f"{'outbox':10} {delivered:>10} {stats['accepted']:>7} {stats['throttled']:>6} {time.perf_counter() - started:8.2f}"
+          f"  ({invocations} invocations)")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
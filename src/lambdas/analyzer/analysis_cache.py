@@ -0,0 +1,99 @@
+import hashlib
+import json
+import logging
+import time
+
+from log_templates import normalize_message
+
+logger = logging.getLogger()
+
+# Where the model's own confidence lives for each analysis type.
+# Types without one (PREDICTIVE) are not gated by the confidence floor.
+CONFIDENCE_FIELDS = {
+    'ROOT_CAUSE': ('confidence',),
+    'RE_ANALYSIS': ('resolution_confidence',),
+    'COMBINED': ('root_cause_analysis', 'confidence')
+}
+
+
+def log_signature(logs):
+    """
+    Order-independent hash of the distinct normalized log messages.
+    """
+    messages = sorted({normalize_message(str(record.get('@message', ''))) for record in logs})
+    return hashlib.sha256('\n'.join(messages).encode('utf-8')).hexdigest()
+
+
+class AnalysisCache:
+    """
+    DynamoDB-backed memoization of Bedrock analyses for recurring incidents.
+
+    Entries are keyed on alarm name, analysis type, runbook version and the
+    normalized log signature, and expire through the table's TTL. Only
+    analyses at or above confidence_floor are stored.
+    """
+
+    def __init__(self, table, ttl_seconds=86400, confidence_floor=0.8):
+        self.table = table
+        self.ttl_seconds = ttl_seconds
+        self.confidence_floor = confidence_floor
+
+    @staticmethod
+    def make_key(alarm_name, analysis_type, runbook_version, logs):
+        parts = [alarm_name or '', analysis_type, runbook_version or 'none', log_signature(logs)]
+        return hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()
+
+    def get(self, cache_key):
+        try:
+            item = self.table.get_item(Key={'cache_key': cache_key}).get('Item')
+        except Exception as e:
+            logger.warning("Analysis cache lookup failed: %s", e)
+            return None
+
+        # TTL deletion is lazy, so expired items can still be returned
+        if not item or int(item.get('expires_at', 0)) < int(time.time()):
+            return None
+
+        try:
+            response = self.table.update_item(
+                Key={'cache_key': cache_key},
+                UpdateExpression="ADD hit_count :one SET last_hit_at = :now",
+                ExpressionAttributeValues={':one': 1, ':now': int(time.time())},
+                ReturnValues='UPDATED_NEW'
+            )
+            hit_count = int(response['Attributes']['hit_count'])
+        except Exception as e:
+            logger.warning("Failed to record analysis cache hit: %s", e)
+            hit_count = int(item.get('hit_count', 0)) + 1
+
+        analysis = json.loads(item['analysis'])
+        logger.info("Analysis cache hit %s (hit_count=%s)", cache_key, hit_count)
+        return analysis, hit_count
+
+    def put(self, cache_key, analysis, analysis_type, alarm_name):
+        confidence_path = CONFIDENCE_FIELDS.get(analysis_type)
+        if confidence_path:
+            value = analysis
+            for field in confidence_path:
+                value = value.get(field, {}) if isinstance(value, dict) else {}
+            try:
+                confidence = float(value)
+            except (TypeError, ValueError):
+                confidence = 0.0
+            if confidence < self.confidence_floor:
+                logger.info("Not caching %s analysis with confidence %.2f", analysis_type, confidence)
+                return
+
+        now = int(time.time())
+        try:
+            self.table.put_item(Item={
+                'cache_key': cache_key,
+                'alarm_name': alarm_name,
+                'analysis_type': analysis_type,
+                'analysis': json.dumps(analysis),
+                'hit_count': 0,
+                'created_at': now,
+                'expires_at': now + self.ttl_seconds
+            })
+        except Exception as e:
+            logger.warning("Failed to store analysis in cache: %s", e)
@@ -0,0 +1,115 @@
+import logging
+import time
+
+logger = logging.getLogger()
+
+TERMINAL_STATUSES = ('Complete', 'Failed', 'Cancelled', 'Timeout')
+
+
+class LogsInsightsFetcher:
+    """
+    Runs CloudWatch Logs Insights queries without blocking on a fixed sleep.
+
+    All queries are started up front and polled round-robin with an adaptive
+    backoff, so several log groups are fetched concurrently from one thread.
+    Polling stops at a hard deadline; queries still running at that point are
+    stopped and whatever partial results they returned are kept.
+    """
+
+    def __init__(self, logs_client, deadline, initial_interval=0.1, max_interval=2.0, backoff=1.5):
+        self.logs_client = logs_client
+        self.deadline = deadline  # time.monotonic() value after which we give up
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.stats = {}
+
+    @classmethod
+    def for_context(cls, logs_client, context, reserve_ms=10000, max_wait_seconds=30.0):
+        """
+        Builds a fetcher whose deadline leaves reserve_ms of the Lambda budget
+        for the rest of the invocation (Bedrock call, DynamoDB update).
+        """
+        budget = max_wait_seconds
+        if context is not None and hasattr(context, 'get_remaining_time_in_millis'):
+            remaining = (context.get_remaining_time_in_millis() - reserve_ms) / 1000.0
+            budget = max(0.0, min(budget, remaining))
+        return cls(logs_client, time.monotonic() + budget)
+
+    def fetch(self, queries):
+        """
+        queries: list of dicts with log_group, query, start_time, end_time.
+        Returns a dict of log_group -> list of records (field -> value).
+        """
+        started_at = time.monotonic()
+        pending = {}
+        results = {}
+
+        for spec in queries:
+            log_group = spec['log_group']
+            try:
+                response = self.logs_client.start_query(
+                    logGroupName=log_group,
+                    startTime=spec['start_time'],
+                    endTime=spec['end_time'],
+                    queryString=spec['query']
+                )
+                pending[response['queryId']] = log_group
+            except Exception as e:
+                logger.error("Error starting query on %s: %s", log_group, e)
+                results[log_group] = []
+        start_latency = time.monotonic() - started_at
+
+        polls = 0
+        interval = self.initial_interval
+        timed_out = []
+
+        while pending:
+            for query_id, log_group in list(pending.items()):
+                try:
+                    res = self.logs_client.get_query_results(queryId=query_id)
+                except Exception as e:
+                    logger.error("Error polling query on %s: %s", log_group, e)
+                    results[log_group] = []
+                    del pending[query_id]
+                    continue
+                polls += 1
+                # Keep the latest snapshot; a Running query already returns partial rows
+                results[log_group] = rows_to_records(res.get('results', []))
+                if res['status'] in TERMINAL_STATUSES:
+                    del pending[query_id]
+
+            if not pending:
+                break
+
+            now = time.monotonic()
+            if now >= self.deadline:
+                timed_out = list(pending.items())
+                break
+            time.sleep(min(interval, self.deadline - now))
+            interval = min(interval * self.backoff, self.max_interval)
+
+        for query_id, log_group in timed_out:
+            logger.warning("Logs Insights deadline hit on %s, returning partial results", log_group)
+            try:
+                self.logs_client.stop_query(queryId=query_id)
+            except Exception as e:
+                logger.warning("Failed to stop query %s: %s", query_id, e)
+
+        self.stats = {
+            'queries': len(queries),
+            'partial': [log_group for _, log_group in timed_out],
+            'polls': polls,
+            'start_ms': round(start_latency * 1000),
+            'wait_ms': round((time.monotonic() - started_at - start_latency) * 1000),
+            'total_ms': round((time.monotonic() - started_at) * 1000)
+        }
+        logger.info("Logs Insights fetch stats: %s", self.stats)
+        return results
+
+
+def rows_to_records(rows):
+    """
+    Logs Insights returns each row as a list of {field, value} pairs.
+    """
+    return [{cell['field']: cell['value'] for cell in row} for row in rows]
@@ -0,0 +1,128 @@
+import json
+import re
+
+# Variable parts of a log line that should not make two lines look different
+NORMALIZERS = [
+    (re.compile(r'\b\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?\b'), '<ts>'),
+    (re.compile(r'\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b'), '<id>'),
+    (re.compile(r'\b(?:\d{1,3}\.){3}\d{1,3}\b'), '<ip>'),
+    (re.compile(r'\b0x[0-9a-fA-F]+\b|\b(?=[0-9a-fA-F]*\d)[0-9a-fA-F]{8,}\b'), '<hex>'),
+    (re.compile(r'\d+(?:\.\d+)?'), '<n>'),
+]
+
+WILDCARD = '<*>'
+MAX_EXAMPLE_CHARS = 300
+
+
+def normalize_message(message):
+    for pattern, replacement in NORMALIZERS:
+        message = pattern.sub(replacement, message)
+    return message.strip()
+
+
+def estimate_tokens(text):
+    # Roughly 4 characters per token for English text and JSON
+    return len(text) // 4 + 1
+
+
+class LogTemplateMiner:
+    """
+    Drain-style online clustering of log lines into templates.
+
+    Lines are masked, tokenized and bucketed by token count and first token.
+    Within a bucket a line joins the most similar template if enough tokens
+    match; positions that differ become wildcards.
+    """
+
+    def __init__(self, similarity_threshold=0.5, max_examples=3):
+        self.similarity_threshold = similarity_threshold
+        self.max_examples = max_examples
+        self.buckets = {}
+        self.clusters = []
+
+    def add(self, message, timestamp=None):
+        tokens = normalize_message(message).split()
+        bucket_key = (len(tokens), tokens[0] if tokens else '')
+        bucket = self.buckets.setdefault(bucket_key, [])
+
+        best, best_score = None, 0.0
+        for cluster in bucket:
+            score = self._similarity(cluster['tokens'], tokens)
+            if score > best_score:
+                best, best_score = cluster, score
+
+        if best is None or best_score < self.similarity_threshold:
+            best = {'tokens': tokens, 'count': 0, 'first_seen': timestamp, 'last_seen': timestamp, 'examples': []}
+            bucket.append(best)
+            self.clusters.append(best)
+        else:
+            best['tokens'] = [a if a == b else WILDCARD for a, b in zip(best['tokens'], tokens)]
+
+        best['count'] += 1
+        if timestamp:
+            if not best['first_seen'] or timestamp < best['first_seen']:
+                best['first_seen'] = timestamp
+            if not best['last_seen'] or timestamp > best['last_seen']:
+                best['last_seen'] = timestamp
+        if len(best['examples']) < self.max_examples and message not in best['examples']:
+            best['examples'].append(message[:MAX_EXAMPLE_CHARS])
+
+    @staticmethod
+    def _similarity(template, tokens):
+        if not tokens:
+            return 1.0
+        same = sum(1 for a, b in zip(template, tokens) if a == b or a == WILDCARD)
+        return same / len(tokens)
+
+    def templates(self):
+        return [
+            {
+                'template': ' '.join(cluster['tokens']),
+                'count': cluster['count'],
+                'first_seen': cluster['first_seen'],
+                'last_seen': cluster['last_seen'],
+                'examples': cluster['examples']
+            }
+            for cluster in sorted(self.clusters, key=lambda c: c['count'], reverse=True)
+        ]
+
+
+def mine_templates(logs):
+    miner = LogTemplateMiner()
+    for record in logs:
+        # Logs Insights adds @ptr to every row; it is useless to the model
+        miner.add(str(record.get('@message', '')), record.get('@timestamp'))
+    return miner.templates()
+
+
+def compact_logs(logs, token_budget):
+    """
+    Renders logs as compact JSON templates that fit inside token_budget.
+    Examples are trimmed first, then the rarest templates are dropped.
+    """
+    templates = mine_templates(logs)
+    summary = {'lines': len(logs), 'templates': len(templates)}
+
+    for max_examples in (3, 1, 0):
+        kept = []
+        for template in templates:
+            kept.append(dict(template, examples=template['examples'][:max_examples]))
+        rendered = _render(summary, kept)
+        if estimate_tokens(rendered) <= token_budget:
+            return rendered
+
+    # Still too large: keep the most frequent templates that fit
+    budget_chars = token_budget * 4
+    used = len(_render(dict(summary, omitted_templates=len(templates)), []))
+    fitting = []
+    for template in kept:
+        size = len(json.dumps(template, separators=(',', ':'))) + 1
+        if used + size > budget_chars:
+            break
+        fitting.append(template)
+        used += size
+    return _render(dict(summary, omitted_templates=len(templates) - len(fitting)), fitting)
+
+
+def _render(summary, templates):
+    return json.dumps(dict(summary, items=templates), separators=(',', ':'))
@@ -0,0 +1,94 @@
+import logging
+import time
+from collections import OrderedDict
+
+from aws_clients import error_code
+
+logger = logging.getLogger()
+
+MISSING_CODES = ('NoSuchKey', '404', 'AccessDenied', '403')
+
+
+class RunbookCache:
+    """
+    Warm-container cache for runbooks in the knowledge-base bucket.
+
+    Entries are kept in LRU order and trusted for ttl_seconds. After that they
+    are revalidated with a conditional GET (If-None-Match), so an unchanged
+    runbook costs a 304 instead of a full download. Alarms without a runbook
+    are cached negatively for negative_ttl_seconds.
+    """
+
+    def __init__(self, s3_client, bucket, max_entries=64, ttl_seconds=300, negative_ttl_seconds=60):
+        self.s3 = s3_client
+        self.bucket = bucket
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.entries = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0, 'revalidated': 0, 'negative_hits': 0, 'errors': 0}
+
+    def get(self, alarm_name):
+        """
+        Returns (content, etag) for the alarm's runbook, or (None, None) if it has none.
+        """
+        now = time.monotonic()
+        entry = self.entries.get(alarm_name)
+
+        if entry and now < entry['expires_at']:
+            self.entries.move_to_end(alarm_name)
+            if entry['content'] is None:
+                self.stats['negative_hits'] += 1
+            else:
+                self.stats['hits'] += 1
+            self._log(alarm_name, 'hit')
+            return entry['content'], entry['etag']
+
+        key = f"runbooks/{alarm_name}.md"
+        params = {'Bucket': self.bucket, 'Key': key}
+        if entry and entry['etag']:
+            params['IfNoneMatch'] = entry['etag']
+
+        try:
+            response = self.s3.get_object(**params)
+            content = response['Body'].read().decode('utf-8')
+        except Exception as e:
+            # Connection and read timeouts carry no error code; they fall through as transient
+            code = error_code(e)
+            status = None
+            if code is not None:
+                status = e.response.get('ResponseMetadata', {}).get('HTTPStatusCode')
+
+            if entry and (status == 304 or code in ('304', 'NotModified')):
+                entry['expires_at'] = now + self.ttl_seconds
+                self.entries.move_to_end(alarm_name)
+                self.stats['revalidated'] += 1
+                self._log(alarm_name, 'revalidated')
+                return entry['content'], entry['etag']
+
+            if code in MISSING_CODES:
+                self._store(alarm_name, None, None, now + self.negative_ttl_seconds)
+                self.stats['misses'] += 1
+                self._log(alarm_name, 'missing')
+                return None, None
+
+            # Transient error: serve the stale copy if we have one, but don't cache the failure
+            self.stats['errors'] += 1
+            logger.warning(f"Failed to fetch runbook for {alarm_name}: {e}")
+            if entry:
+                return entry['content'], entry['etag']
+            return None, None
+
+        self._store(alarm_name, content, response.get('ETag'), now + self.ttl_seconds)
+        self.stats['misses'] += 1
+        self._log(alarm_name, 'miss')
+        return content, response.get('ETag')
+
+    def _store(self, alarm_name, content, etag, expires_at):
+        self.entries[alarm_name] = {'content': content, 'etag': etag, 'expires_at': expires_at}
+        self.entries.move_to_end(alarm_name)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def _log(self, alarm_name, outcome):
+        logger.info(f"Runbook cache {outcome} for {alarm_name}: {self.stats}")
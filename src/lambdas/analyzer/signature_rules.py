@@ -0,0 +1,183 @@
+import fnmatch
+import json
+import logging
+import re
+import time
+
+logger = logging.getLogger()
+
+GLOBAL_FLAGS = re.compile(r'^\(\?([imsx]+)\)')
+SPECIAL_CHARS = set('.^$*+?{}[]\\|()')
+MIN_LITERAL_LENGTH = 3
+
+
+def required_literal(pattern):
+    """
+    Longest plain-text run that every match of the pattern must contain, or None.
+
+    Deliberately conservative: only top-level runs are considered, a character
+    followed by an optional quantifier is dropped, and top-level alternation
+    disables the prefilter entirely.
+    """
+    m = GLOBAL_FLAGS.match(pattern)
+    body = pattern[m.end():] if m else pattern
+
+    depth = 0
+    runs, current = [], ''
+    i = 0
+    while i < len(body):
+        char = body[i]
+        if char == '\\':
+            runs.append(current)
+            current = ''
+            i += 2
+            continue
+        if char == '[':
+            runs.append(current)
+            current = ''
+            i = body.find(']', i + 2) + 1 or len(body)
+            continue
+        if char == '{':
+            # Counted repetition: drop the repeated character and skip the bounds
+            runs.append(current[:-1])
+            current = ''
+            i = body.find('}', i) + 1 or len(body)
+            continue
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == '|' and depth == 0:
+            return None
+
+        if depth == 0 and char not in SPECIAL_CHARS:
+            current += char
+        else:
+            if char in '?*' and current:
+                # The previous character is optional
+                current = current[:-1]
+            runs.append(current)
+            current = ''
+        i += 1
+    runs.append(current)
+
+    longest = max(runs, key=len)
+    return longest if len(longest) >= MIN_LITERAL_LENGTH else None
+
+
+class SignatureRuleEngine:
+    """
+    Deterministic fast path for incidents whose remedy is already known.
+
+    Each rule pairs an alarm-name glob with one or more log regexes. For every
+    alarm the applicable patterns are compiled once into a matcher index:
+    each pattern carries the literal text any match must contain. A log batch
+    is joined into one block, the literals are checked with substring search
+    and only patterns whose literal is present run their regex, once, over the
+    whole block. Python's re has no multi-pattern automaton, so this avoids
+    both a per-line Python loop and a slow many-way alternation.
+    """
+
+    def __init__(self, rules, min_confidence=0.8):
+        self.rules = rules
+        self.min_confidence = min_confidence
+        self._matchers = {}
+
+    @classmethod
+    def from_json(cls, text, **kwargs):
+        document = json.loads(text)
+        rules = []
+        for rule in document.get('rules', []):
+            patterns = rule.get('log_patterns', [])
+            if not rule.get('id') or not patterns:
+                logger.warning("Skipping invalid signature rule: %s", rule.get('id'))
+                continue
+            try:
+                for pattern in patterns:
+                    re.compile(pattern)
+            except re.error as e:
+                logger.warning("Skipping signature rule %s with bad pattern: %s", rule['id'], e)
+                continue
+            rules.append(rule)
+        return cls(rules, **kwargs)
+
+    def _matcher_for(self, alarm_name):
+        """
+        Returns [(rule, [(regex, literal, ignore_case)])] for the rules that apply
+        to this alarm. Built once per distinct alarm name and reused.
+        """
+        if alarm_name in self._matchers:
+            return self._matchers[alarm_name]
+
+        applicable = []
+        for rule in self.rules:
+            if not fnmatch.fnmatchcase(alarm_name or '', rule.get('alarm_pattern', '*')):
+                continue
+            entries = []
+            for pattern in rule['log_patterns']:
+                regex = re.compile(pattern, re.MULTILINE)
+                literal = required_literal(pattern)
+                ignore_case = bool(regex.flags & re.IGNORECASE)
+                if literal and ignore_case:
+                    literal = literal.lower()
+                entries.append((regex, literal, ignore_case))
+            applicable.append((rule, entries))
+
+        self._matchers[alarm_name] = applicable
+        return applicable
+
+    def match(self, alarm_name, logs):
+        """
+        Returns a ROOT_CAUSE-shaped analysis for the best confident rule, or None.
+        """
+        started = time.perf_counter()
+        applicable = self._matcher_for(alarm_name)
+        if not applicable:
+            return None
+
+        block = '\n'.join(
+            str(record.get('@message', '')) if isinstance(record, dict) else str(record)
+            for record in logs
+        )
+        lowered = None
+
+        best = None
+        for rule, entries in applicable:
+            matched = 0
+            for regex, literal, ignore_case in entries:
+                if literal:
+                    if ignore_case:
+                        if lowered is None:
+                            lowered = block.lower()
+                        if literal not in lowered:
+                            continue
+                    elif literal not in block:
+                        continue
+                if regex.search(block):
+                    matched += 1
+
+            if matched < rule.get('min_matches', len(entries)):
+                continue
+            confidence = float(rule.get('confidence', 0.0))
+            if confidence < self.min_confidence:
+                continue
+            if best is None or confidence > best[1]:
+                best = (rule, confidence, matched)
+
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+        if not best:
+            logger.info("No signature rule matched %s (%d lines, %sms)", alarm_name, len(logs), elapsed_ms)
+            return None
+
+        rule, confidence, matched = best
+        logger.info("Signature rule %s matched %s (%sms)", rule['id'], alarm_name, elapsed_ms)
+        return {
+            "root_cause": rule.get('root_cause', f"Known signature: {rule['id']}"),
+            "detailed_root_cause": rule.get('detailed_root_cause', rule.get('root_cause', '')),
+            "recommended_action": rule.get('recommended_action', 'NONE'),
+            "action_justification": rule.get('action_justification', ''),
+            "confidence": confidence,
+            "reasoning": f"Matched signature rule '{rule['id']}' ({matched} log patterns); Bedrock was not consulted.",
+            "matched_rule": rule['id'],
+            "match_ms": elapsed_ms
+        }
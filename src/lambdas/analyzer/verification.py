@@ -0,0 +1,164 @@
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+
+logger = logging.getLogger()
+
+# For each alarm comparison, the test a datapoint must pass to count as healthy
+HEALTHY_TESTS = {
+    'GreaterThanThreshold': lambda value, threshold: value <= threshold,
+    'GreaterThanOrEqualToThreshold': lambda value, threshold: value < threshold,
+    'LessThanThreshold': lambda value, threshold: value >= threshold,
+    'LessThanOrEqualToThreshold': lambda value, threshold: value > threshold,
+}
+
+
+def parse_timestamp(value):
+    """
+    Parses CloudWatch/ISO timestamps such as 2024-01-01T00:00:00.000+0000.
+    """
+    if not value:
+        return None
+    for fmt in ('%Y-%m-%dT%H:%M:%S.%f%z', '%Y-%m-%dT%H:%M:%S%z', '%Y-%m-%dT%H:%M:%S.%f', '%Y-%m-%dT%H:%M:%S'):
+        try:
+            parsed = datetime.strptime(value, fmt)
+            return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+    return None
+
+
+class HealingVerifier:
+    """
+    Verifies healing against the metric behind the alarm.
+
+    The alarm definition is read once; its metric (or all the metrics of a
+    metric-math alarm) is then read with a single GetMetricData call per poll.
+    Healing is verified once the newest `healthy_datapoints` datapoints are all
+    on the healthy side of the threshold. Polling backs off while the metric is
+    unhealthy and waits roughly one period once a healthy streak has started.
+    Alarms that cannot be evaluated from datapoints fall back to the alarm state.
+    """
+
+    def __init__(self, cloudwatch, healthy_datapoints=3, initial_interval=5.0, max_interval=30.0, backoff=1.5):
+        self.cloudwatch = cloudwatch
+        self.healthy_datapoints = healthy_datapoints
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+
+    def verify(self, alarm_name, incident_started_at, deadline):
+        started = time.monotonic()
+        alarms = self.cloudwatch.describe_alarms(AlarmNames=[alarm_name]).get('MetricAlarms', [])
+        if not alarms:
+            return None
+        alarm = alarms[0]
+
+        healthy_test = HEALTHY_TESTS.get(alarm.get('ComparisonOperator'))
+        queries = self._metric_queries(alarm)
+        period = self._period(alarm)
+
+        polls = 0
+        interval = self.initial_interval
+        recovered_at = None
+        streak = 0
+
+        while True:
+            polls += 1
+            if healthy_test and queries:
+                streak, recovered_at = self._healthy_streak(queries, period, healthy_test, alarm['Threshold'])
+                healthy = streak >= self.healthy_datapoints
+            else:
+                state = self.cloudwatch.describe_alarms(AlarmNames=[alarm_name])['MetricAlarms'][0]
+                healthy = state['StateValue'] == 'OK'
+                recovered_at = state.get('StateUpdatedTimestamp') if healthy else None
+
+            if healthy:
+                return self._result('VERIFIED', alarm_name, incident_started_at, recovered_at, streak, polls, started)
+
+            now = time.monotonic()
+            if now >= deadline:
+                return self._result('NOT_VERIFIED', alarm_name, incident_started_at, None, streak, polls, started)
+
+            if streak:
+                # A healthy streak has started: the next useful datapoint lands about one period from now
+                wait = min(period, self.max_interval)
+            else:
+                wait = interval
+                interval = min(interval * self.backoff, self.max_interval)
+            time.sleep(max(0.0, min(wait, deadline - now)))
+
+    def _metric_queries(self, alarm):
+        if alarm.get('Metrics'):
+            # Metric math alarm: reuse its queries as-is, one batched call per poll
+            return alarm['Metrics']
+        if not alarm.get('MetricName') or alarm.get('ExtendedStatistic'):
+            return None
+        return [{
+            'Id': 'm0',
+            'MetricStat': {
+                'Metric': {
+                    'Namespace': alarm['Namespace'],
+                    'MetricName': alarm['MetricName'],
+                    'Dimensions': alarm.get('Dimensions', [])
+                },
+                'Period': alarm['Period'],
+                'Stat': alarm['Statistic']
+            },
+            'ReturnData': True
+        }]
+
+    def _period(self, alarm):
+        if alarm.get('Period'):
+            return alarm['Period']
+        periods = [m['MetricStat']['Period'] for m in alarm.get('Metrics', []) if 'MetricStat' in m]
+        return min(periods) if periods else 60
+
+    def _healthy_streak(self, queries, period, healthy_test, threshold):
+        """
+        Returns (number of newest consecutive healthy datapoints, timestamp of the first of them).
+        """
+        end = datetime.now(timezone.utc)
+        start = end - timedelta(seconds=period * (self.healthy_datapoints + 2))
+        response = self.cloudwatch.get_metric_data(
+            MetricDataQueries=queries,
+            StartTime=start,
+            EndTime=end,
+            ScanBy='TimestampDescending'
+        )
+        results = [r for r in response.get('MetricDataResults', []) if r.get('Values')]
+        if not results:
+            return 0, None
+
+        # The alarm evaluates the query flagged ReturnData; the first result is it
+        result = results[0]
+        streak = 0
+        recovered_at = None
+        for timestamp, value in zip(result['Timestamps'], result['Values']):
+            if not healthy_test(value, threshold):
+                break
+            streak += 1
+            recovered_at = timestamp
+        return streak, recovered_at
+
+    def _result(self, status, alarm_name, incident_started_at, recovered_at, streak, polls, started):
+        time_to_recovery = None
+        if recovered_at and incident_started_at:
+            time_to_recovery = max(0, round((recovered_at - incident_started_at).total_seconds()))
+
+        if status == 'VERIFIED' and streak:
+            message = f"{alarm_name} metric healthy for {streak} consecutive datapoints."
+        elif status == 'VERIFIED':
+            message = f"{alarm_name} returned to OK."
+        else:
+            message = f"{alarm_name} did not recover before the verification deadline."
+
+        result = {
+            'status': status,
+            'message': message,
+            'time_to_recovery_seconds': time_to_recovery,
+            'polls': polls,
+            'verification_seconds': round(time.monotonic() - started, 1)
+        }
+        logger.info("Verification result: %s", result)
+        return result
@@ -1,13 +1,14 @@
 import json
 import logging
-import boto3
+import aws_clients
 import os
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-sfn = boto3.client('stepfunctions')
+sfn = aws_clients.lazy_client('stepfunctions')
 
+@aws_clients.with_client_metrics
 def handler(event, context):
     logger.info("Received event: %s", json.dumps(event))
     
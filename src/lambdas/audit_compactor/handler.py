@@ -0,0 +1,130 @@
+import gzip
+import io
+import json
+import logging
+import os
+import re
+import aws_clients
+from stream_images import deserialize_image
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+s3 = aws_clients.lazy_client('s3')
+
+LOGS_BUCKET = os.environ['LOGS_BUCKET']
+AUDIT_PREFIX = os.environ.get('AUDIT_PREFIX', 'audit/')
+
+UNSAFE_PARTITION_CHARS = re.compile(r'[^A-Za-z0-9_.-]')
+
+def to_row(record):
+    """
+    Flattens one audit stream record into a report-friendly row.
+    The stream identifiers travel with the row so readers can drop duplicates.
+    """
+    image = deserialize_image(record['dynamodb']['NewImage'])
+    details = image.get('Details')
+    try:
+        details = json.loads(details) if isinstance(details, str) else details
+    except ValueError:
+        pass
+
+    return {
+        'incident_id': image.get('IncidentID'),
+        'timestamp': image.get('Timestamp'),
+        'event_type': image.get('EventType'),
+        'action_type': image.get('ActionType'),
+        'component': image.get('Component'),
+        'details': details,
+        'event_id': record.get('eventID'),
+        'sequence_number': record['dynamodb']['SequenceNumber']
+    }
+
+def partition_of(row):
+    component = UNSAFE_PARTITION_CHARS.sub('_', row.get('component') or 'unknown')
+    date = (row.get('timestamp') or '')[:10] or 'unknown'
+    return component, date
+
+def object_key(stream_arn, component, date, rows):
+    """
+    Deterministic key from the stream and the sequence range the file covers,
+    so rewriting the same rows (a whole batch retried after an error) overwrites
+    the same object. A partial retry from a reported sequence number is handled
+    by trim_after_failure; readers should still dedupe on event_id.
+    """
+    stream_label = UNSAFE_PARTITION_CHARS.sub('_', stream_arn.rsplit('/', 1)[-1]) if stream_arn else 'stream'
+    first = rows[0]['sequence_number']
+    last = rows[-1]['sequence_number']
+    return f"{AUDIT_PREFIX}component={component}/dt={date}/{stream_label}-{first}-{last}.jsonl.gz"
+
+def encode(rows):
+    buffer = io.BytesIO()
+    # mtime=0 keeps the bytes identical across retries
+    with gzip.GzipFile(fileobj=buffer, mode='wb', mtime=0) as f:
+        for row in rows:
+            f.write(json.dumps(row, separators=(',', ':'), default=str).encode('utf-8'))
+            f.write(b'\n')
+    return buffer.getvalue()
+
+def trim_after_failure(stream_arn, written, failed_sequence):
+    """
+    The batch is retried from failed_sequence, so rows at or after it must not
+    stay in the objects already written, or they would land in S3 twice.
+    Each affected object is deleted, then rewritten with only the earlier rows.
+    Raises if that fails, so Lambda retries the whole batch, which rewrites
+    every object under its original key.
+    """
+    for (component, date), rows in written.items():
+        kept = [row for row in rows if int(row['sequence_number']) < int(failed_sequence)]
+        if len(kept) == len(rows):
+            continue
+        s3.delete_object(Bucket=LOGS_BUCKET, Key=object_key(stream_arn, component, date, rows))
+        if kept:
+            s3.put_object(
+                Bucket=LOGS_BUCKET,
+                Key=object_key(stream_arn, component, date, kept),
+                Body=encode(kept),
+                ContentType='application/x-ndjson'
+            )
+
+@aws_clients.with_client_metrics
+def handler(event, context):
+    records = [r for r in event.get('Records', []) if r.get('eventName') == 'INSERT' and 'NewImage' in r.get('dynamodb', {})]
+    if not records:
+        return {'batchItemFailures': []}
+
+    stream_arn = records[0].get('eventSourceARN')
+    partitions = {}
+    for record in records:
+        row = to_row(record)
+        partitions.setdefault(partition_of(row), []).append(row)
+
+    failed_sequence = None
+    written = {}
+    for (component, date), rows in partitions.items():
+        key = object_key(stream_arn, component, date, rows)
+        try:
+            s3.put_object(
+                Bucket=LOGS_BUCKET,
+                Key=key,
+                Body=encode(rows),
+                ContentType='application/x-ndjson'
+            )
+            written[(component, date)] = rows
+        except Exception as e:
+            logger.error(f"Failed to write {key}: {e}")
+            # Stream checkpoints are ordered: report the earliest failed record,
+            # the batch is retried from there
+            first = rows[0]['sequence_number']
+            if failed_sequence is None or int(first) < int(failed_sequence):
+                failed_sequence = first
+
+    if failed_sequence:
+        trim_after_failure(stream_arn, written, failed_sequence)
+
+    count = sum(1 for rows in written.values() for row in rows
+                if not failed_sequence or int(row['sequence_number']) < int(failed_sequence))
+    logger.info(f"Compacted {count}/{len(records)} audit records into {len(partitions)} partitions")
+    if failed_sequence:
+        return {'batchItemFailures': [{'itemIdentifier': failed_sequence}]}
+    return {'batchItemFailures': []}
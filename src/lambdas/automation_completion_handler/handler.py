@@ -0,0 +1,135 @@
+import json
+import logging
+import os
+import time
+import aws_clients
+from audit import AuditWriter
+from automation_groups import complete_group_member, summarize
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+dynamodb = aws_clients.lazy_resource('dynamodb')
+sfn = aws_clients.lazy_client('stepfunctions')
+
+TABLE_NAME = os.environ['TABLE_NAME']
+AUTOMATION_TASKS_TABLE_NAME = os.environ['AUTOMATION_TASKS_TABLE_NAME']
+AUTOMATION_TASK_TTL_SECONDS = int(os.environ.get('AUTOMATION_TASK_TTL_SECONDS', '86400'))
+AUDIT_TABLE_NAME = os.environ.get('AUDIT_TABLE_NAME')
+LEASE_TABLE_NAME = os.environ.get('LEASE_TABLE_NAME')
+
+audit_log = AuditWriter(AUDIT_TABLE_NAME, 'AutomationCompletionHandler')
+
+# Automation statuses after which the execution will not change again
+TERMINAL_STATUSES = ['Success', 'CompletedWithSuccess', 'Failed', 'CompletedWithFailure', 'TimedOut', 'Cancelled', 'Rejected']
+
+def record_result(execution_id, result):
+    """
+    Stores the final result on the automation's item, next to the group the
+    healer registered it under. Returns the item as it is now, which has a
+    group_id only if the healer got there first, or None for a duplicate event.
+    """
+    table = dynamodb.Table(AUTOMATION_TASKS_TABLE_NAME)
+    try:
+        response = table.update_item(
+            Key={'execution_id': execution_id},
+            UpdateExpression="SET final_result = :r, expires_at = if_not_exists(expires_at, :exp)",
+            ConditionExpression="attribute_not_exists(final_result)",
+            ExpressionAttributeValues={
+                ':r': json.dumps(result),
+                ':exp': int(time.time()) + AUTOMATION_TASK_TTL_SECONDS
+            },
+            ReturnValues='ALL_NEW'
+        )
+    except Exception as e:
+        if aws_clients.error_code(e) != 'ConditionalCheckFailedException':
+            raise
+        return None
+    return response['Attributes']
+
+def release_lease(item):
+    """
+    Frees the healing lease the healer took on the target resource, if it still holds it.
+    """
+    if not LEASE_TABLE_NAME or not item.get('lease_resource'):
+        return
+    try:
+        dynamodb.Table(LEASE_TABLE_NAME).delete_item(
+            Key={'resource_key': item['lease_resource']},
+            ConditionExpression="holder = :h",
+            ExpressionAttributeValues={':h': item.get('incident_id')}
+        )
+        logger.info(f"Lease on {item['lease_resource']} released")
+    except Exception as e:
+        if aws_clients.error_code(e) != 'ConditionalCheckFailedException':
+            logger.error(f"Failed to release lease on {item['lease_resource']}: {e}")
+
+def update_incident(item, result):
+    if not item.get('incident_id'):
+        return
+    try:
+        dynamodb.Table(TABLE_NAME).update_item(
+            Key={
+                'incident_id': item['incident_id'],
+                'timestamp': item.get('incident_timestamp')
+            },
+            UpdateExpression="set healing_status = :s, healing_result = :r",
+            ExpressionAttributeValues={
+                ':s': result['status'],
+                ':r': json.dumps(result)
+            }
+        )
+    except Exception as e:
+        logger.error(f"Failed to update DynamoDB: {e}")
+
+@aws_clients.with_client_metrics
+@audit_log.flush_after
+def handler(event, context):
+    logger.info("Received event: %s", json.dumps(event))
+
+    detail = event.get('detail', {})
+    execution_id = detail.get('ExecutionId')
+    status = detail.get('Status')
+
+    if not execution_id or status not in TERMINAL_STATUSES:
+        logger.info(f"Ignoring non-terminal automation event: {execution_id} {status}")
+        return {'status': 'IGNORED'}
+
+    succeeded = status in ('Success', 'CompletedWithSuccess')
+    result = {
+        "status": "SUCCESS" if succeeded else "FAILED",
+        "message": f"SSM Execution {status}: {execution_id}",
+        "execution_id": execution_id
+    }
+
+    item = record_result(execution_id, result)
+    if item is None:
+        logger.info(f"Duplicate completion event for {execution_id}, ignoring")
+        return {'status': 'DUPLICATE'}
+    if not item.get('group_id'):
+        # The healer has not registered yet; it will pick the result up from the item
+        logger.info(f"No task token yet for {execution_id}, result parked")
+        return {'status': 'PARKED'}
+
+    release_lease(item)
+    table = dynamodb.Table(AUTOMATION_TASKS_TABLE_NAME)
+    group = complete_group_member(table, item['group_id'], item['target'], dict(result, target=item['target']))
+    if int(group['pending']) > 0:
+        logger.info(f"{execution_id} done, {group['pending']} automations still running in {item['group_id']}")
+        return {'status': 'RECORDED'}
+
+    summary = summarize(group.get('healing_action'), [json.loads(r) for r in group['results'].values()], group.get('action_type'))
+    update_incident(group, summary)
+    audit_log.record(group.get('incident_id'), 'HEALING_COMPLETED', group.get('action_type'), {
+        'action': group.get('healing_action'),
+        'result': summary
+    })
+
+    try:
+        sfn.send_task_success(taskToken=group['task_token'], output=json.dumps(summary))
+    except (sfn.exceptions.TaskTimedOut, sfn.exceptions.InvalidToken) as e:
+        logger.warning(f"Could not resume workflow for {item['group_id']}: {e}")
+        return {'status': 'EXPIRED'}
+
+    logger.info(f"Resumed workflow for {item['group_id']} with {summary['status']}")
+    return {'status': 'RESUMED'}
@@ -0,0 +1,38 @@
+"""
+Prices a set of candidate remediations in one pass.
+
+Every candidate comes down to (capacity delta, hours, unit price), so the whole
+table is one element-wise product. It runs on numpy arrays when numpy is
+importable (e.g. from a layer) and as a plain loop otherwise; the candidate
+lists here are short, so the fallback is not slower in practice.
+"""
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def batch_costs(deltas, hours, unit_prices):
+    """
+    Returns deltas x hours x unit_prices rounded to cents. A unit price of
+    None (not in the index) gives a cost of None.
+    """
+    if np is not None:
+        prices = np.array([np.nan if price is None else price for price in unit_prices], dtype=float)
+        costs = np.round(np.asarray(deltas, dtype=float) * np.asarray(hours, dtype=float) * prices, 2)
+        return [None if np.isnan(cost) else float(cost) for cost in costs]
+
+    return [
+        None if price is None else round(delta * hour * price, 2)
+        for delta, hour, price in zip(deltas, hours, unit_prices)
+    ]
+
+
+def rank(candidates):
+    """
+    Cheapest first, unpriced candidates last; numbers them from 1.
+    """
+    ranked = sorted(candidates, key=lambda c: (c['estimated_cost'] is None, c['estimated_cost'] or 0.0))
+    for position, candidate in enumerate(ranked, 1):
+        candidate['rank'] = position
+    return ranked
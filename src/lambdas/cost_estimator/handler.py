@@ -1,70 +1,157 @@
 import json
 import logging
+import os
+from costing import batch_costs, rank
+from pricing_index import PricingIndex
+from remediation import fallback_for
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-class MockPricingService:
-    def get_price(self, service, resource_type):
-        # Simulator for AWS Pricing API
-        # In real world, would call boto3.client('pricing').get_products(...)
-        pricing_db = {
-            'AmazonEC2': {
-                't3.medium': 0.0416,  # Hourly
-                'm5.large': 0.096,
-                'restart_overhead': 0.50 # Operational cost
-            },
-            'AmazonECS': {
-                'fargate_vark': 0.040 # Per vCPU/hour approx
-            }
-        }
-        return pricing_db.get(service, {}).get(resource_type, 0.0)
+# Built offline by tools/build_pricing_index.py and packaged next to this file
+PRICING_INDEX_PATH = os.environ.get('PRICING_INDEX_PATH', os.path.join(os.path.dirname(__file__), 'pricing.idx'))
+REGION = os.environ.get('PRICING_REGION') or os.environ.get('AWS_REGION', 'us-east-1')
+DEFAULT_INSTANCE_TYPE = os.environ.get('DEFAULT_INSTANCE_TYPE', 'm5.large')
+DEFAULT_OPERATING_SYSTEM = os.environ.get('DEFAULT_OPERATING_SYSTEM', 'Linux')
+DEFAULT_TENANCY = os.environ.get('DEFAULT_TENANCY', 'Shared')
+# Scaling up is priced as the extra capacity running for a month, the worst case if nobody scales back
+SCALE_UP_INSTANCES = int(os.environ.get('SCALE_UP_INSTANCES', '1'))
+SCALE_UP_HOURS = float(os.environ.get('SCALE_UP_HOURS', '720'))
+# Other instance counts to price whenever a SCALE_UP is on the table, e.g. "2,4"
+SCALE_UP_ALTERNATIVES = [int(n) for n in os.environ.get('SCALE_UP_ALTERNATIVES', '2').split(',') if n.strip()]
+HIGH_RISK_COST = float(os.environ.get('HIGH_RISK_COST', '20.0'))
+
+# Operational overheads that are not in the Price List
+OPERATIONAL_COSTS = {
+    'RESTART_SERVICE': 0.50,
+    'CLEAR_CACHE': 0.10,
+}
+
+# Nothing runs for these, so there is no fallback to price either
+NO_ACTION = ('NONE', 'UNKNOWN')
+
+# Mapped on first use and kept for the life of the container
+pricing_index = None
+
+def get_pricing_index():
+    global pricing_index
+    if pricing_index is None:
+        pricing_index = PricingIndex(PRICING_INDEX_PATH)
+    return pricing_index
+
+def scale_candidate(role, event, instances=None, instance_type=None):
+    return {
+        'action': 'SCALE_UP',
+        'role': role,
+        'instances': instances or SCALE_UP_INSTANCES,
+        'hours': SCALE_UP_HOURS,
+        'instance_type': instance_type or event.get('instance_type') or DEFAULT_INSTANCE_TYPE,
+        'region': event.get('region') or REGION
+    }
+
+def build_candidates(action, event):
+    """
+    The primary action, the healer's fallback for it, and alternative scale
+    targets (SCALE_UP_ALTERNATIVES plus any 'scale_targets' in the event,
+    each {'instances': n, 'instance_type': t}) if a SCALE_UP is involved.
+    """
+    candidates = []
+
+    def add(role, action_name, **scale):
+        if action_name == 'SCALE_UP':
+            candidate = scale_candidate(role, event, **scale)
+        else:
+            candidate = {'action': action_name, 'role': role}
+        identity = {k: v for k, v in candidate.items() if k != 'role'}
+        if not any({k: v for k, v in c.items() if k != 'role'} == identity for c in candidates):
+            candidates.append(candidate)
+
+    add('PRIMARY', action)
+    if action in NO_ACTION:
+        return candidates
+
+    fallback = fallback_for(action)
+    add('FALLBACK', fallback)
+
+    if 'SCALE_UP' in (action, fallback):
+        for instances in SCALE_UP_ALTERNATIVES:
+            add('ALTERNATIVE', 'SCALE_UP', instances=instances)
+        for target in event.get('scale_targets') or []:
+            add('ALTERNATIVE', 'SCALE_UP', instances=target.get('instances'), instance_type=target.get('instance_type'))
+
+    return candidates
+
+def price_candidates(candidates, event):
+    """
+    Fills in hourly_price and estimated_cost for every candidate at once.
+    """
+    index = get_pricing_index()
+    # One index probe per distinct product, however many candidates share it
+    prices = {}
+    deltas, hours, unit_prices = [], [], []
+    for candidate in candidates:
+        if candidate['action'] == 'SCALE_UP':
+            product = (candidate['region'], candidate['instance_type'])
+            if product not in prices:
+                prices[product] = index.hourly_price(
+                    'AmazonEC2',
+                    candidate['region'],
+                    candidate['instance_type'],
+                    event.get('operating_system') or DEFAULT_OPERATING_SYSTEM,
+                    event.get('tenancy') or DEFAULT_TENANCY
+                )
+                if prices[product] is None:
+                    logger.warning("No price for %s in %s", candidate['instance_type'], candidate['region'])
+            candidate['hourly_price'] = prices[product]
+            deltas.append(candidate['instances'])
+            hours.append(candidate['hours'])
+        else:
+            # Flat costs go through the same product as one unit for one hour
+            candidate['hourly_price'] = OPERATIONAL_COSTS.get(candidate['action'], 0.0)
+            deltas.append(1)
+            hours.append(1)
+        unit_prices.append(candidate['hourly_price'])
+
+    for candidate, cost in zip(candidates, batch_costs(deltas, hours, unit_prices)):
+        candidate['estimated_cost'] = cost
+    return candidates
+
+def assess_risk(action, estimated_cost, alarm_name):
+    # An action we cannot price goes to a human rather than through on a guess
+    if estimated_cost is None or estimated_cost > HIGH_RISK_COST or action in ['REBOOT_INSTANCE', 'DELETE_RESOURCE'] or 'Spike' in alarm_name:
+        return 'HIGH'
+    return 'LOW'
 
 def handler(event, context):
     logger.info("Received event: %s", json.dumps(event))
-    
+
     analysis = event.get('analysis', {})
     action = analysis.get('recommended_action')
-    
+
     if not action:
         # Fallback if top level
         action = event.get('recommended_action', 'UNKNOWN')
-    
-    pricing_service = MockPricingService()
-    
-    base_cost = 0.0
-    
-    if action == 'RESTART_SERVICE':
-        # Cost of restart is operation overhead + minor compute
-        base_cost = pricing_service.get_price('AmazonEC2', 'restart_overhead')
-    elif action == 'SCALE_UP':
-        # Assume scaling up by 1 m5.large instance for 1 month (730 hours) as worst case estimate?
-        # Or just 1 hour? Usually we estimate impact. Let's say 24 hours.
-        hourly_rate = pricing_service.get_price('AmazonEC2', 'm5.large')
-        base_cost = hourly_rate * 24 * 30 # Monthly estimate? Or just immediate impact?
-        # Let's stick to the previous ~$45.00 logic which implies some duration.
-        # $0.096 * 24 * 30 ~= $69.
-        # Let's adjust to match "high risk" threshold (> $20).
-        base_cost = 45.0 
-    elif action == 'CLEAR_CACHE':
-        base_cost = 0.10
-    else:
-        base_cost = 0.0
-    
-    # Add realistic variance
-    import random
-    variance = base_cost * 0.1 * (random.random() - 0.5)
-    estimated_cost = round(max(0, base_cost + variance), 2)
-    
-    # Determine risk
-    risk_level = 'LOW'
+
     alarm_name = event.get('alarm_name', '')
-    
-    if estimated_cost > 20.0 or action in ['REBOOT_INSTANCE', 'DELETE_RESOURCE'] or 'Spike' in alarm_name:
-        risk_level = 'HIGH'
-        
+
+    candidates = price_candidates(build_candidates(action, event), event)
+    for candidate in candidates:
+        candidate['risk_level'] = assess_risk(candidate['action'], candidate['estimated_cost'], alarm_name)
+
+    primary = candidates[0]
+    ranked = rank(candidates)
+    cheapest_acceptable = next((c for c in ranked if c['risk_level'] == 'LOW'), None)
+
+    breakdown = {'operational': True}
+    if primary['action'] == 'SCALE_UP':
+        breakdown = {k: primary[k] for k in ('instance_type', 'region', 'instances', 'hours', 'hourly_price')}
+
     return {
-        'estimated_cost': estimated_cost,
-        'risk_level': risk_level,
-        'currency': 'USD'
+        'estimated_cost': primary['estimated_cost'],
+        'risk_level': primary['risk_level'],
+        'currency': 'USD',
+        'cost_breakdown': breakdown,
+        'candidates': ranked,
+        'cheapest_acceptable': cheapest_acceptable,
+        'pricing_source': get_pricing_index().metadata().get('built_at')
     }
@@ -0,0 +1,105 @@
+"""
+Memory-mapped on-demand price index.
+
+tools/build_pricing_index.py turns AWS Price List bulk offer files into this
+file offline; the Lambda only ever maps it and probes it, so the raw offer
+JSON (hundreds of MB for EC2) is never parsed at run time.
+
+Layout (little-endian):
+
+    header   magic 'PRIX', version u32, slot_count u32, entry_count u32,
+             pool_offset u64, meta_offset u64
+    slots    slot_count x (key_hash u64, key_offset u32, key_len u32, price f64)
+    pool     the keys, UTF-8, back to back
+    meta     JSON: source offers, publication dates, build time
+
+A key is 'service|region|instance_type|operating_system|tenancy', lower-cased.
+Slots are an open-addressing hash table (linear probing, at most half full),
+so a lookup is a hash plus, almost always, one slot read.
+"""
+import hashlib
+import json
+import mmap
+import struct
+
+MAGIC = b'PRIX'
+VERSION = 1
+HEADER = struct.Struct('<4sIIIQQ')
+SLOT = struct.Struct('<QIId')
+
+
+def make_key(service, region, instance_type, operating_system='Linux', tenancy='Shared'):
+    return '|'.join((service, region, instance_type, operating_system or '', tenancy or '')).lower()
+
+
+def key_hash(key):
+    # Stable across processes, unlike hash(); 0 marks an empty slot
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little') or 1
+
+
+def write_index(prices, path, metadata=None):
+    """
+    Writes {key: hourly_usd} (keys from make_key) as an index file.
+    """
+    slot_count = 8
+    while slot_count < len(prices) * 2:
+        slot_count *= 2
+
+    slots = [None] * slot_count
+    pool = bytearray()
+    for key, price in sorted(prices.items()):
+        encoded = key.encode('utf-8')
+        hashed = key_hash(key)
+        index = hashed % slot_count
+        while slots[index] is not None:
+            index = (index + 1) % slot_count
+        slots[index] = (hashed, len(pool), len(encoded), float(price))
+        pool += encoded
+
+    pool_offset = HEADER.size + slot_count * SLOT.size
+    meta = json.dumps(metadata or {}, sort_keys=True).encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, slot_count, len(prices), pool_offset, pool_offset + len(pool)))
+        for slot in slots:
+            f.write(SLOT.pack(*slot) if slot else SLOT.pack(0, 0, 0, 0.0))
+        f.write(pool)
+        f.write(meta)
+
+
+class PricingIndex:
+    """
+    Read side of the index. Opening maps the file; nothing is read up front.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.slot_count, self.entry_count, self._pool_offset, self._meta_offset = \
+            HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} pricing index")
+
+    def hourly_price(self, service, region, instance_type, operating_system='Linux', tenancy='Shared'):
+        """
+        On-demand USD per hour, or None if the index has no such product.
+        """
+        key = make_key(service, region, instance_type, operating_system, tenancy)
+        encoded = key.encode('utf-8')
+        hashed = key_hash(key)
+        index = hashed % self.slot_count
+        for _ in range(self.slot_count):
+            slot_hash, key_offset, key_len, price = SLOT.unpack_from(self._map, HEADER.size + index * SLOT.size)
+            if slot_hash == 0:
+                return None
+            if slot_hash == hashed:
+                start = self._pool_offset + key_offset
+                if self._map[start:start + key_len] == encoded:
+                    return price
+            index = (index + 1) % self.slot_count
+        return None
+
+    def metadata(self):
+        return json.loads(self._map[self._meta_offset:] or b'{}')
+
+    def close(self):
+        self._map.close()
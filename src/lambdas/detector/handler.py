@@ -2,69 +2,446 @@ import json
 import logging
 import os
 import uuid
-import boto3
+import hashlib
+import time
+import aws_clients
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-dynamodb = boto3.resource('dynamodb')
-sfn = boto3.client('stepfunctions')
+dynamodb = aws_clients.lazy_resource('dynamodb')
+sfn = aws_clients.lazy_client('stepfunctions')
 
 TABLE_NAME = os.environ['TABLE_NAME']
 STATE_MACHINE_ARN = os.environ['STATE_MACHINE_ARN']
+FINGERPRINT_TABLE_NAME = os.environ.get('FINGERPRINT_TABLE_NAME')
+# Repeat alarms inside this window attach to the open incident instead of starting a new workflow
+SUPPRESSION_WINDOW_SECONDS = int(os.environ.get('SUPPRESSION_WINDOW_SECONDS', '900'))
+# Upper bound on concurrent start_execution calls in batch mode
+MAX_WORKERS = int(os.environ.get('MAX_WORKERS', '8'))
 
-def handler(event, context):
-    logger.info("Received event: %s", json.dumps(event))
+def extract_dimensions(detail):
+    """
+    Collects metric dimensions from the alarm configuration.
+    Metric math alarms carry several metrics, so all of them are merged.
+    """
+    dimensions = {}
+    for metric in detail.get('configuration', {}).get('metrics', []):
+        metric_dims = metric.get('metricStat', {}).get('metric', {}).get('dimensions', {})
+        dimensions.update(metric_dims)
+    return dimensions
+
+def extract_dimension_sets(detail):
+    """
+    Dimensions of each metric behind the alarm, kept apart so the healer can
+    resolve one target per metric (e.g. every instance of a multi-metric alarm).
+    """
+    dimension_sets = []
+    for metric in detail.get('configuration', {}).get('metrics', []):
+        metric_dims = metric.get('metricStat', {}).get('metric', {}).get('dimensions', {})
+        if metric_dims and metric_dims not in dimension_sets:
+            dimension_sets.append(metric_dims)
+    return dimension_sets
+
+def compute_fingerprint(alarm_name, dimensions, account):
+    """
+    Stable fingerprint for an alarm source: same alarm, same dimensions, same account.
+    """
+    canonical = json.dumps({
+        'alarm_name': alarm_name,
+        'dimensions': dimensions,
+        'account': account
+    }, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def claim_fingerprint(fingerprint, incident_id, resolved_timestamp, alarm_name, occurrences=1, record_ids=None):
+    """
+    Conditionally claims the fingerprint for a new incident.
+    Returns None if the claim succeeded, otherwise the currently open fingerprint item.
+    With record_ids (SQS message ids), each record is counted as an occurrence at most once.
+    """
+    if not FINGERPRINT_TABLE_NAME:
+        return None
+
+    table = dynamodb.Table(FINGERPRINT_TABLE_NAME)
+    now = int(time.time())
+    item = {
+        'fingerprint': fingerprint,
+        'incident_id': incident_id,
+        'incident_timestamp': resolved_timestamp,
+        'alarm_name': alarm_name,
+        'occurrences': len(record_ids) if record_ids else occurrences,
+        'first_seen': now,
+        'last_seen': now,
+        'expires_at': now + SUPPRESSION_WINDOW_SECONDS
+    }
+    if record_ids:
+        item['counted_records'] = set(record_ids)
+
+    # The open claim can be released between our failed put and the update; then claim again
+    for _ in range(3):
+        try:
+            table.put_item(
+                Item=item,
+                # Either nobody owns this fingerprint or the previous suppression window is over
+                ConditionExpression="attribute_not_exists(fingerprint) OR expires_at < :now",
+                ExpressionAttributeValues={':now': now}
+            )
+            return None
+        except dynamodb.meta.client.exceptions.ConditionalCheckFailedException:
+            pass
+
+        if record_ids:
+            open_item = count_occurrences(table, fingerprint, record_ids, now)
+        else:
+            open_item = add_occurrences(table, fingerprint, occurrences, now)
+        if open_item:
+            return open_item
+        logger.info("Fingerprint %s was released while coalescing, claiming it again", fingerprint)
+
+    raise RuntimeError(f"Could not claim or coalesce into fingerprint {fingerprint}")
 
+def add_occurrences(table, fingerprint, occurrences, now):
+    """
+    Bumps the open fingerprint's occurrence count. Returns the item, or None if
+    the fingerprint is no longer claimed (the update never creates a bare item).
+    """
     try:
-        # Parse CloudWatch Alarm event
-        detail = event.get('detail', {})
-        alarm_name = detail.get('alarmName')
-        state_value = detail.get('state', {}).get('value')
-        reason = detail.get('state', {}).get('reason')
-        timestamp = detail.get('state', {}).get('timestamp')
-
-        if state_value != 'ALARM':
-            logger.info("Alarm state is %s, ignoring.", state_value)
-            return {'status': 'ignored'}
+        response = table.update_item(
+            Key={'fingerprint': fingerprint},
+            UpdateExpression="ADD occurrences :n SET last_seen = :now",
+            ConditionExpression="attribute_exists(incident_id)",
+            ExpressionAttributeValues={':n': occurrences, ':now': now},
+            ReturnValues='ALL_NEW'
+        )
+        return response['Attributes']
+    except dynamodb.meta.client.exceptions.ConditionalCheckFailedException:
+        return None
 
-        incident_id = str(uuid.uuid4())
-        
-        resolved_timestamp = timestamp or datetime.utcnow().isoformat()
-        
-        # Save to DynamoDB
-        table = dynamodb.Table(TABLE_NAME)
-        item = {
-            'incident_id': incident_id,
-            'timestamp': resolved_timestamp,
-            'alarm_name': alarm_name,
-            'reason': reason,
-            'status': 'DETECTED',
-            'created_at': datetime.utcnow().isoformat()
-        }
-        table.put_item(Item=item)
-        logger.info("Saved incident %s to DynamoDB", incident_id)
-
-        # Start Step Functions Execution
-        sfn_input = {
-            'incident_id': incident_id,
-            'alarm_name': alarm_name,
-            'reason': reason,
-            'timestamp': resolved_timestamp
-        }
-        
+def count_occurrences(table, fingerprint, record_ids, now):
+    """
+    Adds the records to the open fingerprint's occurrence count. Counted message
+    ids are kept on the item, so an SQS redelivery (e.g. after a resumed claim)
+    does not count the same alarm twice. Returns the fingerprint item, or None
+    if the fingerprint is no longer claimed.
+    """
+    pending = list(record_ids)
+    while True:
+        values = {f":r{i}": record_id for i, record_id in enumerate(pending)}
+        not_counted = ' AND '.join(f"NOT contains(counted_records, {name})" for name in values)
+        try:
+            response = table.update_item(
+                Key={'fingerprint': fingerprint},
+                UpdateExpression="ADD occurrences :n, counted_records :ids SET last_seen = :now",
+                ConditionExpression=f"attribute_exists(incident_id) AND {not_counted}",
+                ExpressionAttributeValues={':n': len(pending), ':ids': set(pending), ':now': now, **values},
+                ReturnValues='ALL_NEW'
+            )
+            return response['Attributes']
+        except dynamodb.meta.client.exceptions.ConditionalCheckFailedException:
+            item = table.get_item(Key={'fingerprint': fingerprint}, ConsistentRead=True).get('Item')
+            if not item or 'incident_id' not in item:
+                return None
+            # Some of these were counted on an earlier delivery; count only the rest
+            counted = item.get('counted_records') or set()
+            remaining = [record_id for record_id in pending if record_id not in counted]
+            if not remaining or len(remaining) == len(pending):
+                return item
+            pending = remaining
+
+def release_fingerprint(fingerprint, incident_id):
+    """
+    Drops a claim whose incident never made it, so the next alarm opens a fresh incident.
+    """
+    if not FINGERPRINT_TABLE_NAME:
+        return
+    try:
+        dynamodb.Table(FINGERPRINT_TABLE_NAME).delete_item(
+            Key={'fingerprint': fingerprint},
+            ConditionExpression="incident_id = :id",
+            ExpressionAttributeValues={':id': incident_id}
+        )
+    except Exception as e:
+        logger.warning("Failed to release fingerprint %s: %s", fingerprint, e)
+
+def abandon_incident(incident_id, timestamp, error):
+    """
+    Marks an incident whose workflow never started as START_FAILED, so it does
+    not sit in DETECTED forever. A redelivered alarm writes it back as DETECTED.
+    """
+    try:
+        dynamodb.Table(TABLE_NAME).update_item(
+            Key={'incident_id': incident_id, 'timestamp': timestamp},
+            UpdateExpression="SET #s = :failed, start_error = :e",
+            # Only a row we wrote and nothing has picked up yet; never creates one
+            ConditionExpression="#s = :detected",
+            ExpressionAttributeNames={'#s': 'status'},
+            ExpressionAttributeValues={':failed': 'START_FAILED', ':detected': 'DETECTED', ':e': str(error)[:256]}
+        )
+    except Exception as e:
+        if aws_clients.error_code(e) != 'ConditionalCheckFailedException':
+            logger.warning("Failed to mark incident %s as START_FAILED: %s", incident_id, e)
+
+def record_occurrence(open_incident, reason, timestamp):
+    """
+    Attaches a repeat alarm to the open incident as an occurrence.
+    """
+    table = dynamodb.Table(TABLE_NAME)
+    try:
+        table.update_item(
+            Key={
+                'incident_id': open_incident['incident_id'],
+                'timestamp': open_incident['incident_timestamp']
+            },
+            UpdateExpression="set occurrence_count = :c, last_occurrence_at = :t, last_occurrence_reason = :r",
+            # The incident row may not be written yet (claim resumed on another worker); don't create a bare one
+            ConditionExpression="attribute_exists(incident_id)",
+            ExpressionAttributeValues={
+                ':c': open_incident.get('occurrences', 1),
+                ':t': timestamp,
+                ':r': reason
+            }
+        )
+    except dynamodb.meta.client.exceptions.ConditionalCheckFailedException:
+        logger.info("Incident %s not written yet, occurrence kept on the fingerprint only", open_incident['incident_id'])
+
+def parse_alarm_event(event):
+    """
+    Extracts the fields we need from a CloudWatch Alarm State Change event.
+    Returns None for events that are not in ALARM state.
+    """
+    detail = event.get('detail', {})
+    state_value = detail.get('state', {}).get('value')
+
+    if state_value != 'ALARM':
+        logger.info("Alarm state is %s, ignoring.", state_value)
+        return None
+
+    alarm_name = detail.get('alarmName')
+    timestamp = detail.get('state', {}).get('timestamp')
+    dimensions = extract_dimensions(detail)
+
+    return {
+        'alarm_name': alarm_name,
+        'reason': detail.get('state', {}).get('reason'),
+        'timestamp': timestamp or datetime.utcnow().isoformat(),
+        'fingerprint': compute_fingerprint(alarm_name, dimensions, event.get('account')),
+        'dimensions': extract_dimension_sets(detail)
+    }
+
+def build_incident_item(incident_id, alarm, occurrences=1):
+    return {
+        'incident_id': incident_id,
+        'timestamp': alarm['timestamp'],
+        'alarm_name': alarm['alarm_name'],
+        'reason': alarm['reason'],
+        'status': 'DETECTED',
+        'fingerprint': alarm['fingerprint'],
+        'occurrence_count': occurrences,
+        'created_at': datetime.utcnow().isoformat()
+    }
+
+def start_workflow(incident_id, alarm):
+    sfn_input = {
+        'incident_id': incident_id,
+        'alarm_name': alarm['alarm_name'],
+        'reason': alarm['reason'],
+        'timestamp': alarm['timestamp'],
+        'dimensions': alarm['dimensions']
+    }
+
+    try:
         response = sfn.start_execution(
             stateMachineArn=STATE_MACHINE_ARN,
             name=f"incident-{incident_id}",
             input=json.dumps(sfn_input)
         )
-        
-        logger.info("Started Step Function execution: %s", response['executionArn'])
-        
+    except sfn.exceptions.ExecutionAlreadyExists:
+        # Redelivered record whose workflow was already started on a previous attempt
+        logger.info("Execution for incident %s already exists", incident_id)
+        return None
+
+    logger.info("Started Step Function execution: %s", response['executionArn'])
+    return response['executionArn']
+
+def process_batch(records):
+    """
+    Processes a batch of (record_id, event) pairs.
+
+    Alarms sharing a fingerprint are coalesced inside the batch first, then each
+    distinct fingerprint is claimed once. New incidents are persisted with a
+    single batch_writer and their workflows are started through a bounded pool.
+    Returns the list of record ids that failed.
+    """
+    failed = []
+    groups = {}
+
+    for record_id, event in records:
+        try:
+            alarm = parse_alarm_event(event)
+        except Exception as e:
+            logger.error("Failed to parse record %s: %s", record_id, e)
+            failed.append(record_id)
+            continue
+        if not alarm:
+            continue
+        group = groups.setdefault(alarm['fingerprint'], {'alarm': alarm, 'record_ids': []})
+        group['record_ids'].append(record_id)
+
+    new_incidents = []
+    coalesced = 0
+
+    for fingerprint, group in groups.items():
+        alarm = group['alarm']
+        occurrences = len(group['record_ids'])
+        # Derive the incident id from the leading record so SQS redeliveries stay idempotent
+        incident_id = str(uuid.uuid5(uuid.NAMESPACE_URL, f"{fingerprint}/{group['record_ids'][0]}"))
+        try:
+            open_incident = claim_fingerprint(fingerprint, incident_id, alarm['timestamp'], alarm['alarm_name'],
+                                              occurrences, group['record_ids'])
+        except Exception as e:
+            logger.error("Failed to claim fingerprint %s: %s", fingerprint, e)
+            failed.extend(group['record_ids'])
+            continue
+
+        if open_incident and open_incident['incident_id'] != incident_id:
+            try:
+                record_occurrence(open_incident, alarm['reason'], alarm['timestamp'])
+            except Exception as e:
+                logger.warning("Failed to record occurrence on %s: %s", open_incident['incident_id'], e)
+            coalesced += occurrences
+            continue
+
+        # Duplicates inside the batch attach to the incident we are about to open
+        coalesced += occurrences - 1
+        # A claim we already own means a previous attempt got past the claim; don't reset the item
+        resumed = open_incident is not None
+        new_incidents.append((incident_id, alarm, group['record_ids'], occurrences, resumed))
+
+    if new_incidents:
+        try:
+            table = dynamodb.Table(TABLE_NAME)
+            with table.batch_writer(overwrite_by_pkeys=['incident_id', 'timestamp']) as batch:
+                for incident_id, alarm, _, occurrences, resumed in new_incidents:
+                    if not resumed:
+                        batch.put_item(Item=build_incident_item(incident_id, alarm, occurrences))
+            logger.info("Saved %d incidents to DynamoDB", len(new_incidents))
+        except Exception as e:
+            logger.error("Failed to persist incident batch: %s", e)
+            for incident_id, alarm, record_ids, _, _ in new_incidents:
+                # batch_writer may have flushed some rows before failing
+                abandon_incident(incident_id, alarm['timestamp'], e)
+                release_fingerprint(alarm['fingerprint'], incident_id)
+                failed.extend(record_ids)
+            new_incidents = []
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        futures = [
+            (pool.submit(start_workflow, incident_id, alarm), incident_id, alarm, record_ids)
+            for incident_id, alarm, record_ids, _, _ in new_incidents
+        ]
+        for future, incident_id, alarm, record_ids in futures:
+            try:
+                future.result()
+            except Exception as e:
+                logger.error("Failed to start workflow for incident %s: %s", incident_id, e)
+                abandon_incident(incident_id, alarm['timestamp'], e)
+                release_fingerprint(alarm['fingerprint'], incident_id)
+                failed.extend(record_ids)
+
+    logger.info(
+        "Batch processed: %d records, %d new incidents, %d coalesced, %d failed",
+        len(records), len(new_incidents), coalesced, len(failed)
+    )
+    return {
+        'failed': failed,
+        'incidents': len(new_incidents),
+        'coalesced': coalesced
+    }
+
+def handle_sqs_batch(event):
+    """
+    SQS event source: each message body is an EventBridge alarm event.
+    Failed messages are reported back so only they are redelivered.
+    """
+    records = []
+    for record in event['Records']:
+        try:
+            body = json.loads(record['body'])
+        except Exception as e:
+            logger.error("Invalid message body in %s: %s", record['messageId'], e)
+            body = None
+        records.append((record['messageId'], body))
+
+    # Unparseable bodies fall through parse_alarm_event and are reported as failures
+    result = process_batch(records)
+    return {
+        'batchItemFailures': [{'itemIdentifier': message_id} for message_id in result['failed']],
+        'incidents': result['incidents'],
+        'coalesced': result['coalesced']
+    }
+
+@aws_clients.with_client_metrics
+def handler(event, context):
+    if isinstance(event, dict) and 'Records' in event:
+        logger.info("Received SQS batch of %d records", len(event['Records']))
+        return handle_sqs_batch(event)
+
+    if isinstance(event, list):
+        # Direct batch invocation with a list of EventBridge alarm events
+        logger.info("Received batch of %d events", len(event))
+        result = process_batch([(event_item.get('id', str(i)), event_item) for i, event_item in enumerate(event)])
+        return {
+            'statusCode': 200 if not result['failed'] else 207,
+            'body': json.dumps(result)
+        }
+
+    logger.info("Received event: %s", json.dumps(event))
+
+    try:
+        # Parse CloudWatch Alarm event
+        alarm = parse_alarm_event(event)
+        if not alarm:
+            return {'status': 'ignored'}
+
+        incident_id = str(uuid.uuid4())
+
+        # Deduplicate alarm storms: a flapping alarm maps to one open incident
+        open_incident = claim_fingerprint(alarm['fingerprint'], incident_id, alarm['timestamp'], alarm['alarm_name'])
+
+        if open_incident:
+            record_occurrence(open_incident, alarm['reason'], alarm['timestamp'])
+            logger.info(
+                "Coalesced alarm %s into open incident %s (occurrence %s)",
+                alarm['alarm_name'], open_incident['incident_id'], open_incident.get('occurrences')
+            )
+            return {
+                'statusCode': 200,
+                'body': json.dumps({
+                    'incident_id': open_incident['incident_id'],
+                    'coalesced': 1,
+                    'occurrences': int(open_incident.get('occurrences', 1))
+                })
+            }
+
+        try:
+            # Save to DynamoDB
+            table = dynamodb.Table(TABLE_NAME)
+            table.put_item(Item=build_incident_item(incident_id, alarm))
+            logger.info("Saved incident %s to DynamoDB", incident_id)
+
+            # Start Step Functions Execution
+            start_workflow(incident_id, alarm)
+        except Exception as e:
+            abandon_incident(incident_id, alarm['timestamp'], e)
+            release_fingerprint(alarm['fingerprint'], incident_id)
+            raise
+
         return {
             'statusCode': 200,
-            'body': json.dumps({'incident_id': incident_id})
+            'body': json.dumps({'incident_id': incident_id, 'coalesced': 0})
         }
 
     except Exception as e:
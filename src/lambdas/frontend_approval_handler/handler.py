@@ -1,50 +1,160 @@
 import json
 import logging
 import os
-import boto3
+import aws_clients
+from audit import AuditWriter
+from pagination import InvalidCursor, decode_cursor, encode_cursor, page_size
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-dynamodb = boto3.resource('dynamodb')
-sfn = boto3.client('stepfunctions')
+dynamodb = aws_clients.lazy_resource('dynamodb')
+sfn = aws_clients.lazy_client('stepfunctions')
 
 TABLE_NAME = os.environ['APPROVALS_TABLE_NAME']
+STATUS_INDEX_NAME = os.environ.get('APPROVALS_STATUS_INDEX_NAME', 'status-created_at-index')
 AUDIT_TABLE_NAME = os.environ.get('AUDIT_TABLE_NAME')
 
-def write_audit_entry(approval_id, action, user, comment):
-    if not AUDIT_TABLE_NAME:
-        return
-    try:
-        table = dynamodb.Table(AUDIT_TABLE_NAME)
-        item = {
-            'IncidentID': approval_id, # Using Approval ID as correlation ID for this entry type
-            'Timestamp': datetime.now().isoformat(),
-            'EventType': 'HUMAN_DECISION',
-            'ActionType': action,
-            'Details': json.dumps({'user': user, 'comment': comment}),
-            'Component': 'FrontendApprovalHandler'
-        }
-        table.put_item(Item=item)
-        logger.info(f"Audit entry written for {approval_id}")
-    except Exception as e:
-        logger.error(f"Failed to write audit entry: {e}")
+audit_log = AuditWriter(AUDIT_TABLE_NAME, 'FrontendApprovalHandler')
 
 from decimal import Decimal
 from datetime import datetime
+import hashlib
 import time
 
+# The dashboard polls every 3 seconds; a short per-container cache absorbs
+# repeat polls (and several viewers of the same approval) without going stale
+VIEW_CACHE_SECONDS = float(os.environ.get('VIEW_CACHE_SECONDS', '2'))
+
+# Only what the dashboard renders; taskToken is never read
+APPROVAL_PROJECTION = 'approval_id, incident_id, #s, analysis, risk_assessment, created_at, expires_at, approved_by, approved_at, #c'
+INCIDENT_PROJECTION = '#s, healing_status, healing_result, verification, rollback_status'
+
+# approval_id -> (expires at, monotonic clock; body; etag)
+_view_cache = {}
+
+# Queue rows only; analysis and taskToken are not in the status index at all
+LISTING_PROJECTION = 'approval_id, incident_id, #s, created_at, expires_at, approved_by, approved_at, risk_assessment'
+LISTING_STATUSES = ['PENDING', 'APPROVED', 'REJECTED']
+
 class DecimalEncoder(json.JSONEncoder):
     def default(self, obj):
         if isinstance(obj, Decimal):
             return float(obj)
         return super(DecimalEncoder, self).default(obj)
 
+def load_approval_view(table, approval_id):
+    """
+    Approval item merged with the status of its incident, or None if there is no such approval.
+    """
+    response = table.get_item(
+        Key={'approval_id': approval_id},
+        ProjectionExpression=APPROVAL_PROJECTION,
+        ExpressionAttributeNames={'#s': 'status', '#c': 'comment'}
+    )
+    item = response.get('Item')
+    if not item:
+        return None
+
+    # Fetch Incident Status for Real-time Updates
+    incident_id = item.get('incident_id')
+    incidents_table_name = os.environ.get('INCIDENTS_TABLE_NAME')
+
+    if incident_id and incidents_table_name:
+        try:
+            from boto3.dynamodb.conditions import Key
+            inc_table = dynamodb.Table(incidents_table_name)
+            # Incidents table has composite key (incident_id + timestamp).
+            # Newest record first, and only that one.
+            inc_response = inc_table.query(
+                KeyConditionExpression=Key('incident_id').eq(incident_id),
+                ProjectionExpression=INCIDENT_PROJECTION,
+                ExpressionAttributeNames={'#s': 'status'},
+                ScanIndexForward=False,
+                Limit=1
+            )
+            inc_items = inc_response.get('Items', [])
+            if inc_items:
+                inc_item = inc_items[0]
+
+                # Merge specific fields into the response
+                item['incident_status'] = inc_item.get('status')
+                item['healing_status'] = inc_item.get('healing_status')
+                item['healing_result'] = inc_item.get('healing_result')
+                item['verification_result'] = inc_item.get('verification')
+                item['rollback_status'] = inc_item.get('rollback_status')
+        except Exception as e:
+            logger.error("Failed to fetch incident details: %s", e)
+            # Continue without incident details rather than failing
+
+    return item
+
+
+def list_approvals(params):
+    """
+    GET /approvals?status=PENDING&limit=25&cursor=...&order=asc|desc
+
+    One bounded query on the status index, newest first unless order=asc
+    (oldest-first suits working through the pending queue).
+    """
+    status = (params.get('status') or 'PENDING').upper()
+    if status not in LISTING_STATUSES:
+        return {'statusCode': 400, 'body': json.dumps({'error': f"status must be one of {LISTING_STATUSES}"})}
+
+    try:
+        start_key = decode_cursor(params.get('cursor'), ['approval_id', 'status', 'created_at'])
+        if start_key and start_key['status'] != status:
+            raise InvalidCursor("Cursor belongs to a different status")
+    except InvalidCursor as e:
+        return {'statusCode': 400, 'body': json.dumps({'error': str(e)})}
+
+    query = {
+        'IndexName': STATUS_INDEX_NAME,
+        'KeyConditionExpression': '#s = :s',
+        'ProjectionExpression': LISTING_PROJECTION,
+        'ExpressionAttributeNames': {'#s': 'status'},
+        'ExpressionAttributeValues': {':s': status},
+        'ScanIndexForward': params.get('order') == 'asc',
+        'Limit': page_size(params.get('limit')),
+    }
+    if start_key:
+        query['ExclusiveStartKey'] = start_key
+
+    response = dynamodb.Table(TABLE_NAME).query(**query)
+    return {
+        'statusCode': 200,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*',
+            'Cache-Control': 'no-cache'
+        },
+        'body': json.dumps({
+            'items': response.get('Items', []),
+            'next_cursor': encode_cursor(response.get('LastEvaluatedKey'))
+        }, cls=DecimalEncoder)
+    }
+
+
+def etag_matches(event, etag):
+    # HTTP API lowercases header names
+    header = (event.get('headers') or {}).get('if-none-match')
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(',')]
+    return '*' in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+@aws_clients.with_client_metrics
+@audit_log.flush_after
 def handler(event, context):
     logger.info("Received event: %s", json.dumps(event))
     
     http_method = event.get('requestContext', {}).get('http', {}).get('method')
-    path_params = event.get('pathParameters', {})
+
+    if event.get('routeKey') == 'GET /approvals':
+        return list_approvals(event.get('queryStringParameters') or {})
+
+    path_params = event.get('pathParameters') or {}
     approval_id = path_params.get('approvalId')
     
     if not approval_id:
@@ -53,50 +163,31 @@ def handler(event, context):
     table = dynamodb.Table(TABLE_NAME)
     
     if http_method == 'GET':
-        response = table.get_item(Key={'approval_id': approval_id})
-        item = response.get('Item')
-        
-        if not item:
-            return {'statusCode': 404, 'body': json.dumps({'error': 'Not found'})}
-            
-        # Remove taskToken from response for security
-        if 'taskToken' in item:
-            del item['taskToken']
+        cached = _view_cache.get(approval_id)
+        if cached and cached[0] > time.monotonic():
+            body, etag = cached[1], cached[2]
+        else:
+            view = load_approval_view(table, approval_id)
+            if not view:
+                return {'statusCode': 404, 'body': json.dumps({'error': 'Not found'})}
+            # sort_keys keeps the body (and so the ETag) stable for the same data
+            body = json.dumps(view, cls=DecimalEncoder, sort_keys=True)
+            etag = '"' + hashlib.sha256(body.encode('utf-8')).hexdigest()[:32] + '"'
+            _view_cache[approval_id] = (time.monotonic() + VIEW_CACHE_SECONDS, body, etag)
+
+        headers = {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*',
+            'Cache-Control': 'no-cache',
+            'ETag': etag
+        }
+        if etag_matches(event, etag):
+            return {'statusCode': 304, 'headers': headers}
 
-        # Fetch Incident Status for Real-time Updates
-        incident_id = item.get('incident_id')
-        incidents_table_name = os.environ.get('INCIDENTS_TABLE_NAME')
-        
-        if incident_id and incidents_table_name:
-            try:
-                inc_table = dynamodb.Table(incidents_table_name)
-                # Incidents table has composite key (incident_id + timestamp). 
-                # We query by Partition Key since we might not have the exact timestamp.
-                inc_response = inc_table.query(
-                    KeyConditionExpression=boto3.dynamodb.conditions.Key('incident_id').eq(incident_id)
-                )
-                inc_items = inc_response.get('Items', [])
-                if inc_items:
-                    # Expecting one, but take the latest if multiple
-                    inc_item = inc_items[0] 
-                    
-                    # Merge specific fields into the response
-                    item['incident_status'] = inc_item.get('status')
-                    item['healing_status'] = inc_item.get('healing_status')
-                    item['healing_result'] = inc_item.get('healing_result')
-                    item['verification_result'] = inc_item.get('verification')
-                    item['rollback_status'] = inc_item.get('rollback_status')
-            except Exception as e:
-                logger.error("Failed to fetch incident details: %s", e)
-                # Continue without incident details rather than failing
-            
         return {
             'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps(item, cls=DecimalEncoder)
+            'headers': headers,
+            'body': body
         }
         
     elif http_method == 'POST':
@@ -119,7 +210,6 @@ def handler(event, context):
             return {'statusCode': 404, 'body': json.dumps({'error': 'Not found'})}
             
         # Check Expiry
-        import time
         if item.get('expires_at') and int(item.get('expires_at')) < int(time.time()):
              return {'statusCode': 410, 'body': json.dumps({'error': 'Approval request expired'})}
              
@@ -145,8 +235,11 @@ def handler(event, context):
              # Already processed
              return {'statusCode': 409, 'body': json.dumps({'error': 'Request already processed', 'status': item.get('status')})}
         
+        _view_cache.pop(approval_id, None)
+
         # Write Audit Log
-        write_audit_entry(approval_id, action, user_email, comment)
+        # Using Approval ID as correlation ID for this entry type
+        audit_log.record(approval_id, 'HUMAN_DECISION', action, {'user': user_email, 'comment': comment})
 
         # Resume Step Functions
         try:
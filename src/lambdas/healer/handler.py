@@ -1,40 +1,155 @@
 import json
 import logging
 import os
-import boto3
+import aws_clients
+import threading
 import time
-from datetime import datetime
+import uuid
+from audit import AuditWriter
+from automation_groups import complete_group_member, summarize
+from lease import LeaseManager, LeaseContendedError
+from registry import action, get_action, fan_out
+from remediation import ROLLBACK_ACTIONS, fallback_for
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-dynamodb = boto3.resource('dynamodb')
+dynamodb = aws_clients.lazy_resource('dynamodb')
 # ecs client removed, we use ssm now
-ssm = boto3.client('ssm')
+ssm = aws_clients.lazy_client('ssm')
+sfn = aws_clients.lazy_client('stepfunctions')
+ecs = aws_clients.lazy_client('ecs')
 
 TABLE_NAME = os.environ['TABLE_NAME']
 SSM_DOC_RESTART_SERVICE = os.environ.get('SSM_DOC_RESTART_SERVICE')
 SSM_DOC_SCALE_UP = os.environ.get('SSM_DOC_SCALE_UP')
+SSM_DOC_REBOOT_INSTANCE = os.environ.get('SSM_DOC_REBOOT_INSTANCE', 'AWS-RestartEC2Instance')
 AUDIT_TABLE_NAME = os.environ.get('AUDIT_TABLE_NAME')
 HEALER_ROLE_ARN = os.environ.get('HEALER_ROLE_ARN') # Need to inject this via Terraform
+AUTOMATION_TASKS_TABLE_NAME = os.environ.get('AUTOMATION_TASKS_TABLE_NAME')
+AUTOMATION_TASK_TTL_SECONDS = int(os.environ.get('AUTOMATION_TASK_TTL_SECONDS', '86400'))
+LEASE_TABLE_NAME = os.environ.get('LEASE_TABLE_NAME')
+LEASE_TTL_SECONDS = int(os.environ.get('LEASE_TTL_SECONDS', '900'))
+MAX_WORKERS = int(os.environ.get('MAX_WORKERS', '10'))
+MAX_TARGETS = int(os.environ.get('MAX_TARGETS', '50'))
 
-def write_audit_entry(incident_id, action_type, details):
-    if not AUDIT_TABLE_NAME:
-        return
+audit_log = AuditWriter(AUDIT_TABLE_NAME, 'HealerLambda')
+
+class HealingIncomplete(Exception):
+    """
+    Something failed after the action had already started on its targets.
+    The workflow must not retry these: a retry would start the remediation again.
+    """
+
+# Resource instances are not thread-safe, so each fan-out worker gets its own lease table
+_local = threading.local()
+
+def get_lease_manager():
+    if not LEASE_TABLE_NAME:
+        return None
+    if not hasattr(_local, 'lease_manager'):
+        _local.lease_manager = LeaseManager(aws_clients.thread_resource('dynamodb').Table(LEASE_TABLE_NAME), LEASE_TTL_SECONDS)
+    return _local.lease_manager
+
+def complete_task(task_token, result):
     try:
-        table = dynamodb.Table(AUDIT_TABLE_NAME)
-        item = {
-            'IncidentID': incident_id,
-            'Timestamp': datetime.now().isoformat(),
-            'EventType': 'HEALING_ACTION',
-            'ActionType': action_type,
-            'Details': json.dumps(details),
-            'Component': 'HealerLambda'
+        sfn.send_task_success(taskToken=task_token, output=json.dumps(result))
+    except (sfn.exceptions.TaskTimedOut, sfn.exceptions.InvalidToken) as e:
+        # The workflow gave up on this task already; nothing left to resume
+        logger.warning(f"Could not resume workflow: {e}")
+
+def register_automation_group(task_token, event, action, results):
+    """
+    Parks the workflow's task token until every automation started for it finishes.
+
+    A group item holds the token, the per-target results and a count of the
+    automations still running. Each automation's own item points at the group;
+    the automation completion handler writes final_result to that item, so
+    whichever side arrives second sees both and applies the result to the
+    group. Whoever takes pending to zero resumes the workflow.
+    Returns the final per-target results if everything already finished, else None.
+    """
+    table = dynamodb.Table(AUTOMATION_TASKS_TABLE_NAME)
+    expires_at = int(time.time()) + AUTOMATION_TASK_TTL_SECONDS
+    running = [r for r in results if r['status'] == 'IN_PROGRESS' and r.get('execution_id')]
+
+    group_id = f"group:{uuid.uuid4()}"
+    table.put_item(Item={
+        'execution_id': group_id,
+        'task_token': task_token,
+        'incident_id': event.get('incident_id'),
+        'incident_timestamp': event.get('timestamp'),
+        'action_type': event.get('action_type', 'PRIMARY'),
+        'healing_action': action,
+        'pending': len(running),
+        'results': {r['target']: json.dumps(r) for r in results},
+        'expires_at': expires_at
+    })
+
+    group = None
+    for result in running:
+        execution_id = result['execution_id']
+        response = table.update_item(
+            Key={'execution_id': execution_id},
+            UpdateExpression=(
+                "SET group_id = :g, target = :t, incident_id = :i, healing_action = :a, "
+                "lease_resource = :l, expires_at = if_not_exists(expires_at, :exp)"
+            ),
+            ExpressionAttributeValues={
+                ':g': group_id,
+                ':t': result['target'],
+                ':i': event.get('incident_id'),
+                ':a': action,
+                ':l': result.get('lease_resource'),
+                ':exp': expires_at
+            },
+            ReturnValues='ALL_NEW'
+        )
+        final_result = response['Attributes'].get('final_result')
+        if final_result:
+            logger.info(f"SSM Execution {execution_id} finished before its task token was registered")
+            if result.get('lease_resource'):
+                get_lease_manager().release(result['lease_resource'], event.get('incident_id'))
+            final = dict(json.loads(final_result), target=result['target'])
+            group = complete_group_member(table, group_id, result['target'], final)
+
+    if group and int(group['pending']) <= 0:
+        return [json.loads(r) for r in group['results'].values()]
+    logger.info(f"Waiting on {len(running)} SSM Executions to resume the workflow ({group_id})")
+    return None
+
+def run_with_lease(resource_key, action, details, execute):
+    """
+    Runs execute() while holding the healing lease on resource_key.
+    Same-action requests for a busy resource are merged into the running one;
+    other actions raise LeaseContendedError so the workflow retries them later.
+    """
+    lease_manager = get_lease_manager()
+    if not lease_manager or not resource_key:
+        return execute()
+
+    incident_id = details.get('incident_id')
+    lease = lease_manager.acquire(resource_key, incident_id, action)
+    if lease['outcome'] == 'MERGED':
+        return {
+            "status": "MERGED",
+            "message": f"{action} already running on {resource_key} for incident {lease['holder']}",
+            "lease": lease
         }
-        table.put_item(Item=item)
-        logger.info(f"Audit entry written for {incident_id}")
-    except Exception as e:
-        logger.error(f"Failed to write audit entry: {e}")
+
+    try:
+        result = execute()
+    except Exception:
+        lease_manager.release(resource_key, incident_id)
+        raise
+
+    if result.get('status') == 'IN_PROGRESS' and result.get('execution_id'):
+        # Held until the automation finishes; the completion handler releases it
+        result['lease_resource'] = resource_key
+    else:
+        lease_manager.release(resource_key, incident_id)
+    result['lease'] = lease
+    return result
 
 def execute_ssm_automation(document_name, parameters):
     """
@@ -49,107 +164,172 @@ def execute_ssm_automation(document_name, parameters):
         execution_id = response['AutomationExecutionId']
         logger.info(f"SSM Execution Started: {execution_id}")
         
-        # Poll for completion
-        max_retries = 10
-        for i in range(max_retries):
-            time.sleep(2)
-            try:
-                status_response = ssm.get_automation_execution(AutomationExecutionId=execution_id)
-                status = status_response['AutomationExecution']['AutomationExecutionStatus']
-                logger.info(f"Polling SSM ID {execution_id}: {status}")
-                
-                if status in ['Success', 'Failed', 'TimedOut', 'Cancelled', 'AccessDenied']:
-                    return {
-                        "status": "SUCCESS" if status == 'Success' else "FAILED", 
-                        "message": f"SSM Execution {status}: {execution_id}", 
-                        "execution_id": execution_id
-                    }
-            except Exception as e:
-                logger.warning(f"Error polling SSM status: {e}")
-        
-        return {"status": "IN_PROGRESS", "message": f"SSM Execution still running: {execution_id}", "execution_id": execution_id}
+        # Completion arrives as an SSM status-change event; see register_automation_group
+        return {"status": "IN_PROGRESS", "message": f"SSM Execution started: {execution_id}", "execution_id": execution_id}
         
     except Exception as e:
         logger.error(f"Failed to trigger SSM: {e}")
         return {"status": "FAILED", "message": str(e)}
 
-def execute_restart_service(details):
-    # In a real app, we'd parse the resource ID from the alarm dimensions
-    cluster = os.environ.get('ECS_CLUSTER', 'default')
-    service = os.environ.get('ECS_SERVICE', 'demo-service')
-    
+# --- Target resolution from the alarm's metric dimensions ---
+
+def dimension_values(details, name):
+    values = []
+    for dimensions in details.get('dimensions') or []:
+        value = dimensions.get(name)
+        if value and value not in values:
+            values.append(value)
+    return values
+
+def resolve_auto_scaling_groups(details):
+    groups = dimension_values(details, 'AutoScalingGroupName') or [os.environ.get('ASG_NAME', 'demo-asg')]
+    return [{'id': group, 'resource_key': f"asg:{group}", 'group_name': group} for group in groups]
+
+def resolve_instances(details):
+    # Only instances the alarm names. A fleet (AutoScalingGroupName) alarm is not
+    # expanded: rebooting every instance in the group at once would take the service down.
+    instance_ids = dimension_values(details, 'InstanceId')
+    return [{'id': i, 'resource_key': f"ec2:{i}", 'instance_id': i} for i in instance_ids]
+
+def resolve_services(details):
+    pairs = []
+    for dimensions in details.get('dimensions') or []:
+        cluster = dimensions.get('ClusterName')
+        if not cluster:
+            continue
+        if dimensions.get('ServiceName'):
+            services = [dimensions['ServiceName']]
+        else:
+            # Cluster-level alarm: every service in the cluster
+            services = []
+            for page in ecs.get_paginator('list_services').paginate(cluster=cluster):
+                services.extend(arn.split('/')[-1] for arn in page['serviceArns'])
+        for service in services:
+            if (cluster, service) not in pairs:
+                pairs.append((cluster, service))
+
+    if not pairs:
+        # Alarm without ECS dimensions: the configured demo service
+        pairs = [(os.environ.get('ECS_CLUSTER', 'default'), os.environ.get('ECS_SERVICE', 'demo-service'))]
+    return [
+        {'id': f"{cluster}/{service}", 'resource_key': f"ecs:{cluster}/{service}", 'cluster': cluster, 'service': service}
+        for cluster, service in pairs
+    ]
+
+def resolve_nothing(details):
+    return [{'id': 'none'}]
+
+# --- Actions ---
+
+@action('RESTART_SERVICE', resolve_services)
+def execute_restart_service(target, details):
     if not SSM_DOC_RESTART_SERVICE:
         return {"status": "FAILED", "message": "SSM Document for Restarts not configured."}
 
+    # The doc defines assumeRole: "{{ AutomationAssumeRole }}" but we rely on the
+    # caller's credentials for now, so only the service coordinates are passed.
     params = {
-        'Cluster': [cluster],
-        'Service': [service],
-        'ExecutionRole': [HEALER_ROLE_ARN] if HEALER_ROLE_ARN else []
+        'Cluster': [target['cluster']],
+        'Service': [target['service']],
     }
-    logger.info(f"HEALER_ROLE_ARN env var: {HEALER_ROLE_ARN}")
-    logger.info(f"SSM Params: {params}")
-    
-    # We strip assume role if empty or just pass what we need. 
-    # The SSM doc requires it, but for 'aws:executeScript', standard lambda role might suffice if passed or trusted.
-    # For simplicity in this demo, we'll pass a dummy or let SSM handle the identity context if possible.
-    # Actually, automation usually needs an assume role. 
-    # We will assume the Healer Role ARN is passed or we just rely on calling identity if the doc supports it?
-    # The doc defines assumeRole: "{{ AutomationAssumeRole }}".
-    # We'll rely on the default behavior or fix the doc if needed.
-    # Let's clean up params.
-    
-    clean_params = {
-        'Cluster': [cluster],
-        'Service': [service],
-        # 'AutomationAssumeRole': [...] # Omitted for now, relying on caller creds if doc allows or update doc later
-    }
-    
-    return execute_ssm_automation(SSM_DOC_RESTART_SERVICE, clean_params)
+    return execute_ssm_automation(SSM_DOC_RESTART_SERVICE, params)
 
-def execute_scale_up(details):
-    group_name = os.environ.get('ASG_NAME', 'demo-asg')
-    
+@action('SCALE_UP', resolve_auto_scaling_groups)
+def execute_scale_up(target, details):
     if not SSM_DOC_SCALE_UP:
          return {"status": "FAILED", "message": "SSM Document for ScaleUp not configured."}
 
     params = {
-        'AutoScalingGroup': [group_name],
+        'AutoScalingGroup': [target['group_name']],
         'DesiredCapacity': ['5'] # Hardcoded scale target for demo
     }
     
     return execute_ssm_automation(SSM_DOC_SCALE_UP, params)
 
-def execute_clear_cache(details):
+@action('CLEAR_CACHE', resolve_nothing)
+def execute_clear_cache(target, details):
     logger.info("Clearing cache")
     return {"status": "SUCCESS", "message": "Cache logic not yet migrated to SSM."}
 
-def execute_reboot_instance(details):
-    logger.info("Rebooting EC2 instance")
-    # Could use AWS-RestartEC2Instance document
-    return {"status": "SUCCESS", "message": "Instance reboot logic pending migration."}
+@action('REBOOT_INSTANCE', resolve_instances)
+def execute_reboot_instance(target, details):
+    logger.info(f"Rebooting EC2 instance {target['instance_id']}")
+    params = {'InstanceId': [target['instance_id']]}
+    if HEALER_ROLE_ARN:
+        params['AutomationAssumeRole'] = [HEALER_ROLE_ARN]
+    return execute_ssm_automation(SSM_DOC_REBOOT_INSTANCE, params)
 
-def execute_scale_down(details):
-    logger.info("Scaling down service (Rollback)")
+@action('SCALE_DOWN', resolve_auto_scaling_groups)
+def execute_scale_down(target, details):
+    logger.info(f"Scaling down {target['group_name']} (Rollback)")
     return {"status": "SUCCESS", "message": "Service scaled down (Rollback)."}
 
-def execute_fallback(original_action, details):
-    logger.info(f"Executing fallback for {original_action}")
-    if original_action == 'RESTART_SERVICE':
-        return execute_reboot_instance(details)
-    else:
-        return execute_scale_up(details)
+def run_action(name, details):
+    """
+    Resolves the action's targets and runs it on all of them in parallel.
+    Returns the per-target results, or None if the action is not registered.
+    """
+    registered = get_action(name)
+    if not registered:
+        return None
 
-def execute_rollback(original_action, details):
-    logger.info(f"Executing rollback for {original_action}")
-    if original_action == 'SCALE_UP':
-        return execute_scale_down(details)
-    else:
-        return {"status": "SKIPPED", "message": f"No rollback defined for {original_action}"}
+    targets = registered['resolve'](details)
+    if details.get('only_targets'):
+        # Rerun for targets that were contended last time
+        targets = [t for t in targets if t['id'] in details['only_targets']]
+    if len(targets) > MAX_TARGETS:
+        # Acting on an arbitrary subset would look like a fix while leaving the rest untouched
+        message = f"{name} resolved {len(targets)} targets, more than MAX_TARGETS ({MAX_TARGETS}); refusing to act"
+        logger.error(message)
+        return [{"status": "FAILED", "message": message, "target": "*"}]
+
+    def run_target(target):
+        try:
+            result = run_with_lease(target.get('resource_key'), name, details,
+                                    lambda: registered['execute'](target, details))
+        except LeaseContendedError as e:
+            result = {"status": "CONTENDED", "message": str(e)}
+        except Exception as e:
+            logger.error(f"{name} failed on {target['id']}: {e}")
+            result = {"status": "FAILED", "message": str(e)}
+        result['target'] = target['id']
+        return result
+
+    results = fan_out(targets, run_target, MAX_WORKERS)
+    if results and all(r['status'] == 'CONTENDED' for r in results):
+        # Nothing could run: let the workflow retry the whole request later.
+        # Mixed runs report the contended ones in contended_targets instead.
+        raise LeaseContendedError('; '.join(r['message'] for r in results))
+    return results
 
+@aws_clients.with_client_metrics
+@audit_log.flush_after
 def handler(event, context):
     logger.info("Received event: %s", json.dumps(event))
-    
-    incident_id = event.get('incident_id')
+    task_token = event.get('taskToken')
+
+    try:
+        return heal(event, task_token)
+    except LeaseContendedError as e:
+        if not task_token:
+            raise
+        # The workflow retries LeaseContended with backoff, which queues this request
+        logger.info(f"Healing queued: {e}")
+        sfn.send_task_failure(taskToken=task_token, error='LeaseContended', cause=str(e)[:256])
+    except HealingIncomplete as e:
+        if not task_token:
+            raise
+        logger.error(f"Healing started but did not complete: {e}")
+        sfn.send_task_failure(taskToken=task_token, error='HealingIncomplete', cause=str(e)[:256])
+    except Exception as e:
+        if not task_token:
+            raise
+        # The workflow waits on the task token, not on this invocation's response,
+        # so failures have to be reported through the token
+        logger.error(f"Healing failed: {e}")
+        sfn.send_task_failure(taskToken=task_token, error='HealingFailed', cause=str(e)[:256])
+
+def heal(event, task_token=None):
     action_type = event.get('action_type', 'PRIMARY')
     
     analysis = event.get('analysis', {})
@@ -160,28 +340,62 @@ def handler(event, context):
     if not action:
         action = event.get('original_action', 'UNKNOWN')
 
-    result = {"status": "SKIPPED", "message": "No action taken."}
-    
     if action_type == 'FALLBACK':
-        result = execute_fallback(action, event)
+        logger.info(f"Executing fallback for {action}")
+        name = fallback_for(action)
     elif action_type == 'ROLLBACK':
-        result = execute_rollback(action, event)
+        logger.info(f"Executing rollback for {action}")
+        name = ROLLBACK_ACTIONS.get(action)
     else: # PRIMARY
-        if action == 'RESTART_SERVICE':
-            result = execute_restart_service(event)
-        elif action == 'SCALE_UP':
-            result = execute_scale_up(event)
-        elif action == 'CLEAR_CACHE':
-            result = execute_clear_cache(event)
-        elif action == 'REBOOT_INSTANCE':
-            result = execute_reboot_instance(event)
-        elif action == 'NONE':
-            result = {"status": "SKIPPED", "message": "AI recommended no action."}
-        else:
+        name = action
+
+    if action_type == 'ROLLBACK' and not name:
+        result = {"status": "SKIPPED", "message": f"No rollback defined for {action}"}
+        results = []
+    elif name == 'NONE':
+        result = {"status": "SKIPPED", "message": "AI recommended no action."}
+        results = []
+    else:
+        results = run_action(name, event)
+        if results is not None and event.get('only_targets'):
+            # Keep what the earlier run already did on the other targets
+            rerun = set(event['only_targets'])
+            results = [r for r in event.get('previous_targets') or [] if r['target'] not in rerun] + results
+        if results is None:
             result = {"status": "UNKNOWN", "message": f"Unknown action: {action}"}
-            
+        elif not results and action_type == 'FALLBACK':
+            # The primary action already failed; a fallback that cannot act must not read as a skip
+            result = {"status": "FAILED", "message": f"Fallback {name} found no targets for this alarm."}
+        elif not results:
+            result = {"status": "SKIPPED", "message": f"No targets found for {name}."}
+        else:
+            result = summarize(name, results, action_type)
+
+    try:
+        return finish_healing(event, task_token, action, name, result, results)
+    except Exception as e:
+        if not any(r['status'] in ('IN_PROGRESS', 'SUCCESS') for r in results or []):
+            raise
+        # Past this point the remediation has run on at least one target
+        raise HealingIncomplete(f"{name} started but could not be completed: {e}") from e
+
+def finish_healing(event, task_token, action, name, result, results):
+    """
+    Waits on any running automations, records the outcome and resumes the workflow.
+    """
+    incident_id = event.get('incident_id')
+    action_type = event.get('action_type', 'PRIMARY')
+
+    pending = False
+    if task_token and result['status'] == 'IN_PROGRESS':
+        final_results = register_automation_group(task_token, event, name, results)
+        if final_results:
+            result = summarize(name, final_results, action_type)
+        else:
+            pending = True
+
     # Audit Log (Critical fixed)
-    write_audit_entry(incident_id, action_type, {
+    audit_log.record(incident_id, 'HEALING_ACTION', action_type, {
         'action': action,
         'result': result,
         'reason': event.get('reason', 'N/A')
@@ -214,5 +428,8 @@ def handler(event, context):
             )
     except Exception as e:
         logger.error(f"Failed to update DynamoDB: {e}")
+
+    if task_token and not pending:
+        complete_task(task_token, result)
     
     return result
@@ -0,0 +1,132 @@
+import logging
+import time
+
+from aws_clients import error_code
+
+logger = logging.getLogger()
+
+
+class LeaseContendedError(Exception):
+    """
+    Another incident holds the lease on this resource with a different action.
+    Raised so the workflow retries the task later, which queues the request.
+    """
+
+
+class LeaseManager:
+    """
+    One active remediation per target resource, backed by DynamoDB conditional writes.
+
+    A lease is an item keyed by resource (e.g. asg:web-asg) naming the holding
+    incident and its action. It can be taken when absent, expired or already
+    held by the same incident. When another incident holds it:
+      - with the same action, the request is merged: the running remediation
+        already does what was asked, so the caller should short-circuit;
+      - with a different action, LeaseContendedError is raised so the
+        request is retried once the lease is released or expires.
+    Contended requests leave a small waiter item so the eventual holder can
+    report how long it queued.
+    """
+
+    def __init__(self, table, ttl_seconds=900):
+        self.table = table
+        self.ttl_seconds = ttl_seconds
+
+    def acquire(self, resource_key, holder, action):
+        """
+        Returns {'outcome': 'ACQUIRED' | 'MERGED', ...} or raises LeaseContendedError.
+        """
+        now = int(time.time())
+        try:
+            self.table.update_item(
+                Key={'resource_key': resource_key},
+                UpdateExpression="SET holder = :h, healing_action = :a, acquired_at = :now, expires_at = :exp",
+                ConditionExpression="attribute_not_exists(resource_key) OR expires_at < :now OR holder = :h",
+                ExpressionAttributeValues={
+                    ':h': holder,
+                    ':a': action,
+                    ':now': now,
+                    ':exp': now + self.ttl_seconds
+                }
+            )
+        except Exception as e:
+            if error_code(e) != 'ConditionalCheckFailedException':
+                raise
+            return self._contended(resource_key, holder, action, now)
+
+        waited = self._finish_waiting(resource_key, holder, now)
+        logger.info(f"Lease on {resource_key} acquired by {holder} after {waited}s")
+        return {'outcome': 'ACQUIRED', 'resource': resource_key, 'wait_seconds': waited}
+
+    def release(self, resource_key, holder):
+        try:
+            self.table.delete_item(
+                Key={'resource_key': resource_key},
+                ConditionExpression="holder = :h",
+                ExpressionAttributeValues={':h': holder}
+            )
+            logger.info(f"Lease on {resource_key} released by {holder}")
+        except Exception as e:
+            if error_code(e) != 'ConditionalCheckFailedException':
+                raise
+            # Expired and taken over by someone else; theirs now
+            logger.info(f"Lease on {resource_key} no longer held by {holder}")
+
+    def _contended(self, resource_key, holder, action, now):
+        try:
+            response = self.table.update_item(
+                Key={'resource_key': resource_key},
+                UpdateExpression="ADD contention_count :one",
+                ConditionExpression="attribute_exists(resource_key) AND expires_at >= :now AND holder <> :h",
+                ExpressionAttributeValues={':one': 1, ':now': now, ':h': holder},
+                ReturnValues='ALL_NEW'
+            )
+        except Exception as e:
+            if error_code(e) != 'ConditionalCheckFailedException':
+                raise
+            # Released or expired in between: try again from the top
+            return self.acquire(resource_key, holder, action)
+
+        lease = response['Attributes']
+        contention = int(lease.get('contention_count', 0))
+        if lease.get('healing_action') == action:
+            logger.info(f"{action} on {resource_key} already running for {lease['holder']}, merging {holder}")
+            return {
+                'outcome': 'MERGED',
+                'resource': resource_key,
+                'holder': lease['holder'],
+                'contention_count': contention
+            }
+
+        self._start_waiting(resource_key, holder, now)
+        logger.info(f"Lease on {resource_key} held by {lease['holder']} ({lease['healing_action']}); "
+                    f"{holder} queued, contention_count={contention}")
+        raise LeaseContendedError(
+            f"{resource_key} is being remediated by {lease['holder']} ({lease['healing_action']}); "
+            f"contention_count={contention}"
+        )
+
+    def _waiter_key(self, resource_key, holder):
+        return f"{resource_key}#waiter#{holder}"
+
+    def _start_waiting(self, resource_key, holder, now):
+        try:
+            self.table.put_item(
+                Item={
+                    'resource_key': self._waiter_key(resource_key, holder),
+                    'waiting_since': now,
+                    'expires_at': now + self.ttl_seconds * 4
+                },
+                ConditionExpression="attribute_not_exists(resource_key)"
+            )
+        except Exception as e:
+            if error_code(e) != 'ConditionalCheckFailedException':
+                raise
+
+    def _finish_waiting(self, resource_key, holder, now):
+        response = self.table.delete_item(
+            Key={'resource_key': self._waiter_key(resource_key, holder)},
+            ReturnValues='ALL_OLD'
+        )
+        waiter = response.get('Attributes')
+        return now - int(waiter['waiting_since']) if waiter else 0
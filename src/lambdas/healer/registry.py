@@ -0,0 +1,43 @@
+import logging
+
+logger = logging.getLogger()
+
+# action name -> {'execute': fn(target, details), 'resolve': fn(details) -> [target]}
+ACTIONS = {}
+
+
+def action(name, resolve):
+    """
+    Registers the decorated function as the executor of a healing action.
+
+    resolve(details) turns the incident (alarm name, metric dimensions) into a
+    list of targets; each target is a dict with at least an 'id' and, for
+    actions that must not overlap, a 'resource_key' to lease. The decorated
+    function is then called once per target as execute(target, details).
+    """
+    def register(execute):
+        ACTIONS[name] = {'execute': execute, 'resolve': resolve}
+        return execute
+    return register
+
+
+def get_action(name):
+    return ACTIONS.get(name)
+
+
+def fan_out(targets, run_target, max_workers):
+    """
+    Runs run_target over every target on a bounded thread pool and returns
+    the results in target order. run_target is expected to catch its own
+    errors and report them in its result.
+    """
+    if len(targets) == 1:
+        return [run_target(targets[0])]
+
+    # Only multi-target runs pay for the thread pool import
+    from concurrent.futures import ThreadPoolExecutor
+
+    workers = max(1, min(max_workers, len(targets)))
+    logger.info(f"Fanning out over {len(targets)} targets with {workers} workers")
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run_target, targets))
@@ -0,0 +1,84 @@
+import json
+import logging
+import os
+import aws_clients
+from decimal import Decimal
+from history import alarm_stats, query_incidents
+from pagination import InvalidCursor
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+dynamodb = aws_clients.lazy_resource('dynamodb')
+
+TABLE_NAME = os.environ['TABLE_NAME']
+ALARM_STATS_TABLE_NAME = os.environ['ALARM_STATS_TABLE_NAME']
+
+class DecimalEncoder(json.JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return int(obj) if obj == obj.to_integral_value() else float(obj)
+        return super(DecimalEncoder, self).default(obj)
+
+def respond(status_code, body):
+    return {
+        'statusCode': status_code,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*'
+        },
+        'body': json.dumps(body, cls=DecimalEncoder)
+    }
+
+def list_incidents(params):
+    """
+    GET /incidents?alarm_name=X | status=Y [&since=ISO&until=ISO&limit=N&cursor=C&order=asc]
+    """
+    if params.get('alarm_name'):
+        key_name, key_value = 'alarm_name', params['alarm_name']
+    elif params.get('status'):
+        key_name, key_value = 'status', params['status'].upper()
+    else:
+        return respond(400, {'error': 'alarm_name or status is required'})
+
+    items, next_cursor = query_incidents(
+        dynamodb.Table(TABLE_NAME),
+        key_name,
+        key_value,
+        since=params.get('since'),
+        until=params.get('until'),
+        limit=params.get('limit'),
+        cursor=params.get('cursor'),
+        newest_first=params.get('order') != 'asc'
+    )
+    return respond(200, {'items': items, 'next_cursor': next_cursor})
+
+def get_stats(params):
+    """
+    GET /incidents/stats[?alarm_name=X] - MTTR per alarm from the write-time counters.
+    """
+    stats, next_cursor = alarm_stats(
+        dynamodb.Table(ALARM_STATS_TABLE_NAME),
+        alarm_name=params.get('alarm_name'),
+        limit=params.get('limit'),
+        cursor=params.get('cursor')
+    )
+    if params.get('alarm_name') and not stats:
+        return respond(404, {'error': 'No resolved incidents for this alarm'})
+    return respond(200, {'items': stats, 'next_cursor': next_cursor})
+
+@aws_clients.with_client_metrics
+def handler(event, context):
+    route = event.get('routeKey')
+    params = event.get('queryStringParameters') or {}
+    logger.info("Incident history request %s %s", route, params)
+
+    try:
+        if route == 'GET /incidents':
+            return list_incidents(params)
+        if route == 'GET /incidents/stats':
+            return get_stats(params)
+    except InvalidCursor as e:
+        return respond(400, {'error': str(e)})
+
+    return respond(404, {'error': 'Not found'})
@@ -0,0 +1,90 @@
+"""
+Incident history queries.
+
+Listings read one GSI of the incidents table, so "incidents for alarm X
+since Monday" or "incidents stuck in ANALYZED" is a bounded query, never a
+scan. Per-alarm MTTR comes from the counters the analyzer maintains in the
+alarm stats table when it verifies a recovery.
+"""
+from pagination import InvalidCursor, decode_cursor, encode_cursor, page_size
+
+# Both indexes project only these (plus the table and index keys)
+HISTORY_PROJECTION = 'incident_id, #ts, alarm_name, #s, created_at, reason, healing_status, time_to_recovery_seconds, occurrence_count'
+
+INDEXES = {
+    'alarm_name': 'alarm_name-created_at-index',
+    'status': 'status-created_at-index',
+}
+
+
+def query_incidents(table, key_name, key_value, since=None, until=None, limit=None, cursor=None, newest_first=True):
+    """
+    One page of incidents with key_name ('alarm_name' or 'status') equal to
+    key_value, optionally bounded by created_at. Returns (items, next_cursor).
+    Raises pagination.InvalidCursor for a cursor from another listing.
+    """
+    index_name = INDEXES[key_name]
+    start_key = decode_cursor(cursor, ['incident_id', 'timestamp', key_name, 'created_at'])
+    if start_key and start_key[key_name] != key_value:
+        raise InvalidCursor(f"Cursor belongs to a different {key_name}")
+
+    condition = '#k = :k'
+    values = {':k': key_value}
+    if since and until:
+        condition += ' AND created_at BETWEEN :since AND :until'
+        values.update({':since': since, ':until': until})
+    elif since:
+        condition += ' AND created_at >= :since'
+        values[':since'] = since
+    elif until:
+        condition += ' AND created_at <= :until'
+        values[':until'] = until
+
+    query = {
+        'IndexName': index_name,
+        'KeyConditionExpression': condition,
+        'ProjectionExpression': HISTORY_PROJECTION,
+        'ExpressionAttributeNames': {'#k': key_name, '#s': 'status', '#ts': 'timestamp'},
+        'ExpressionAttributeValues': values,
+        'ScanIndexForward': not newest_first,
+        'Limit': page_size(limit),
+    }
+    if start_key:
+        query['ExclusiveStartKey'] = start_key
+
+    response = table.query(**query)
+    return response.get('Items', []), encode_cursor(response.get('LastEvaluatedKey'))
+
+
+def summarize_stats(item):
+    """
+    MTTR summary from one alarm stats item.
+    """
+    resolved = int(item.get('resolved_count', 0))
+    total = float(item.get('total_recovery_seconds', 0))
+    return {
+        'alarm_name': item['alarm_name'],
+        'resolved_count': resolved,
+        'total_recovery_seconds': total,
+        'mttr_seconds': round(total / resolved, 1) if resolved else None,
+        'last_resolved_at': item.get('last_resolved_at'),
+        'last_incident_id': item.get('last_incident_id'),
+    }
+
+
+def alarm_stats(stats_table, alarm_name=None, limit=None, cursor=None):
+    """
+    MTTR for one alarm, or a page over all alarms (one small item per alarm).
+    Returns (summaries, next_cursor).
+    """
+    if alarm_name:
+        item = stats_table.get_item(Key={'alarm_name': alarm_name}).get('Item')
+        return ([summarize_stats(item)] if item else []), None
+
+    scan = {'Limit': page_size(limit)}
+    start_key = decode_cursor(cursor, ['alarm_name'])
+    if start_key:
+        scan['ExclusiveStartKey'] = start_key
+    response = stats_table.scan(**scan)
+    summaries = [summarize_stats(item) for item in response.get('Items', [])]
+    return summaries, encode_cursor(response.get('LastEvaluatedKey'))
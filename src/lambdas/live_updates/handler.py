@@ -0,0 +1,152 @@
+import json
+import logging
+import os
+import time
+import aws_clients
+from messages import approval_topic, incident_topic, messages_for_records
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+dynamodb = aws_clients.lazy_resource('dynamodb')
+
+CONNECTIONS_TABLE_NAME = os.environ['CONNECTIONS_TABLE_NAME']
+APPROVALS_TABLE_NAME = os.environ['APPROVALS_TABLE_NAME']
+WEBSOCKET_ENDPOINT = os.environ.get('WEBSOCKET_ENDPOINT')
+TOPIC_INDEX_NAME = os.environ.get('TOPIC_INDEX_NAME', 'topic-index')
+# API Gateway drops WebSocket connections after 2 hours; TTL sweeps any missed $disconnect
+CONNECTION_TTL_SECONDS = int(os.environ.get('CONNECTION_TTL_SECONDS', '7500'))
+
+_management_api = None
+
+def management_api():
+    """
+    The API Gateway management client for our WebSocket stage. It needs the
+    stage endpoint, so it is built here rather than through aws_clients.
+    """
+    global _management_api
+    if _management_api is None:
+        import boto3
+        _management_api = boto3.client(
+            'apigatewaymanagementapi',
+            endpoint_url=WEBSOCKET_ENDPOINT,
+            config=aws_clients.client_config('apigatewaymanagementapi')
+        )
+    return _management_api
+
+# --- WebSocket routes ---
+
+def connect(connection_id, params):
+    """
+    Subscribes a dashboard to one approval and to the incident behind it.
+    """
+    approval_id = params.get('approvalId')
+    if not approval_id:
+        return {'statusCode': 400, 'body': 'Missing approvalId'}
+
+    approval = dynamodb.Table(APPROVALS_TABLE_NAME).get_item(
+        Key={'approval_id': approval_id},
+        ProjectionExpression='incident_id'
+    ).get('Item')
+    if not approval:
+        return {'statusCode': 404, 'body': 'Not found'}
+
+    topics = [approval_topic(approval_id)]
+    if approval.get('incident_id'):
+        topics.append(incident_topic(approval['incident_id']))
+
+    expires_at = int(time.time()) + CONNECTION_TTL_SECONDS
+    table = dynamodb.Table(CONNECTIONS_TABLE_NAME)
+    with table.batch_writer() as batch:
+        for topic in topics:
+            batch.put_item(Item={
+                'connection_id': connection_id,
+                'topic': topic,
+                'approval_id': approval_id,
+                'expires_at': expires_at
+            })
+
+    logger.info(f"Connection {connection_id} subscribed to {topics}")
+    return {'statusCode': 200}
+
+def disconnect(connection_id):
+    table = dynamodb.Table(CONNECTIONS_TABLE_NAME)
+    response = table.query(
+        KeyConditionExpression='connection_id = :c',
+        ExpressionAttributeValues={':c': connection_id},
+        ProjectionExpression='connection_id, #t',
+        ExpressionAttributeNames={'#t': 'topic'}
+    )
+    with table.batch_writer() as batch:
+        for item in response.get('Items', []):
+            batch.delete_item(Key={'connection_id': item['connection_id'], 'topic': item['topic']})
+    return {'statusCode': 200}
+
+# --- Stream fan-out ---
+
+def subscribers(topic):
+    table = dynamodb.Table(CONNECTIONS_TABLE_NAME)
+    kwargs = {
+        'IndexName': TOPIC_INDEX_NAME,
+        'KeyConditionExpression': '#t = :t',
+        'ExpressionAttributeNames': {'#t': 'topic'},
+        'ExpressionAttributeValues': {':t': topic},
+    }
+    connection_ids = []
+    while True:
+        response = table.query(**kwargs)
+        connection_ids.extend(item['connection_id'] for item in response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            return connection_ids
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def push(connection_id, data):
+    """
+    Sends one message. Returns False if the connection is gone.
+    """
+    try:
+        management_api().post_to_connection(ConnectionId=connection_id, Data=data)
+        return True
+    except Exception as e:
+        if aws_clients.error_code(e) == 'GoneException':
+            return False
+        # A slow or broken client must not hold up the others; it catches up on reconnect
+        logger.warning(f"Failed to push to {connection_id}: {e}")
+        return True
+
+def fan_out(records):
+    messages = messages_for_records(records)
+    sent = 0
+    gone = set()
+    for message in messages:
+        data = json.dumps(message, default=str).encode('utf-8')
+        for connection_id in subscribers(message['topic']):
+            if connection_id in gone:
+                continue
+            if push(connection_id, data):
+                sent += 1
+            else:
+                gone.add(connection_id)
+
+    for connection_id in gone:
+        disconnect(connection_id)
+
+    logger.info(f"{len(records)} stream records -> {len(messages)} updates, {sent} pushes, {len(gone)} stale connections removed")
+    return {'updates': len(messages), 'pushed': sent, 'stale': len(gone)}
+
+@aws_clients.with_client_metrics
+def handler(event, context):
+    if 'Records' in event:
+        return fan_out(event['Records'])
+
+    request = event.get('requestContext', {})
+    route = request.get('routeKey')
+    connection_id = request.get('connectionId')
+    logger.info(f"WebSocket {route} from {connection_id}")
+
+    if route == '$connect':
+        return connect(connection_id, event.get('queryStringParameters') or {})
+    if route == '$disconnect':
+        return disconnect(connection_id)
+    # $default: dashboards send {"action": "ping"} to keep idle connections open
+    return {'statusCode': 200}
@@ -0,0 +1,66 @@
+"""
+Turns incidents/approvals stream records into the messages pushed to dashboards.
+
+A message carries the same field names as GET /approval/{id}, so the
+dashboard merges it straight into the view it already holds:
+
+    {"type": "update", "topic": "approval#<id>", "fields": {...}}
+
+Kept free of AWS imports so the local stand-in server can reuse it.
+"""
+from stream_images import deserialize_image
+
+# Approval attributes the dashboard renders; taskToken is never pushed
+APPROVAL_FIELDS = ['approval_id', 'incident_id', 'status', 'analysis', 'risk_assessment',
+                   'created_at', 'expires_at', 'approved_by', 'approved_at', 'comment']
+
+# Incident attribute -> field name in the merged approval view
+INCIDENT_FIELDS = {
+    'status': 'incident_status',
+    'healing_status': 'healing_status',
+    'healing_result': 'healing_result',
+    'verification': 'verification_result',
+    'rollback_status': 'rollback_status',
+}
+
+
+def approval_topic(approval_id):
+    return f"approval#{approval_id}"
+
+
+def incident_topic(incident_id):
+    return f"incident#{incident_id}"
+
+
+def message_for(image):
+    """
+    The update message for one new item image, or None if it is from neither table.
+    """
+    if 'approval_id' in image:
+        fields = {name: image[name] for name in APPROVAL_FIELDS if name in image}
+        return {'type': 'update', 'topic': approval_topic(image['approval_id']), 'fields': fields}
+    if 'incident_id' in image:
+        fields = {view: image[name] for name, view in INCIDENT_FIELDS.items() if name in image}
+        return {'type': 'update', 'topic': incident_topic(image['incident_id']), 'fields': fields}
+    return None
+
+
+def messages_for_records(records):
+    """
+    One message per changed item, latest image wins. A batch often holds several
+    writes to the same incident (status, then healing, then verification);
+    dashboards only need the final state.
+    """
+    latest = {}
+    for record in records:
+        if record.get('eventName') not in ('INSERT', 'MODIFY'):
+            continue
+        new_image = record.get('dynamodb', {}).get('NewImage')
+        if not new_image:
+            continue
+        message = message_for(deserialize_image(new_image))
+        if message and message['fields']:
+            # Items are keyed by topic, so an incident with several records still maps to one message
+            latest.pop(message['topic'], None)
+            latest[message['topic']] = message
+    return list(latest.values())
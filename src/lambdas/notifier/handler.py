@@ -1,27 +1,19 @@
 import json
 import logging
-import os
-import urllib3
+import aws_clients
+import slack_outbox
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-http = urllib3.PoolManager()
-SLACK_WEBHOOK_URL = os.environ['SLACK_WEBHOOK_URL']
-
-def send_slack_message(message):
+def send_slack_message(message, incident_id):
+    # Delivery, rate limiting and retries happen in the slack_delivery Lambda
     try:
-        response = http.request(
-            'POST',
-            SLACK_WEBHOOK_URL,
-            body=json.dumps(message),
-            headers={'Content-Type': 'application/json'}
-        )
-        if response.status != 200:
-            logger.error("Request to Slack returned an error %s, the response is:\n%s", response.status, response.data)
+        slack_outbox.enqueue(message, incident_id=incident_id)
     except Exception as e:
-        logger.error("Failed to send message to Slack: %s", e)
+        logger.error("Failed to queue message for Slack: %s", e)
 
+@aws_clients.with_client_metrics
 def handler(event, context):
     logger.info("Received event: %s", json.dumps(event))
     
@@ -106,7 +98,7 @@ def handler(event, context):
         ]
     }
     
-    send_slack_message(message)
+    send_slack_message(message, incident_id)
     
     return {
         'statusCode': 200,
@@ -1,33 +1,62 @@
 import json
 import logging
 import os
-import boto3
+import aws_clients
+import slack_outbox
 import uuid
-import urllib3
 from datetime import datetime, timedelta
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-dynamodb = boto3.resource('dynamodb')
-http = urllib3.PoolManager()
+dynamodb = aws_clients.lazy_resource('dynamodb')
 
 TABLE_NAME = os.environ['APPROVALS_TABLE_NAME']
-SLACK_WEBHOOK_URL = os.environ['SLACK_WEBHOOK_URL']
+MAX_ALTERNATIVES = 5
 
-def send_slack_message(message):
-    try:
-        response = http.request(
-            'POST',
-            SLACK_WEBHOOK_URL,
-            body=json.dumps(message),
-            headers={'Content-Type': 'application/json'}
-        )
-        if response.status != 200:
-            logger.error("Request to Slack returned an error %s, the response is:\n%s", response.status, response.data)
-    except Exception as e:
-        logger.error("Failed to send message to Slack: %s", e)
+class ApprovalNotSent(Exception):
+    """
+    The approval request could not be queued for Slack. RequestApproval retries on this.
+    """
+
+def approval_id_for(event):
+    """
+    One approval per workflow execution, so a retried RequestApproval rewrites
+    the same row (with the new task token) instead of leaving an orphan.
+    """
+    execution_id = event.get('execution_id')
+    if not execution_id:
+        return str(uuid.uuid4())
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{execution_id}#approval"))
+
+def describe_candidate(candidate):
+    cost = candidate.get('estimated_cost')
+    cost_text = 'no price on file' if cost is None else f"${cost}"
+    target = ''
+    if candidate.get('instance_type'):
+        target = f" +{candidate.get('instances')} x {candidate['instance_type']}"
+    return f"{candidate.get('rank')}. {candidate.get('action')}{target} ({candidate.get('role', '').lower()}): {cost_text}, {candidate.get('risk_level')} risk"
+
+def alternatives_block(risk_assessment):
+    """
+    The cost estimator's ranked candidates, cheapest first, or None if there is only the one action.
+    """
+    candidates = risk_assessment.get('candidates') or []
+    if len(candidates) < 2:
+        return None
+    lines = [describe_candidate(c) for c in candidates[:MAX_ALTERNATIVES]]
+    cheapest = risk_assessment.get('cheapest_acceptable')
+    if cheapest and cheapest.get('role') != 'PRIMARY':
+        lines.append(f"_Cheapest low-risk option: {cheapest.get('action')}_")
+    return {
+        "type": "section",
+        "text": {
+            "type": "mrkdwn",
+            "text": "*Alternatives (cheapest first):*\n" + "\n".join(lines)
+        }
+    }
 
+@aws_clients.with_client_metrics
 def handler(event, context):
     logger.info("Received event: %s", json.dumps(event))
     
@@ -36,7 +65,7 @@ def handler(event, context):
     analysis = event.get('analysis', {})
     risk_assessment = event.get('risk_assessment', {})
     
-    approval_id = str(uuid.uuid4())
+    approval_id = approval_id_for(event)
     
     # Store in DynamoDB
     table = dynamodb.Table(TABLE_NAME)
@@ -60,6 +89,9 @@ def handler(event, context):
     # The buttons will send a payload to the configured Request URL.
     # We embed the approval_id in the button value.
     
+    estimated_cost = risk_assessment.get('estimated_cost')
+    cost_text = 'N/A (no price on file)' if estimated_cost is None else f"${estimated_cost}"
+
     blocks = [
         {
             "type": "header",
@@ -73,7 +105,7 @@ def handler(event, context):
             "type": "section",
             "text": {
                 "type": "mrkdwn",
-                "text": f"*Recommended Action:*\n{analysis.get('recommended_action', 'N/A')}\n\n*Detailed Problem:*\n{analysis.get('detailed_root_cause', analysis.get('root_cause', 'N/A'))}\n\n*Why take this action?*\n{analysis.get('action_justification', analysis.get('reasoning', 'N/A'))}\n\n*Risk Level:* {risk_assessment.get('risk_level', 'HIGH')}\n*Cost Estimate:* ${risk_assessment.get('estimated_cost', 'N/A')}"
+                "text": f"*Recommended Action:*\n{analysis.get('recommended_action', 'N/A')}\n\n*Detailed Problem:*\n{analysis.get('detailed_root_cause', analysis.get('root_cause', 'N/A'))}\n\n*Why take this action?*\n{analysis.get('action_justification', analysis.get('reasoning', 'N/A'))}\n\n*Risk Level:* {risk_assessment.get('risk_level', 'HIGH')}\n*Cost Estimate:* {cost_text}"
             }
         },
         {
@@ -105,7 +137,16 @@ def handler(event, context):
         }
     ]
     
-    send_slack_message({"blocks": blocks})
+    alternatives = alternatives_block(risk_assessment)
+    if alternatives:
+        blocks.insert(2, alternatives)
+
+    # Queued for the slack_delivery Lambda. A failure here fails the task so
+    # RequestApproval retries it, rather than leaving an approval nobody sees.
+    try:
+        slack_outbox.enqueue({"blocks": blocks}, incident_id=incident_id, kind=slack_outbox.KIND_APPROVAL)
+    except Exception as e:
+        raise ApprovalNotSent(f"Could not queue approval {approval_id}: {e}") from e
     
     return {
         'approval_id': approval_id,
@@ -1,17 +1,20 @@
 import json
 import logging
 import os
-import boto3
+import aws_clients
 import urllib.parse
 import hmac
 import hashlib
 import time
+from datetime import datetime
+from stream_images import deserialize_image
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-dynamodb = boto3.resource('dynamodb')
-sfn = boto3.client('stepfunctions')
+dynamodb = aws_clients.lazy_resource('dynamodb')
+sfn = aws_clients.lazy_client('stepfunctions')
+lambda_client = aws_clients.lazy_client('lambda')
 
 TABLE_NAME = os.environ['APPROVALS_TABLE_NAME']
 SLACK_SIGNING_SECRET = os.environ.get('SLACK_SIGNING_SECRET', '')
@@ -40,9 +43,108 @@ def verify_slack_signature(headers, body):
     
     return hmac.compare_digest(my_signature, signature)
 
+def claim_approval(approval_id, new_status, user):
+    """
+    Atomically moves a PENDING, unexpired approval to new_status.
+    Returns (claimed, item): the updated item if this click won, otherwise
+    the item as it was (None if it no longer exists).
+    """
+    table = dynamodb.Table(TABLE_NAME)
+    try:
+        response = table.update_item(
+            Key={'approval_id': approval_id},
+            UpdateExpression="set #s = :s, approved_by = :u, approval_source = :src, approved_at = :t",
+            ConditionExpression="#s = :pending AND (attribute_not_exists(expires_at) OR expires_at > :now)",
+            ExpressionAttributeNames={'#s': 'status'},
+            ExpressionAttributeValues={
+                ':s': new_status,
+                ':u': user,
+                ':src': 'slack',
+                ':t': datetime.utcnow().isoformat(),
+                ':pending': 'PENDING',
+                ':now': int(time.time())
+            },
+            ReturnValues='ALL_NEW',
+            ReturnValuesOnConditionCheckFailure='ALL_OLD'
+        )
+        return True, response['Attributes']
+    except Exception as e:
+        if aws_clients.error_code(e) != 'ConditionalCheckFailedException':
+            raise
+        # Error responses are not deserialized by the resource layer
+        item = e.response.get('Item')
+        if item is None:
+            return False, None
+        return False, deserialize_image(item)
+
+def dispatch(context, job):
+    """
+    Hands work to an asynchronous invocation of this function, so Slack gets
+    its acknowledgement without waiting on Step Functions or response_url.
+    """
+    lambda_client.invoke(
+        FunctionName=context.invoked_function_arn,
+        InvocationType='Event',
+        Payload=json.dumps({'slack_job': job}, default=str).encode('utf-8')
+    )
+
+def post_to_response_url(response_url, message):
+    if not response_url:
+        return
+    import urllib3
+    try:
+        response = urllib3.PoolManager().request(
+            'POST',
+            response_url,
+            body=json.dumps(message),
+            headers={'Content-Type': 'application/json'},
+            timeout=urllib3.Timeout(connect=2.0, read=5.0)
+        )
+        if response.status != 200:
+            logger.error("Slack response_url returned %s: %s", response.status, response.data)
+    except Exception as e:
+        logger.error("Failed to post to Slack response_url: %s", e)
+
+def resume_workflow(job):
+    """
+    Async half: resumes the workflow, then replaces the Slack message so its
+    buttons cannot be clicked again. Raises on transient Step Functions
+    errors so the async invocation is retried.
+    """
+    user = job['user']
+    try:
+        if job['status'] == 'APPROVED':
+            sfn.send_task_success(
+                taskToken=job['task_token'],
+                output=json.dumps({'status': 'APPROVED', 'approver': user, 'source': 'slack'})
+            )
+            text = f"✅ Action approved by {user}."
+        else:
+            sfn.send_task_failure(
+                taskToken=job['task_token'],
+                error='ManualRejection',
+                cause=f'User {user} rejected via Slack'
+            )
+            text = f"❌ Action rejected by {user}."
+    except Exception as e:
+        if aws_clients.error_code(e) not in ('TaskTimedOut', 'TaskDoesNotExist', 'InvalidToken'):
+            raise
+        # The workflow stopped waiting (timeout, or a retry of this job after it already resumed)
+        logger.warning("Workflow for approval %s was not waiting: %s", job['approval_id'], e)
+        text = f"⚠️ Recorded {job['status'].lower()} by {user}, but the workflow was no longer waiting for a decision."
+
+    post_to_response_url(job.get('response_url'), {'replace_original': True, 'text': text})
+
+@aws_clients.with_client_metrics
 def handler(event, context):
-    logger.info("Received event: %s", json.dumps(event))
-    
+    if 'slack_job' in event:
+        job = event['slack_job']
+        if job['type'] == 'resume':
+            resume_workflow(job)
+        else:
+            post_to_response_url(job.get('response_url'), job['message'])
+        return {'status': 'done'}
+
     # API Gateway Proxy Integration
     headers = event.get('headers', {})
     body = event.get('body', '')
@@ -74,67 +176,44 @@ def handler(event, context):
     action = actions[0]
     approval_id = action.get('value')
     action_id = action.get('action_id') # approve_action or reject_action
+    response_url = payload.get('response_url')
     
     user = payload.get('user', {}).get('username', 'slack_user')
-    
-    # Fetch from DynamoDB
-    table = dynamodb.Table(TABLE_NAME)
-    response = table.get_item(Key={'approval_id': approval_id})
-    item = response.get('Item')
-    
-    if not item:
-        return {
-            'statusCode': 200,
-            'body': json.dumps({'text': "⚠️ Interaction Expired: This approval request is no longer active.", 'replace_original': False})
-        }
-        
-    if item.get('status') != 'PENDING':
-        return {
-            'statusCode': 200, 
-            'body': json.dumps({'text': f"Request already processed: {item.get('status')}"})
-        }
-        
-    task_token = item.get('taskToken')
     new_status = 'APPROVED' if action_id == 'approve_action' else 'REJECTED'
-    
-    # Update DynamoDB
-    table.update_item(
-        Key={'approval_id': approval_id},
-        UpdateExpression="set #s = :s, approved_by = :u, approval_source = :src",
-        ExpressionAttributeNames={'#s': 'status'},
-        ExpressionAttributeValues={
-            ':s': new_status,
-            ':u': user,
-            ':src': 'slack'
+    logger.info("Slack %s on approval %s by %s", action_id, approval_id, user)
+
+    # One conditional write decides the race between clicks; only the winner resumes the workflow
+    claimed, item = claim_approval(approval_id, new_status, user)
+
+    if claimed:
+        job = {
+            'type': 'resume',
+            'approval_id': approval_id,
+            'task_token': item.get('taskToken'),
+            'status': new_status,
+            'user': user,
+            'response_url': response_url
         }
-    )
-    
-    # Resume Step Functions
-    try:
-        if new_status == 'APPROVED':
-            sfn.send_task_success(
-                taskToken=task_token,
-                output=json.dumps({'status': 'APPROVED', 'approver': user, 'source': 'slack'})
-            )
-            message = "✅ Action Approved!"
+        try:
+            dispatch(context, job)
+        except Exception as e:
+            # The approval is already claimed, so nobody else will resume it: do it here
+            logger.error("Async dispatch failed, resuming inline: %s", e)
+            resume_workflow(job)
+    else:
+        if not item:
+            text = "⚠️ Interaction Expired: This approval request is no longer active."
+        elif item.get('status') == 'PENDING':
+            text = "⚠️ Interaction Expired: This approval request has timed out."
         else:
-            sfn.send_task_failure(
-                taskToken=task_token,
-                error='ManualRejection',
-                cause=f'User {user} rejected via Slack'
-            )
-            message = "❌ Action Rejected."
-            
-        # Respond to Slack to update the message
-        return {
-            'statusCode': 200,
-            'headers': {'Content-Type': 'application/json'},
-            'body': json.dumps({'text': message, 'replace_original': False})
-        }
-        
-    except Exception as e:
-        logger.error("Error resuming workflow: %s", e)
-        return {
-            'statusCode': 500,
-            'body': 'Error resuming workflow'
-        }
+            text = f"Request already processed: {item.get('status')} by {item.get('approved_by', 'someone else')}"
+        message = {'response_type': 'ephemeral', 'replace_original': False, 'text': text}
+        try:
+            dispatch(context, {'type': 'notify', 'response_url': response_url, 'message': message})
+        except Exception as e:
+            # Still ack Slack; the notice is one quick post
+            logger.error("Async dispatch failed, notifying inline: %s", e)
+            post_to_response_url(response_url, message)
+
+    # Acknowledge right away; Slack shows the outcome once the async job posts to response_url
+    return {'statusCode': 200, 'body': ''}
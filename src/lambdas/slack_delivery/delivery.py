@@ -0,0 +1,183 @@
+"""
+Rate-limited, coalescing delivery of queued Slack webhook messages.
+
+Kept free of AWS and HTTP client imports: the handler passes in a post
+function, and benchmarks/slack_delivery_bench.py drives the same code
+against tools/fake_slack_webhook.py.
+"""
+import logging
+import random
+import time
+
+logger = logging.getLogger()
+
+# Slack rejects messages with more than 50 blocks
+MAX_BLOCKS = 50
+
+SENT = 'SENT'
+THROTTLED = 'THROTTLED'
+FAILED = 'FAILED'
+# Slack refused the message itself (4xx); retrying it can never succeed
+REJECTED = 'REJECTED'
+
+
+class TokenBucket:
+    """
+    rate tokens per second, up to burst banked. A Retry-After from Slack
+    empties the bucket until the given time.
+    """
+
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = burst
+        self.updated = clock()
+        self.blocked_until = 0.0
+
+    def wait_time(self):
+        """
+        Seconds until a token is available (0 if one is available now).
+        """
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+    def block(self, seconds):
+        self.blocked_until = max(self.blocked_until, self.clock() + seconds)
+        self.tokens = 0
+
+
+def coalesce(entries):
+    """
+    Merges queued entries for the same incident and webhook into one message.
+
+    entries: [(entry_id, body)] in queue order, body as written by slack_outbox.
+    Returns [(entry_ids, webhook, message)], groups holding an approval request
+    first. Nothing is dropped: a merged message carries every entry's blocks,
+    oldest first, separated by dividers, split again only where Slack's block
+    limit requires it.
+    """
+    groups = {}
+    for entry_id, body in entries:
+        incident_id = body.get('incident_id')
+        # Entries without an incident are never merged
+        key = (body.get('webhook', 'default'), incident_id if incident_id else f"entry:{entry_id}")
+        groups.setdefault(key, []).append((entry_id, body))
+
+    ordered = sorted(groups.items(), key=lambda item: not any(b.get('kind') == 'approval' for _, b in item[1]))
+
+    deliveries = []
+    for (webhook, _), members in ordered:
+        if len(members) == 1:
+            entry_id, body = members[0]
+            deliveries.append(([entry_id], webhook, body['message']))
+            continue
+
+        current_ids, blocks, attachments = [], [], []
+        for entry_id, body in members:
+            message = body['message']
+            message_blocks = list(message.get('blocks', []))
+            if blocks and len(blocks) + 1 + len(message_blocks) > MAX_BLOCKS:
+                deliveries.append((current_ids, webhook, _merged(blocks, attachments)))
+                current_ids, blocks, attachments = [], [], []
+            if blocks:
+                blocks.append({'type': 'divider'})
+            blocks.extend(message_blocks)
+            # The newest status colour wins
+            attachments = message.get('attachments', attachments)
+            current_ids.append(entry_id)
+        deliveries.append((current_ids, webhook, _merged(blocks, attachments)))
+
+    return deliveries
+
+
+def _merged(blocks, attachments):
+    message = {'blocks': blocks}
+    if attachments:
+        message['attachments'] = attachments
+    return message
+
+
+class SlackDelivery:
+    """
+    Posts messages through one token bucket per webhook URL, honouring
+    Retry-After on 429 and retrying 5xx/network errors with jittered backoff.
+
+    post(url, message) must return (status, headers) with lower-case header
+    names, or raise on network errors.
+    """
+
+    def __init__(self, post, rate, burst, max_attempts=3, base_delay=0.5,
+                 sleep=time.sleep, clock=time.monotonic):
+        self.post = post
+        self.rate = rate
+        self.burst = burst
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.sleep = sleep
+        self.clock = clock
+        self.buckets = {}
+
+    def bucket(self, url):
+        if url not in self.buckets:
+            self.buckets[url] = TokenBucket(self.rate, self.burst, self.clock)
+        return self.buckets[url]
+
+    def deliver(self, url, message, deadline):
+        """
+        Returns (SENT, None), (THROTTLED, seconds) when waiting for the rate
+        limit would pass the deadline, (REJECTED, status) for a 4xx other than
+        429, or (FAILED, None) after max_attempts transient errors (5xx,
+        connection errors). 429s are waited out and do not count as attempts.
+        """
+        bucket = self.bucket(url)
+        attempts = 0
+        while True:
+            wait = bucket.wait_time()
+            while wait > 0:
+                if self.clock() + wait > deadline:
+                    return THROTTLED, wait
+                self.sleep(wait)
+                wait = bucket.wait_time()
+            bucket.take()
+
+            try:
+                status, headers = self.post(url, message)
+            except Exception as e:
+                logger.warning(f"Slack post failed: {e}")
+                status, headers = None, {}
+
+            if status is not None and 200 <= status < 300:
+                return SENT, None
+
+            if status == 429:
+                retry_after = _retry_after(headers)
+                bucket.block(retry_after)
+                logger.warning(f"Slack throttled us; retrying after {retry_after}s")
+                continue
+
+            if status is not None and 400 <= status < 500:
+                # Malformed payload or revoked webhook: retrying will not help
+                logger.error(f"Slack rejected the message with {status}")
+                return REJECTED, status
+
+            attempts += 1
+            if attempts >= self.max_attempts:
+                return FAILED, None
+            self.sleep(random.uniform(0, self.base_delay * 2 ** attempts))
+
+
+def _retry_after(headers):
+    try:
+        return max(1.0, float(headers.get('retry-after', 1)))
+    except (TypeError, ValueError):
+        return 1.0
@@ -0,0 +1,116 @@
+import json
+import logging
+import os
+import time
+import urllib3
+import aws_clients
+from delivery import REJECTED, SENT, THROTTLED, SlackDelivery, coalesce
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+sqs = aws_clients.lazy_client('sqs')
+http = urllib3.PoolManager(timeout=urllib3.Timeout(connect=2.0, read=10.0), retries=False)
+
+SLACK_WEBHOOK_URL = os.environ['SLACK_WEBHOOK_URL']
+# Extra named webhooks, as JSON {"name": "url"}; 'default' is SLACK_WEBHOOK_URL
+SLACK_WEBHOOK_URLS = json.loads(os.environ.get('SLACK_WEBHOOK_URLS') or '{}')
+SLACK_OUTBOX_QUEUE_URL = os.environ['SLACK_OUTBOX_QUEUE_URL']
+SLACK_OUTBOX_DLQ_URL = os.environ.get('SLACK_OUTBOX_DLQ_URL')
+# Per consumer; the event source mapping caps concurrency, so the total is rate x that cap
+SLACK_RATE_PER_SECOND = float(os.environ.get('SLACK_RATE_PER_SECOND', '0.5'))
+SLACK_BURST = float(os.environ.get('SLACK_BURST', '3'))
+DEADLINE_RESERVE_SECONDS = 5
+
+def post(url, message):
+    response = http.request(
+        'POST',
+        url,
+        body=json.dumps(message),
+        headers={'Content-Type': 'application/json'}
+    )
+    return response.status, {k.lower(): v for k, v in response.headers.items()}
+
+# Module-level so the token buckets carry over between warm invocations
+slack = SlackDelivery(post, rate=SLACK_RATE_PER_SECOND, burst=SLACK_BURST)
+
+def webhook_url(name):
+    if name in (None, 'default'):
+        return SLACK_WEBHOOK_URL
+    return SLACK_WEBHOOK_URLS.get(name, SLACK_WEBHOOK_URL)
+
+def postpone(records, seconds):
+    """
+    Keeps throttled messages invisible until Slack will take them again,
+    instead of letting SQS redeliver them straight into another 429.
+    """
+    for record in records:
+        try:
+            sqs.change_message_visibility(
+                QueueUrl=SLACK_OUTBOX_QUEUE_URL,
+                ReceiptHandle=record['receiptHandle'],
+                VisibilityTimeout=min(43200, int(seconds) + 1)
+            )
+        except Exception as e:
+            logger.warning(f"Failed to postpone message {record['messageId']}: {e}")
+
+def dead_letter(records, status):
+    """
+    Moves messages Slack will never accept straight to the DLQ, so they don't
+    cycle through maxReceiveCount redeliveries spending the webhook's rate budget.
+    Returns the message ids that could not be moved and must stay on the queue.
+    """
+    if not SLACK_OUTBOX_DLQ_URL:
+        logger.error(f"Dropping {len(records)} messages rejected by Slack ({status}); no DLQ configured")
+        return []
+    stuck = []
+    for record in records:
+        try:
+            sqs.send_message(
+                QueueUrl=SLACK_OUTBOX_DLQ_URL,
+                MessageBody=record['body'],
+                MessageAttributes={'slack_status': {'DataType': 'Number', 'StringValue': str(status)}}
+            )
+        except Exception as e:
+            logger.error(f"Failed to dead-letter message {record['messageId']}: {e}")
+            stuck.append(record['messageId'])
+    return stuck
+
+@aws_clients.with_client_metrics
+def handler(event, context):
+    records = {record['messageId']: record for record in event.get('Records', [])}
+    entries = []
+    failures = []
+    for message_id, record in records.items():
+        try:
+            entries.append((message_id, json.loads(record['body'])))
+        except ValueError:
+            logger.error(f"Dropping unreadable outbox message {message_id}")
+
+    deadline = time.monotonic() + context.get_remaining_time_in_millis() / 1000.0 - DEADLINE_RESERVE_SECONDS
+    deliveries = coalesce(entries)
+    sent = 0
+    for position, (message_ids, webhook, message) in enumerate(deliveries):
+        outcome, detail = slack.deliver(webhook_url(webhook), message, deadline)
+        if outcome == SENT:
+            sent += 1
+            continue
+
+        if outcome == THROTTLED:
+            # Everything not yet sent waits out the throttle together
+            pending = [i for ids, _, _ in deliveries[position:] for i in ids]
+            postpone([records[i] for i in pending], detail)
+            failures.extend(pending)
+            break
+
+        if outcome == REJECTED:
+            logger.error(f"Slack rejected messages {message_ids} with {detail}, dead-lettering")
+            failures.extend(dead_letter([records[i] for i in message_ids], detail))
+            continue
+
+        # Transient (5xx, connection errors): back to the queue for a later attempt
+        logger.error(f"Slack delivery failed for messages {message_ids}")
+        failures.extend(message_ids)
+
+    logger.info(f"{len(records)} queued messages -> {len(deliveries)} Slack posts: {sent} sent, {len(failures)} returned to the queue")
+    return {'batchItemFailures': [{'itemIdentifier': message_id} for message_id in failures]}
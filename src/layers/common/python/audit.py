@@ -0,0 +1,123 @@
+"""
+Buffered writer for the audit ledger table.
+
+Entries recorded during an invocation are held in memory and written with
+BatchWriteItem when the handler returns (see flush_after). Unprocessed items
+are retried with exponential backoff. Audit failures are logged, never
+raised, as before.
+
+The Timestamp sort key is an ISO timestamp followed by a per-container id and
+sequence number, e.g. 2024-01-01T00:00:00.000001#3f9a1c2e-000004. It sorts
+chronologically and cannot collide, even when fan-out healing records several
+entries in the same microsecond or two containers write at once.
+"""
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from datetime import datetime
+from functools import wraps
+
+import aws_clients
+
+logger = logging.getLogger()
+
+BATCH_SIZE = 25  # BatchWriteItem limit
+
+
+def _attribute(value):
+    if isinstance(value, bool):
+        return {'BOOL': value}
+    if isinstance(value, (int, float)):
+        return {'N': str(value)}
+    return {'S': str(value)}
+
+
+class AuditWriter:
+    def __init__(self, table_name, component, max_attempts=6, base_delay=0.05, max_delay=2.0):
+        self.table_name = table_name
+        self.component = component
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._writer_id = uuid.uuid4().hex[:8]
+        self._sequence = 0
+        self._last_timestamp = ''
+
+    def _sort_key(self):
+        # Caller holds the lock
+        now = datetime.utcnow().isoformat(timespec='microseconds')
+        # Never step backwards if the clock does
+        self._last_timestamp = max(now, self._last_timestamp)
+        self._sequence += 1
+        return f"{self._last_timestamp}#{self._writer_id}-{self._sequence:06d}"
+
+    def record(self, incident_id, event_type, action_type, details):
+        """
+        Buffers one audit entry; it is written on the next flush().
+        """
+        if not self.table_name:
+            return
+        with self._lock:
+            self._buffer.append({
+                'IncidentID': incident_id or 'UNKNOWN',
+                'Timestamp': self._sort_key(),
+                'EventType': event_type,
+                'ActionType': action_type or 'UNKNOWN',
+                'Details': json.dumps(details, default=str),
+                'Component': self.component
+            })
+
+    def flush(self):
+        """
+        Writes everything buffered. Returns the number of entries that could not be written.
+        """
+        with self._lock:
+            items, self._buffer = self._buffer, []
+        if not items:
+            return 0
+
+        failed = 0
+        for start in range(0, len(items), BATCH_SIZE):
+            chunk = items[start:start + BATCH_SIZE]
+            failed += self._write_batch([
+                {'PutRequest': {'Item': {name: _attribute(value) for name, value in item.items()}}}
+                for item in chunk
+            ])
+
+        if failed:
+            logger.error(f"Failed to write {failed} of {len(items)} audit entries")
+        else:
+            logger.info(f"Audit entries written: {len(items)}")
+        return failed
+
+    def _write_batch(self, requests):
+        client = aws_clients.client('dynamodb')
+        for attempt in range(self.max_attempts):
+            try:
+                response = client.batch_write_item(RequestItems={self.table_name: requests})
+                requests = response.get('UnprocessedItems', {}).get(self.table_name, [])
+            except Exception as e:
+                logger.warning(f"Audit batch write failed (attempt {attempt + 1}): {e}")
+            if not requests:
+                return 0
+            if attempt + 1 < self.max_attempts:
+                # Full jitter backoff, as recommended for BatchWriteItem retries
+                time.sleep(random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt)))
+        return len(requests)
+
+    def flush_after(self, handler):
+        """
+        Decorates a Lambda handler so the buffer is always flushed before it returns.
+        """
+        @wraps(handler)
+        def wrapper(event, context):
+            try:
+                return handler(event, context)
+            finally:
+                self.flush()
+        return wrapper
@@ -0,0 +1,51 @@
+"""
+Group bookkeeping shared by the healer and the automation completion handler.
+
+Both sides of the race on an automation group apply results and roll them up
+with these functions, so they always agree on the outcome.
+"""
+import json
+
+
+def summarize(action, results, action_type=None):
+    """
+    Rolls per-target results up into the single result the workflow sees.
+
+    Targets that could not run because another action held their lease are
+    listed in contended_targets; the workflow reruns the action on just those
+    before it verifies, so they never pass as done.
+    """
+    statuses = [r['status'] for r in results]
+    succeeded = sum(1 for status in statuses if status in ('SUCCESS', 'MERGED'))
+    if 'IN_PROGRESS' in statuses:
+        status = 'IN_PROGRESS'
+    elif succeeded == len(results):
+        status = 'SUCCESS'
+    elif succeeded == 0:
+        status = 'FAILED'
+    else:
+        status = 'PARTIAL'
+
+    if len(results) == 1:
+        message = results[0]['message']
+    else:
+        message = f"{action}: {succeeded}/{len(results)} targets succeeded"
+    summary = {"status": status, "message": message, "targets": results, "action_type": action_type}
+    contended = [r['target'] for r in results if r['status'] == 'CONTENDED']
+    if contended:
+        summary['contended_targets'] = contended
+    return summary
+
+
+def complete_group_member(table, group_id, target_id, result):
+    """
+    Records one finished automation on its group and returns the group item.
+    """
+    response = table.update_item(
+        Key={'execution_id': group_id},
+        UpdateExpression="SET results.#t = :r ADD pending :minus_one",
+        ExpressionAttributeNames={'#t': target_id},
+        ExpressionAttributeValues={':r': json.dumps(result), ':minus_one': -1},
+        ReturnValues='ALL_NEW'
+    )
+    return response['Attributes']
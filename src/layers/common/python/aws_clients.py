@@ -0,0 +1,253 @@
+"""
+Lazily constructed, tuned AWS clients shared by the Lambda handlers.
+
+Importing boto3 and building clients is the bulk of a handler's cold start,
+and most invocations only touch one or two services. Handlers declare their
+clients at module level with lazy_client()/lazy_resource(); nothing is
+imported or built until a client is first used, and then it is cached for
+the life of the container.
+
+Every client gets the same botocore configuration: adaptive retries,
+per-service connect/read timeouts so one slow call cannot eat the Lambda
+timeout, TCP keep-alive, and a connection pool sized for the fan-out paths.
+Calls, retries and throttles are counted per service and emitted as
+CloudWatch embedded metrics by the with_client_metrics decorator.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from functools import wraps
+
+logger = logging.getLogger()
+
+_clients = {}
+_resources = {}
+_lock = threading.Lock()
+_local = threading.local()
+
+# Builds the real thing; swapped out by set_factory() in benchmarks
+_factory = None
+
+# (connect, read) timeouts in seconds. Bedrock generations are slow by nature;
+# control-plane and DynamoDB calls should answer fast or be retried.
+SERVICE_TIMEOUTS = {
+    'bedrock-runtime': (2, 60),
+    'dynamodb': (1, 5),
+    'stepfunctions': (2, 10),
+    'logs': (2, 15),
+    's3': (2, 15),
+    'cloudwatch': (2, 10),
+    'ssm': (2, 10),
+    'autoscaling': (2, 10),
+    'ecs': (2, 10),
+}
+DEFAULT_TIMEOUTS = (2, 15)
+
+MAX_ATTEMPTS = int(os.environ.get('AWS_MAX_ATTEMPTS', '5'))
+# Read timeouts are retried too, so slow services get fewer attempts
+SERVICE_MAX_ATTEMPTS = {
+    'bedrock-runtime': 3,
+}
+# Healer and detector fan out over up to ~10 threads sharing one client
+MAX_POOL_CONNECTIONS = int(os.environ.get('AWS_MAX_POOL_CONNECTIONS', '32'))
+METRICS_NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'IncidentHealer/AWSClients')
+
+THROTTLE_CODES = {
+    'Throttling', 'ThrottlingException', 'ThrottledException', 'RequestThrottledException',
+    'TooManyRequestsException', 'ProvisionedThroughputExceededException', 'RequestLimitExceeded',
+    'SlowDown', 'RequestThrottled', 'TransactionInProgressException', 'PriorRequestNotComplete',
+    'EC2ThrottledException', 'BandwidthLimitExceeded',
+}
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def client_config(service_name):
+    from botocore.config import Config
+
+    connect_timeout, read_timeout = SERVICE_TIMEOUTS.get(service_name, DEFAULT_TIMEOUTS)
+    return Config(
+        retries={'mode': 'adaptive', 'max_attempts': SERVICE_MAX_ATTEMPTS.get(service_name, MAX_ATTEMPTS)},
+        connect_timeout=connect_timeout,
+        read_timeout=read_timeout,
+        tcp_keepalive=True,
+        max_pool_connections=MAX_POOL_CONNECTIONS,
+    )
+
+
+def _boto3_factory(kind, service_name):
+    import boto3
+
+    config = client_config(service_name)
+    if kind == 'resource':
+        built = boto3.resource(service_name, config=config)
+        _count_calls(built.meta.client, service_name)
+    else:
+        built = boto3.client(service_name, config=config)
+        _count_calls(built, service_name)
+    return built
+
+
+def _record(service_name, **counts):
+    with _stats_lock:
+        service_stats = _stats.setdefault(service_name, {'Calls': 0, 'Retries': 0, 'Throttles': 0})
+        for name, value in counts.items():
+            service_stats[name] += value
+
+
+def _count_calls(built_client, service_name):
+    def after_call(parsed=None, **kwargs):
+        retries = (parsed or {}).get('ResponseMetadata', {}).get('RetryAttempts', 0)
+        _record(service_name, Calls=1, Retries=retries)
+
+    def after_call_error(exception=None, **kwargs):
+        # Connection-level failures after all retries; counted as a call
+        _record(service_name, Calls=1)
+
+    def needs_retry(response=None, **kwargs):
+        # Runs for every attempt next to botocore's own retry handler; returns
+        # None so it never changes the retry decision
+        if response and response[1].get('Error', {}).get('Code') in THROTTLE_CODES:
+            _record(service_name, Throttles=1)
+
+    events = built_client.meta.events
+    events.register('after-call', after_call)
+    events.register('after-call-error', after_call_error)
+    events.register('needs-retry', needs_retry)
+
+
+def client_stats(reset=False):
+    """
+    {service: {'Calls': n, 'Retries': n, 'Throttles': n}} since the last reset.
+    """
+    with _stats_lock:
+        snapshot = {service: dict(counts) for service, counts in _stats.items()}
+        if reset:
+            _stats.clear()
+    return snapshot
+
+
+def emit_client_metrics(function_name=None):
+    """
+    Logs this invocation's call/retry/throttle counts in CloudWatch embedded
+    metric format (one line per service) and resets them.
+    """
+    for service, counts in client_stats(reset=True).items():
+        record = {
+            '_aws': {
+                'Timestamp': int(time.time() * 1000),
+                'CloudWatchMetrics': [{
+                    'Namespace': METRICS_NAMESPACE,
+                    'Dimensions': [['FunctionName', 'Service']],
+                    'Metrics': [{'Name': name, 'Unit': 'Count'} for name in counts]
+                }]
+            },
+            'FunctionName': function_name or os.environ.get('AWS_LAMBDA_FUNCTION_NAME', 'local'),
+            'Service': service,
+        }
+        record.update(counts)
+        print(json.dumps(record))
+
+
+def with_client_metrics(handler):
+    """
+    Decorates a Lambda handler so its AWS client metrics are emitted on every return.
+    """
+    @wraps(handler)
+    def wrapper(event, context):
+        try:
+            return handler(event, context)
+        finally:
+            try:
+                emit_client_metrics(getattr(context, 'function_name', None))
+            except Exception as e:
+                logger.warning(f"Failed to emit client metrics: {e}")
+    return wrapper
+
+
+def set_factory(factory):
+    """
+    Replaces how clients are built: factory(kind, service_name) where kind is
+    'client' or 'resource'. Clears the cache. Pass None to restore boto3.
+    """
+    global _factory
+    with _lock:
+        _factory = factory
+        _clients.clear()
+        _resources.clear()
+    _local.__dict__.clear()
+
+
+def _build(kind, service_name):
+    return (_factory or _boto3_factory)(kind, service_name)
+
+
+def client(service_name):
+    cached = _clients.get(service_name)
+    if cached is None:
+        with _lock:
+            cached = _clients.get(service_name)
+            if cached is None:
+                cached = _clients[service_name] = _build('client', service_name)
+    return cached
+
+
+def resource(service_name):
+    cached = _resources.get(service_name)
+    if cached is None:
+        with _lock:
+            cached = _resources.get(service_name)
+            if cached is None:
+                cached = _resources[service_name] = _build('resource', service_name)
+    return cached
+
+
+def thread_resource(service_name):
+    """
+    A resource private to the calling thread (boto3 resources are not thread-safe).
+    Built with the same configuration and metrics as the shared ones.
+    """
+    resources = _local.__dict__.setdefault('resources', {})
+    if service_name not in resources:
+        resources[service_name] = _build('resource', service_name)
+    return resources[service_name]
+
+
+class _Lazy:
+    def __init__(self, getter, service_name):
+        self._getter = getter
+        self._service_name = service_name
+
+    def __getattr__(self, name):
+        return getattr(self._getter(self._service_name), name)
+
+    def __repr__(self):
+        return f"<lazy {self._getter.__name__} {self._service_name}>"
+
+
+def lazy_client(service_name):
+    """
+    Module-level stand-in for boto3.client(service_name), built on first use.
+    """
+    return _Lazy(client, service_name)
+
+
+def lazy_resource(service_name):
+    """
+    Module-level stand-in for boto3.resource(service_name), built on first use.
+    """
+    return _Lazy(resource, service_name)
+
+
+def error_code(error):
+    """
+    The AWS error code of a botocore ClientError, or None for any other exception.
+    Lets handlers branch on error codes without importing botocore up front.
+    """
+    response = getattr(error, 'response', None)
+    if not isinstance(response, dict):
+        return None
+    return response.get('Error', {}).get('Code')
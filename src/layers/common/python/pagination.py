@@ -0,0 +1,50 @@
+"""
+Cursor pagination helpers for the HTTP listing endpoints.
+
+A cursor is DynamoDB's LastEvaluatedKey as URL-safe base64 JSON. Our table
+and index keys are all strings, so the round trip through JSON is exact.
+"""
+import base64
+import binascii
+import json
+
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(last_evaluated_key):
+    if not last_evaluated_key:
+        return None
+    raw = json.dumps(last_evaluated_key, separators=(',', ':'), sort_keys=True)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, key_names):
+    """
+    ExclusiveStartKey for a cursor from encode_cursor, or None for no cursor.
+    Raises InvalidCursor unless it decodes to exactly the expected key attributes.
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        key = json.loads(raw)
+    except (binascii.Error, ValueError) as e:
+        raise InvalidCursor(f"Malformed cursor: {e}")
+    if not isinstance(key, dict) or set(key) != set(key_names) or not all(isinstance(v, str) for v in key.values()):
+        raise InvalidCursor("Cursor does not belong to this listing")
+    return key
+
+
+def page_size(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """
+    The requested page size clamped to 1..maximum; default when missing or not a number.
+    """
+    try:
+        return max(1, min(int(value), maximum))
+    except (TypeError, ValueError):
+        return default
@@ -0,0 +1,14 @@
+"""
+Which action the healer falls back to, or rolls back with, for a given action.
+
+Shared so the cost estimator prices the same fallback the healer would run.
+"""
+
+# What to try when the primary action failed, and how to undo one that didn't verify
+FALLBACK_ACTIONS = {'RESTART_SERVICE': 'REBOOT_INSTANCE'}
+DEFAULT_FALLBACK_ACTION = 'SCALE_UP'
+ROLLBACK_ACTIONS = {'SCALE_UP': 'SCALE_DOWN'}
+
+
+def fallback_for(action):
+    return FALLBACK_ACTIONS.get(action, DEFAULT_FALLBACK_ACTION)
@@ -0,0 +1,44 @@
+"""
+Queues Slack messages for the slack_delivery Lambda instead of posting them inline.
+
+The consumer owns rate limiting, Retry-After handling, retries and per-incident
+coalescing, so producers just enqueue and return.
+"""
+import json
+import logging
+import os
+import time
+
+import aws_clients
+
+logger = logging.getLogger()
+
+SLACK_OUTBOX_QUEUE_URL = os.environ.get('SLACK_OUTBOX_QUEUE_URL')
+
+# Approval requests are sent before plain notifications when a batch is coalesced
+KIND_APPROVAL = 'approval'
+KIND_NOTIFICATION = 'notification'
+
+
+def enqueue(message, incident_id=None, kind=KIND_NOTIFICATION, webhook='default'):
+    """
+    Queues one Slack message (a webhook payload with 'blocks' and optionally
+    'attachments'). Raises if the queue rejects it, so callers can decide
+    whether a lost message should fail their step.
+    """
+    if not SLACK_OUTBOX_QUEUE_URL:
+        raise RuntimeError("SLACK_OUTBOX_QUEUE_URL is not configured")
+
+    body = {
+        'incident_id': incident_id,
+        'kind': kind,
+        'webhook': webhook,
+        'enqueued_at': time.time(),
+        'message': message
+    }
+    response = aws_clients.client('sqs').send_message(
+        QueueUrl=SLACK_OUTBOX_QUEUE_URL,
+        MessageBody=json.dumps(body, default=str)
+    )
+    logger.info(f"Queued Slack {kind} for incident {incident_id}: {response.get('MessageId')}")
+    return response.get('MessageId')
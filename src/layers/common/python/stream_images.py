@@ -0,0 +1,34 @@
+"""
+Converts DynamoDB's typed attribute values ({'S': ...}, {'N': ...}, ...) to
+plain JSON, as they arrive in stream records and in error responses that the
+resource layer leaves undecoded.
+
+No AWS imports, so local tools can use it as well.
+"""
+
+
+def deserialize(value):
+    """
+    Converts one typed attribute value to plain JSON.
+    """
+    (kind, inner), = value.items()
+    if kind == 'N':
+        number = float(inner)
+        return int(number) if number.is_integer() else number
+    if kind == 'NULL':
+        return None
+    if kind == 'M':
+        return {k: deserialize(v) for k, v in inner.items()}
+    if kind == 'L':
+        return [deserialize(v) for v in inner]
+    if kind in ('SS', 'BS', 'NS'):
+        return [deserialize({kind[0]: v}) for v in inner]
+    # S, B and BOOL are already plain
+    return inner
+
+
+def deserialize_image(image):
+    """
+    Converts a whole item image (attribute name -> typed value).
+    """
+    return {k: deserialize(v) for k, v in (image or {}).items()}
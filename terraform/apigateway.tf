@@ -3,10 +3,11 @@ resource "aws_apigatewayv2_api" "approval_api" {
   protocol_type = "HTTP"
   
   cors_configuration {
-    allow_origins = ["*"]
-    allow_methods = ["GET", "POST", "OPTIONS"]
-    allow_headers = ["Content-Type", "Authorization"]
-    max_age       = 300
+    allow_origins  = ["*"]
+    allow_methods  = ["GET", "POST", "OPTIONS"]
+    allow_headers  = ["Content-Type", "Authorization", "If-None-Match"]
+    expose_headers = ["ETag"]
+    max_age        = 300
   }
 }
 
@@ -48,6 +49,14 @@ resource "aws_apigatewayv2_route" "frontend_approval_decision" {
   authorizer_id      = aws_apigatewayv2_authorizer.cognito_auth.id
 }
 
+resource "aws_apigatewayv2_route" "frontend_approvals_list" {
+  api_id    = aws_apigatewayv2_api.approval_api.id
+  route_key = "GET /approvals"
+  target    = "integrations/${aws_apigatewayv2_integration.frontend_approval_integration.id}"
+  authorization_type = "JWT"
+  authorizer_id      = aws_apigatewayv2_authorizer.cognito_auth.id
+}
+
 resource "aws_apigatewayv2_integration" "slack_action_integration" {
   api_id           = aws_apigatewayv2_api.approval_api.id
   integration_type = "AWS_PROXY"
@@ -78,4 +87,41 @@ resource "aws_lambda_permission" "allow_apigateway_frontend" {
   source_arn    = "${aws_apigatewayv2_api.approval_api.execution_arn}/*/*/approval/*"
 }
 
+resource "aws_lambda_permission" "allow_apigateway_frontend_list" {
+  statement_id  = "AllowExecutionFromAPIGatewayFrontendList"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.frontend_approval_handler.function_name
+  principal     = "apigateway.amazonaws.com"
+  source_arn    = "${aws_apigatewayv2_api.approval_api.execution_arn}/*/*/approvals"
+}
+
+resource "aws_apigatewayv2_integration" "incident_history_integration" {
+  api_id           = aws_apigatewayv2_api.approval_api.id
+  integration_type = "AWS_PROXY"
+  integration_uri  = aws_lambda_function.incident_history.invoke_arn
+  payload_format_version = "2.0"
+}
+
+resource "aws_apigatewayv2_route" "incident_history_list" {
+  api_id    = aws_apigatewayv2_api.approval_api.id
+  route_key = "GET /incidents"
+  target    = "integrations/${aws_apigatewayv2_integration.incident_history_integration.id}"
+  authorization_type = "JWT"
+  authorizer_id      = aws_apigatewayv2_authorizer.cognito_auth.id
+}
+
+resource "aws_apigatewayv2_route" "incident_history_stats" {
+  api_id    = aws_apigatewayv2_api.approval_api.id
+  route_key = "GET /incidents/stats"
+  target    = "integrations/${aws_apigatewayv2_integration.incident_history_integration.id}"
+  authorization_type = "JWT"
+  authorizer_id      = aws_apigatewayv2_authorizer.cognito_auth.id
+}
 
+resource "aws_lambda_permission" "allow_apigateway_incident_history" {
+  statement_id  = "AllowExecutionFromAPIGatewayIncidentHistory"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.incident_history.function_name
+  principal     = "apigateway.amazonaws.com"
+  source_arn    = "${aws_apigatewayv2_api.approval_api.execution_arn}/*/*/incidents*"
+}
@@ -23,3 +23,14 @@ resource "aws_dynamodb_table" "audit_log" {
     Compliance  = "ImmutableLedger"
   }
 }
+
+# Compacts the audit stream into gzip JSONL files on S3 for reporting
+resource "aws_lambda_event_source_mapping" "audit_compactor_stream" {
+  event_source_arn                   = aws_dynamodb_table.audit_log.stream_arn
+  function_name                      = aws_lambda_function.audit_compactor.arn
+  starting_position                  = "TRIM_HORIZON"
+  batch_size                         = 1000
+  maximum_batching_window_in_seconds = 60
+  maximum_retry_attempts             = 10
+  function_response_types            = ["ReportBatchItemFailures"]
+}
@@ -14,6 +14,42 @@ resource "aws_dynamodb_table" "incidents" {
     type = "S"
   }
 
+  attribute {
+    name = "alarm_name"
+    type = "S"
+  }
+
+  attribute {
+    name = "status"
+    type = "S"
+  }
+
+  attribute {
+    name = "created_at"
+    type = "S"
+  }
+
+  # Incident history (GET /incidents); both project only the history columns
+  global_secondary_index {
+    name               = "alarm_name-created_at-index"
+    hash_key           = "alarm_name"
+    range_key          = "created_at"
+    projection_type    = "INCLUDE"
+    non_key_attributes = ["status", "reason", "healing_status", "time_to_recovery_seconds", "occurrence_count"]
+  }
+
+  global_secondary_index {
+    name               = "status-created_at-index"
+    hash_key           = "status"
+    range_key          = "created_at"
+    projection_type    = "INCLUDE"
+    non_key_attributes = ["alarm_name", "reason", "healing_status", "time_to_recovery_seconds", "occurrence_count"]
+  }
+
+  # Feeds live dashboard updates (live_updates.tf)
+  stream_enabled   = true
+  stream_view_type = "NEW_IMAGE"
+
   tags = {
     Project = var.project_name
   }
@@ -28,12 +64,133 @@ resource "aws_dynamodb_table" "approvals" {
     name = "approval_id"
     type = "S"
   }
+
+  attribute {
+    name = "status"
+    type = "S"
+  }
+
+  attribute {
+    name = "created_at"
+    type = "S"
+  }
+
+  # Approval queue listing (GET /approvals); only the columns the listing returns
+  global_secondary_index {
+    name               = "status-created_at-index"
+    hash_key           = "status"
+    range_key          = "created_at"
+    projection_type    = "INCLUDE"
+    non_key_attributes = ["incident_id", "expires_at", "approved_by", "approved_at", "risk_assessment"]
+  }
   
   ttl {
     attribute_name = "expires_at"
     enabled        = true
   }
 
+  # Feeds live dashboard updates (live_updates.tf)
+  stream_enabled   = true
+  stream_view_type = "NEW_IMAGE"
+
+  tags = {
+    Project = var.project_name
+  }
+}
+
+# Per-alarm MTTR counters, maintained by the analyzer when it verifies a recovery
+resource "aws_dynamodb_table" "alarm_stats" {
+  name         = "${var.project_name}-alarm-stats"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "alarm_name"
+
+  attribute {
+    name = "alarm_name"
+    type = "S"
+  }
+
+  tags = {
+    Project = var.project_name
+  }
+}
+
+resource "aws_dynamodb_table" "alarm_fingerprints" {
+  name           = "${var.project_name}-alarm-fingerprints"
+  billing_mode   = "PAY_PER_REQUEST"
+  hash_key       = "fingerprint"
+
+  attribute {
+    name = "fingerprint"
+    type = "S"
+  }
+
+  ttl {
+    attribute_name = "expires_at"
+    enabled        = true
+  }
+
+  tags = {
+    Project = var.project_name
+  }
+}
+
+resource "aws_dynamodb_table" "analysis_cache" {
+  name           = "${var.project_name}-analysis-cache"
+  billing_mode   = "PAY_PER_REQUEST"
+  hash_key       = "cache_key"
+
+  attribute {
+    name = "cache_key"
+    type = "S"
+  }
+
+  ttl {
+    attribute_name = "expires_at"
+    enabled        = true
+  }
+
+  tags = {
+    Project = var.project_name
+  }
+}
+
+# Step Functions task tokens parked while an SSM automation runs
+resource "aws_dynamodb_table" "automation_tasks" {
+  name           = "${var.project_name}-automation-tasks"
+  billing_mode   = "PAY_PER_REQUEST"
+  hash_key       = "execution_id"
+
+  attribute {
+    name = "execution_id"
+    type = "S"
+  }
+
+  ttl {
+    attribute_name = "expires_at"
+    enabled        = true
+  }
+
+  tags = {
+    Project = var.project_name
+  }
+}
+
+# One active remediation per target resource (plus waiter markers for queued requests)
+resource "aws_dynamodb_table" "healing_leases" {
+  name           = "${var.project_name}-healing-leases"
+  billing_mode   = "PAY_PER_REQUEST"
+  hash_key       = "resource_key"
+
+  attribute {
+    name = "resource_key"
+    type = "S"
+  }
+
+  ttl {
+    attribute_name = "expires_at"
+    enabled        = true
+  }
+
   tags = {
     Project = var.project_name
   }
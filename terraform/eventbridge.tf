@@ -15,14 +15,39 @@ resource "aws_cloudwatch_event_rule" "alarm_trigger" {
 
 resource "aws_cloudwatch_event_target" "detector_target" {
   rule      = aws_cloudwatch_event_rule.alarm_trigger.name
-  target_id = "DetectorLambda"
-  arn       = aws_lambda_function.detector.arn
+  target_id = "AlarmIngestQueue"
+  arn       = aws_sqs_queue.alarm_ingest.arn
 }
 
-resource "aws_lambda_permission" "allow_eventbridge" {
+# SSM automations started by the healer report completion here instead of being polled
+resource "aws_cloudwatch_event_rule" "automation_status" {
+  name        = "${var.project_name}-automation-status"
+  description = "Resume the incident workflow when a healing automation finishes"
+
+  event_pattern = jsonencode({
+    source      = ["aws.ssm"]
+    detail-type = ["EC2 Automation Execution Status-change Notification"]
+    detail = {
+      Definition = [
+        aws_ssm_document.restart_service.name,
+        aws_ssm_document.scale_up.name,
+        "AWS-RestartEC2Instance"
+      ]
+      Status = ["Success", "CompletedWithSuccess", "Failed", "CompletedWithFailure", "TimedOut", "Cancelled", "Rejected"]
+    }
+  })
+}
+
+resource "aws_cloudwatch_event_target" "automation_completion_target" {
+  rule      = aws_cloudwatch_event_rule.automation_status.name
+  target_id = "AutomationCompletionHandler"
+  arn       = aws_lambda_function.automation_completion_handler.arn
+}
+
+resource "aws_lambda_permission" "allow_eventbridge_automation_completion" {
   statement_id  = "AllowExecutionFromEventBridge"
   action        = "lambda:InvokeFunction"
-  function_name = aws_lambda_function.detector.function_name
+  function_name = aws_lambda_function.automation_completion_handler.function_name
   principal     = "events.amazonaws.com"
-  source_arn    = aws_cloudwatch_event_rule.alarm_trigger.arn
+  source_arn    = aws_cloudwatch_event_rule.automation_status.arn
 }
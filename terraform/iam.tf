@@ -43,6 +43,32 @@ resource "aws_iam_role_policy" "detector_policy" {
         Effect   = "Allow"
         Resource = aws_dynamodb_table.incidents.arn
       },
+      {
+        Action = [
+          "dynamodb:GetItem",
+          "dynamodb:PutItem",
+          "dynamodb:UpdateItem",
+          "dynamodb:DeleteItem"
+        ]
+        Effect   = "Allow"
+        Resource = aws_dynamodb_table.alarm_fingerprints.arn
+      },
+      {
+        Action = [
+          "dynamodb:BatchWriteItem"
+        ]
+        Effect   = "Allow"
+        Resource = aws_dynamodb_table.incidents.arn
+      },
+      {
+        Action = [
+          "sqs:ReceiveMessage",
+          "sqs:DeleteMessage",
+          "sqs:GetQueueAttributes"
+        ]
+        Effect   = "Allow"
+        Resource = aws_sqs_queue.alarm_ingest.arn
+      },
       {
         Action = [
           "dynamodb:PutItem"
@@ -87,7 +113,11 @@ resource "aws_iam_role_policy" "analyzer_policy" {
         Action = [
           "logs:FilterLogEvents",
           "logs:GetLogEvents",
-          "cloudwatch:GetMetricData"
+          "logs:StartQuery",
+          "logs:GetQueryResults",
+          "logs:StopQuery",
+          "cloudwatch:GetMetricData",
+          "cloudwatch:DescribeAlarms"
         ]
         Effect   = "Allow"
         Resource = "*"
@@ -110,6 +140,14 @@ resource "aws_iam_role_policy" "analyzer_policy" {
           "${aws_s3_bucket.knowledge_base.arn}/*"
         ]
       },
+      {
+        # Lets a missing runbook come back as 404 (cacheable) instead of 403
+        Action = [
+          "s3:ListBucket"
+        ]
+        Effect   = "Allow"
+        Resource = aws_s3_bucket.knowledge_base.arn
+      },
       {
         Action = [
           "dynamodb:UpdateItem"
@@ -117,6 +155,23 @@ resource "aws_iam_role_policy" "analyzer_policy" {
         Effect   = "Allow"
         Resource = aws_dynamodb_table.incidents.arn
       },
+      {
+        # MTTR counters, bumped in the same transaction as the incident update
+        Action = [
+          "dynamodb:UpdateItem"
+        ]
+        Effect   = "Allow"
+        Resource = aws_dynamodb_table.alarm_stats.arn
+      },
+      {
+        Action = [
+          "dynamodb:GetItem",
+          "dynamodb:PutItem",
+          "dynamodb:UpdateItem"
+        ]
+        Effect   = "Allow"
+        Resource = aws_dynamodb_table.analysis_cache.arn
+      },
       {
         Action = [
           "dynamodb:PutItem"
@@ -180,7 +235,11 @@ resource "aws_iam_role_policy" "healer_policy" {
       {
         Action = [
           "ecs:UpdateService",
-          "ec2:RebootInstances"
+          "ecs:ListServices",
+          "ec2:RebootInstances",
+          "ec2:StopInstances",
+          "ec2:StartInstances",
+          "ec2:DescribeInstances"
         ]
         Effect   = "Allow"
         Resource = "*"
@@ -194,11 +253,37 @@ resource "aws_iam_role_policy" "healer_policy" {
       },
       {
         Action = [
-          "dynamodb:PutItem"
+          "dynamodb:PutItem",
+          "dynamodb:BatchWriteItem"
         ]
         Effect   = "Allow"
         Resource = aws_dynamodb_table.audit_log.arn
       },
+      {
+        Action = [
+          "dynamodb:PutItem",
+          "dynamodb:UpdateItem"
+        ]
+        Effect   = "Allow"
+        Resource = aws_dynamodb_table.automation_tasks.arn
+      },
+      {
+        Action = [
+          "dynamodb:UpdateItem",
+          "dynamodb:PutItem",
+          "dynamodb:DeleteItem"
+        ]
+        Effect   = "Allow"
+        Resource = aws_dynamodb_table.healing_leases.arn
+      },
+      {
+        Action = [
+          "states:SendTaskSuccess",
+          "states:SendTaskFailure"
+        ]
+        Effect   = "Allow"
+        Resource = "*" # Scope to SF ARN
+      },
       {
         Action = [
           "logs:CreateLogGroup",
@@ -232,6 +317,13 @@ resource "aws_iam_role_policy" "notifier_policy" {
         Effect   = "Allow"
         Resource = aws_dynamodb_table.incidents.arn
       },
+      {
+        Action = [
+          "sqs:SendMessage"
+        ]
+        Effect   = "Allow"
+        Resource = aws_sqs_queue.slack_outbox.arn
+      },
       {
         Action = [
           "logs:CreateLogGroup",
@@ -288,6 +380,13 @@ resource "aws_iam_role_policy" "send_approval_request_policy" {
         Effect   = "Allow"
         Resource = aws_dynamodb_table.approvals.arn
       },
+      {
+        Action = [
+          "sqs:SendMessage"
+        ]
+        Effect   = "Allow"
+        Resource = aws_sqs_queue.slack_outbox.arn
+      },
       {
         Action = [
           "logs:CreateLogGroup",
@@ -316,7 +415,6 @@ resource "aws_iam_role_policy" "slack_action_handler_policy" {
     Statement = [
       {
         Action = [
-          "dynamodb:GetItem",
           "dynamodb:UpdateItem"
         ]
         Effect   = "Allow"
@@ -330,6 +428,14 @@ resource "aws_iam_role_policy" "slack_action_handler_policy" {
         Effect   = "Allow"
         Resource = "*"
       },
+      {
+        # Resumes the workflow in an async invocation of itself, after acking Slack
+        Action = [
+          "lambda:InvokeFunction"
+        ]
+        Effect   = "Allow"
+        Resource = aws_lambda_function.slack_action_handler.arn
+      },
       {
         Action = [
           "logs:CreateLogGroup",
@@ -364,6 +470,13 @@ resource "aws_iam_role_policy" "frontend_approval_handler_policy" {
         Effect   = "Allow"
         Resource = aws_dynamodb_table.approvals.arn
       },
+      {
+        Action = [
+          "dynamodb:Query"
+        ]
+        Effect   = "Allow"
+        Resource = "${aws_dynamodb_table.approvals.arn}/index/status-created_at-index"
+      },
       {
         Action = [
           "dynamodb:GetItem",
@@ -374,7 +487,8 @@ resource "aws_iam_role_policy" "frontend_approval_handler_policy" {
       },
       {
         Action = [
-          "dynamodb:PutItem"
+          "dynamodb:PutItem",
+          "dynamodb:BatchWriteItem"
         ]
         Effect   = "Allow"
         Resource = aws_dynamodb_table.audit_log.arn
@@ -458,3 +572,259 @@ resource "aws_iam_role_policy" "approval_handler_policy" {
     ]
   })
 }
+
+# --- Automation Completion Handler Role ---
+resource "aws_iam_role" "automation_completion_handler_role" {
+  name               = "${var.project_name}-automation-completion-handler-role"
+  assume_role_policy = data.aws_iam_policy_document.lambda_assume_role.json
+}
+
+resource "aws_iam_role_policy" "automation_completion_handler_policy" {
+  name = "automation-completion-handler-policy"
+  role = aws_iam_role.automation_completion_handler_role.id
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Action = [
+          "dynamodb:UpdateItem"
+        ]
+        Effect   = "Allow"
+        Resource = [
+          aws_dynamodb_table.automation_tasks.arn,
+          aws_dynamodb_table.incidents.arn
+        ]
+      },
+      {
+        Action = [
+          "dynamodb:DeleteItem"
+        ]
+        Effect   = "Allow"
+        Resource = aws_dynamodb_table.healing_leases.arn
+      },
+      {
+        Action = [
+          "dynamodb:PutItem",
+          "dynamodb:BatchWriteItem"
+        ]
+        Effect   = "Allow"
+        Resource = aws_dynamodb_table.audit_log.arn
+      },
+      {
+        Effect = "Allow"
+        Action = [
+          "states:SendTaskSuccess",
+          "states:SendTaskFailure"
+        ]
+        Resource = "*" # Scope to SF ARN
+      },
+      {
+        Effect = "Allow"
+        Action = [
+          "logs:CreateLogGroup",
+          "logs:CreateLogStream",
+          "logs:PutLogEvents"
+        ]
+        Resource = "arn:aws:logs:*:*:*"
+      }
+    ]
+  })
+}
+
+# --- Audit Compactor Role ---
+resource "aws_iam_role" "audit_compactor_role" {
+  name               = "${var.project_name}-audit-compactor-role"
+  assume_role_policy = data.aws_iam_policy_document.lambda_assume_role.json
+}
+
+resource "aws_iam_role_policy" "audit_compactor_policy" {
+  name = "audit-compactor-policy"
+  role = aws_iam_role.audit_compactor_role.id
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Action = [
+          "dynamodb:GetRecords",
+          "dynamodb:GetShardIterator",
+          "dynamodb:DescribeStream",
+          "dynamodb:ListStreams"
+        ]
+        Effect   = "Allow"
+        Resource = aws_dynamodb_table.audit_log.stream_arn
+      },
+      {
+        Action = [
+          "s3:PutObject",
+          "s3:DeleteObject"
+        ]
+        Effect   = "Allow"
+        Resource = "${aws_s3_bucket.incident_logs.arn}/audit/*"
+      },
+      {
+        Effect = "Allow"
+        Action = [
+          "logs:CreateLogGroup",
+          "logs:CreateLogStream",
+          "logs:PutLogEvents"
+        ]
+        Resource = "arn:aws:logs:*:*:*"
+      }
+    ]
+  })
+}
+
+# --- Live Updates Role ---
+resource "aws_iam_role" "live_updates_role" {
+  name               = "${var.project_name}-live-updates-role"
+  assume_role_policy = data.aws_iam_policy_document.lambda_assume_role.json
+}
+
+resource "aws_iam_role_policy" "live_updates_policy" {
+  name = "live-updates-policy"
+  role = aws_iam_role.live_updates_role.id
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Action = [
+          "dynamodb:GetRecords",
+          "dynamodb:GetShardIterator",
+          "dynamodb:DescribeStream",
+          "dynamodb:ListStreams"
+        ]
+        Effect = "Allow"
+        Resource = [
+          aws_dynamodb_table.incidents.stream_arn,
+          aws_dynamodb_table.approvals.stream_arn
+        ]
+      },
+      {
+        Action = [
+          "dynamodb:GetItem"
+        ]
+        Effect   = "Allow"
+        Resource = aws_dynamodb_table.approvals.arn
+      },
+      {
+        Action = [
+          "dynamodb:Query",
+          "dynamodb:PutItem",
+          "dynamodb:DeleteItem",
+          "dynamodb:BatchWriteItem"
+        ]
+        Effect = "Allow"
+        Resource = [
+          aws_dynamodb_table.live_connections.arn,
+          "${aws_dynamodb_table.live_connections.arn}/index/*"
+        ]
+      },
+      {
+        Action = [
+          "execute-api:ManageConnections"
+        ]
+        Effect   = "Allow"
+        Resource = "${aws_apigatewayv2_api.live_updates.execution_arn}/*/POST/@connections/*"
+      },
+      {
+        Effect = "Allow"
+        Action = [
+          "logs:CreateLogGroup",
+          "logs:CreateLogStream",
+          "logs:PutLogEvents"
+        ]
+        Resource = "arn:aws:logs:*:*:*"
+      }
+    ]
+  })
+}
+
+# --- Incident History Role ---
+resource "aws_iam_role" "incident_history_role" {
+  name               = "${var.project_name}-incident-history-role"
+  assume_role_policy = data.aws_iam_policy_document.lambda_assume_role.json
+}
+
+resource "aws_iam_role_policy" "incident_history_policy" {
+  name = "incident-history-policy"
+  role = aws_iam_role.incident_history_role.id
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Action = [
+          "dynamodb:Query"
+        ]
+        Effect = "Allow"
+        Resource = [
+          "${aws_dynamodb_table.incidents.arn}/index/alarm_name-created_at-index",
+          "${aws_dynamodb_table.incidents.arn}/index/status-created_at-index"
+        ]
+      },
+      {
+        Action = [
+          "dynamodb:GetItem",
+          "dynamodb:Scan"
+        ]
+        Effect   = "Allow"
+        Resource = aws_dynamodb_table.alarm_stats.arn
+      },
+      {
+        Effect = "Allow"
+        Action = [
+          "logs:CreateLogGroup",
+          "logs:CreateLogStream",
+          "logs:PutLogEvents"
+        ]
+        Resource = "arn:aws:logs:*:*:*"
+      }
+    ]
+  })
+}
+
+# --- Slack Delivery Role ---
+resource "aws_iam_role" "slack_delivery_role" {
+  name               = "${var.project_name}-slack-delivery-role"
+  assume_role_policy = data.aws_iam_policy_document.lambda_assume_role.json
+}
+
+resource "aws_iam_role_policy" "slack_delivery_policy" {
+  name = "slack-delivery-policy"
+  role = aws_iam_role.slack_delivery_role.id
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Action = [
+          "sqs:ReceiveMessage",
+          "sqs:DeleteMessage",
+          "sqs:GetQueueAttributes",
+          "sqs:ChangeMessageVisibility"
+        ]
+        Effect   = "Allow"
+        Resource = aws_sqs_queue.slack_outbox.arn
+      },
+      {
+        Action = [
+          "sqs:SendMessage"
+        ]
+        Effect   = "Allow"
+        Resource = aws_sqs_queue.slack_outbox_dlq.arn
+      },
+      {
+        Effect = "Allow"
+        Action = [
+          "logs:CreateLogGroup",
+          "logs:CreateLogStream",
+          "logs:PutLogEvents"
+        ]
+        Resource = "arn:aws:logs:*:*:*"
+      }
+    ]
+  })
+}
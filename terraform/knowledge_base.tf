@@ -18,3 +18,11 @@ resource "aws_s3_object" "runbook_high_cpu" {
   etag   = filemd5("${path.module}/../src/knowledge_base/runbooks/HighCPU.md")
   content_type = "text/markdown"
 }
+
+resource "aws_s3_object" "signature_rules" {
+  bucket = aws_s3_bucket.knowledge_base.id
+  key    = "signatures/rules.json"
+  source = "${path.module}/../src/knowledge_base/signatures/rules.json"
+  etag   = filemd5("${path.module}/../src/knowledge_base/signatures/rules.json")
+  content_type = "application/json"
+}
@@ -1,3 +1,17 @@
+# Shared code for every Lambda (lazily built AWS clients)
+data "archive_file" "common_layer_zip" {
+  type        = "zip"
+  source_dir  = "${path.module}/../src/layers/common"
+  output_path = "${path.module}/common_layer.zip"
+}
+
+resource "aws_lambda_layer_version" "common" {
+  filename            = data.archive_file.common_layer_zip.output_path
+  layer_name          = "${var.project_name}-common"
+  source_code_hash    = data.archive_file.common_layer_zip.output_base64sha256
+  compatible_runtimes = ["python3.9"]
+}
+
 # Detector Lambda
 data "archive_file" "detector_zip" {
   type        = "zip"
@@ -12,6 +26,7 @@ resource "aws_lambda_function" "detector" {
   handler          = "handler.handler"
   source_code_hash = data.archive_file.detector_zip.output_base64sha256
   runtime          = "python3.9"
+  layers           = [aws_lambda_layer_version.common.arn]
   timeout          = 30
 
   environment {
@@ -19,6 +34,9 @@ resource "aws_lambda_function" "detector" {
       TABLE_NAME = aws_dynamodb_table.incidents.name
       STATE_MACHINE_ARN = aws_sfn_state_machine.incident_workflow.arn
       AUDIT_TABLE_NAME = aws_dynamodb_table.audit_log.name
+      FINGERPRINT_TABLE_NAME = aws_dynamodb_table.alarm_fingerprints.name
+      SUPPRESSION_WINDOW_SECONDS = var.alarm_suppression_window_seconds
+      MAX_WORKERS = 8
     }
   }
 }
@@ -37,7 +55,8 @@ resource "aws_lambda_function" "analyzer" {
   handler          = "handler.handler"
   source_code_hash = data.archive_file.analyzer_zip.output_base64sha256
   runtime          = "python3.9"
-  timeout          = 60
+  layers           = [aws_lambda_layer_version.common.arn]
+  timeout          = 300
 
   environment {
     variables = {
@@ -45,6 +64,12 @@ resource "aws_lambda_function" "analyzer" {
       LOGS_BUCKET = aws_s3_bucket.incident_logs.id
       KNOWLEDGE_BASE_BUCKET = aws_s3_bucket.knowledge_base.id
       AUDIT_TABLE_NAME = aws_dynamodb_table.audit_log.name
+      ANALYSIS_CACHE_TABLE_NAME = aws_dynamodb_table.analysis_cache.name
+      ANALYSIS_CACHE_TTL_SECONDS = var.analysis_cache_ttl_seconds
+      ANALYSIS_CACHE_CONFIDENCE_FLOOR = var.analysis_cache_confidence_floor
+      VERIFY_HEALTHY_DATAPOINTS = var.verify_healthy_datapoints
+      VERIFY_MAX_SECONDS = var.verify_max_seconds
+      ALARM_STATS_TABLE_NAME = aws_dynamodb_table.alarm_stats.name
     }
   }
 }
@@ -63,6 +88,7 @@ resource "aws_lambda_function" "healer" {
   handler          = "handler.handler"
   source_code_hash = data.archive_file.healer_zip.output_base64sha256
   runtime          = "python3.9"
+  layers           = [aws_lambda_layer_version.common.arn]
   timeout          = 300
 
   environment {
@@ -72,6 +98,9 @@ resource "aws_lambda_function" "healer" {
       SSM_DOC_SCALE_UP = aws_ssm_document.scale_up.name
       AUDIT_TABLE_NAME = aws_dynamodb_table.audit_log.name
       HEALER_ROLE_ARN  = aws_iam_role.healer_role.arn
+      AUTOMATION_TASKS_TABLE_NAME = aws_dynamodb_table.automation_tasks.name
+      LEASE_TABLE_NAME = aws_dynamodb_table.healing_leases.name
+      LEASE_TTL_SECONDS = var.healing_lease_ttl_seconds
     }
   }
 }
@@ -90,12 +119,13 @@ resource "aws_lambda_function" "notifier" {
   handler          = "handler.handler"
   source_code_hash = data.archive_file.notifier_zip.output_base64sha256
   runtime          = "python3.9"
+  layers           = [aws_lambda_layer_version.common.arn]
   timeout          = 30
 
   environment {
     variables = {
       TABLE_NAME = aws_dynamodb_table.incidents.name
-      SLACK_WEBHOOK_URL = var.slack_webhook_url
+      SLACK_OUTBOX_QUEUE_URL = aws_sqs_queue.slack_outbox.url
     }
   }
 }
@@ -103,7 +133,7 @@ resource "aws_lambda_function" "notifier" {
 # Cost Estimator Lambda
 data "archive_file" "cost_estimator_zip" {
   type        = "zip"
-  source_file = "${path.module}/../src/lambdas/cost_estimator/handler.py"
+  source_dir  = "${path.module}/../src/lambdas/cost_estimator"
   output_path = "${path.module}/cost_estimator.zip"
 }
 
@@ -113,12 +143,16 @@ resource "aws_lambda_function" "cost_estimator" {
   role             = aws_iam_role.cost_estimator_role.arn
   handler          = "handler.handler"
   runtime          = "python3.9"
+  layers           = [aws_lambda_layer_version.common.arn]
   source_code_hash = data.archive_file.cost_estimator_zip.output_base64sha256
   timeout          = 10
 
   environment {
     variables = {
-      LOG_LEVEL = "INFO"
+      LOG_LEVEL             = "INFO"
+      DEFAULT_INSTANCE_TYPE = var.default_instance_type
+      SCALE_UP_HOURS        = "720"
+      SCALE_UP_ALTERNATIVES = "2,4"
     }
   }
 }
@@ -136,15 +170,16 @@ resource "aws_lambda_function" "send_approval_request" {
   role             = aws_iam_role.send_approval_request_role.arn
   handler          = "handler.handler"
   runtime          = "python3.9"
+  layers           = [aws_lambda_layer_version.common.arn]
   source_code_hash = data.archive_file.send_approval_request_zip.output_base64sha256
   timeout          = 10
 
   environment {
     variables = {
-      INCIDENTS_TABLE_NAME = aws_dynamodb_table.incidents.name
-      APPROVALS_TABLE_NAME = aws_dynamodb_table.approvals.name
-      SLACK_WEBHOOK_URL    = var.slack_webhook_url
-      LOG_LEVEL            = "INFO"
+      INCIDENTS_TABLE_NAME   = aws_dynamodb_table.incidents.name
+      APPROVALS_TABLE_NAME   = aws_dynamodb_table.approvals.name
+      SLACK_OUTBOX_QUEUE_URL = aws_sqs_queue.slack_outbox.url
+      LOG_LEVEL              = "INFO"
     }
   }
 }
@@ -162,6 +197,7 @@ resource "aws_lambda_function" "slack_action_handler" {
   role             = aws_iam_role.slack_action_handler_role.arn
   handler          = "handler.handler"
   runtime          = "python3.9"
+  layers           = [aws_lambda_layer_version.common.arn]
   source_code_hash = data.archive_file.slack_action_handler_zip.output_base64sha256
   timeout          = 10
 
@@ -173,6 +209,13 @@ resource "aws_lambda_function" "slack_action_handler" {
   }
 }
 
+# Async resume jobs the handler sends itself: retried on Step Functions errors, then dropped
+resource "aws_lambda_function_event_invoke_config" "slack_action_handler" {
+  function_name                = aws_lambda_function.slack_action_handler.function_name
+  maximum_retry_attempts       = 2
+  maximum_event_age_in_seconds = 900
+}
+
 # Frontend Approval Handler Lambda
 data "archive_file" "frontend_approval_handler_zip" {
   type        = "zip"
@@ -186,6 +229,7 @@ resource "aws_lambda_function" "frontend_approval_handler" {
   role             = aws_iam_role.frontend_approval_handler_role.arn
   handler          = "handler.handler"
   runtime          = "python3.9"
+  layers           = [aws_lambda_layer_version.common.arn]
   source_code_hash = data.archive_file.frontend_approval_handler_zip.output_base64sha256
   timeout          = 10
 
@@ -194,6 +238,136 @@ resource "aws_lambda_function" "frontend_approval_handler" {
       APPROVALS_TABLE_NAME = aws_dynamodb_table.approvals.name
       INCIDENTS_TABLE_NAME = aws_dynamodb_table.incidents.name
       AUDIT_TABLE_NAME = aws_dynamodb_table.audit_log.name
+      VIEW_CACHE_SECONDS = "2"
+    }
+  }
+}
+
+# Automation Completion Handler Lambda
+data "archive_file" "automation_completion_handler_zip" {
+  type        = "zip"
+  source_file = "${path.module}/../src/lambdas/automation_completion_handler/handler.py"
+  output_path = "${path.module}/automation_completion_handler.zip"
+}
+
+resource "aws_lambda_function" "automation_completion_handler" {
+  filename         = data.archive_file.automation_completion_handler_zip.output_path
+  function_name    = "${var.project_name}-automation-completion-handler"
+  role             = aws_iam_role.automation_completion_handler_role.arn
+  handler          = "handler.handler"
+  source_code_hash = data.archive_file.automation_completion_handler_zip.output_base64sha256
+  runtime          = "python3.9"
+  layers           = [aws_lambda_layer_version.common.arn]
+  timeout          = 30
+
+  environment {
+    variables = {
+      TABLE_NAME                  = aws_dynamodb_table.incidents.name
+      AUTOMATION_TASKS_TABLE_NAME = aws_dynamodb_table.automation_tasks.name
+      AUDIT_TABLE_NAME            = aws_dynamodb_table.audit_log.name
+      LEASE_TABLE_NAME            = aws_dynamodb_table.healing_leases.name
+    }
+  }
+}
+
+# Audit Compactor Lambda
+data "archive_file" "audit_compactor_zip" {
+  type        = "zip"
+  source_file = "${path.module}/../src/lambdas/audit_compactor/handler.py"
+  output_path = "${path.module}/audit_compactor.zip"
+}
+
+resource "aws_lambda_function" "audit_compactor" {
+  filename         = data.archive_file.audit_compactor_zip.output_path
+  function_name    = "${var.project_name}-audit-compactor"
+  role             = aws_iam_role.audit_compactor_role.arn
+  handler          = "handler.handler"
+  source_code_hash = data.archive_file.audit_compactor_zip.output_base64sha256
+  runtime          = "python3.9"
+  layers           = [aws_lambda_layer_version.common.arn]
+  timeout          = 60
+
+  environment {
+    variables = {
+      LOGS_BUCKET = aws_s3_bucket.incident_logs.id
+    }
+  }
+}
+
+# Live Updates Lambda (WebSocket routes and incidents/approvals stream fan-out)
+data "archive_file" "live_updates_zip" {
+  type        = "zip"
+  source_dir  = "${path.module}/../src/lambdas/live_updates"
+  output_path = "${path.module}/live_updates.zip"
+}
+
+resource "aws_lambda_function" "live_updates" {
+  filename         = data.archive_file.live_updates_zip.output_path
+  function_name    = "${var.project_name}-live-updates"
+  role             = aws_iam_role.live_updates_role.arn
+  handler          = "handler.handler"
+  source_code_hash = data.archive_file.live_updates_zip.output_base64sha256
+  runtime          = "python3.9"
+  layers           = [aws_lambda_layer_version.common.arn]
+  timeout          = 30
+
+  environment {
+    variables = {
+      CONNECTIONS_TABLE_NAME = aws_dynamodb_table.live_connections.name
+      APPROVALS_TABLE_NAME   = aws_dynamodb_table.approvals.name
+      WEBSOCKET_ENDPOINT     = "https://${aws_apigatewayv2_api.live_updates.id}.execute-api.${var.aws_region}.amazonaws.com/${aws_apigatewayv2_stage.live_updates.name}"
+    }
+  }
+}
+
+# Incident History Lambda
+data "archive_file" "incident_history_zip" {
+  type        = "zip"
+  source_dir  = "${path.module}/../src/lambdas/incident_history"
+  output_path = "${path.module}/incident_history.zip"
+}
+
+resource "aws_lambda_function" "incident_history" {
+  filename         = data.archive_file.incident_history_zip.output_path
+  function_name    = "${var.project_name}-incident-history"
+  role             = aws_iam_role.incident_history_role.arn
+  handler          = "handler.handler"
+  source_code_hash = data.archive_file.incident_history_zip.output_base64sha256
+  runtime          = "python3.9"
+  layers           = [aws_lambda_layer_version.common.arn]
+  timeout          = 10
+
+  environment {
+    variables = {
+      TABLE_NAME             = aws_dynamodb_table.incidents.name
+      ALARM_STATS_TABLE_NAME = aws_dynamodb_table.alarm_stats.name
+    }
+  }
+}
+
+# Slack Delivery Lambda (drains the Slack outbox queue)
+data "archive_file" "slack_delivery_zip" {
+  type        = "zip"
+  source_dir  = "${path.module}/../src/lambdas/slack_delivery"
+  output_path = "${path.module}/slack_delivery.zip"
+}
+
+resource "aws_lambda_function" "slack_delivery" {
+  filename         = data.archive_file.slack_delivery_zip.output_path
+  function_name    = "${var.project_name}-slack-delivery"
+  role             = aws_iam_role.slack_delivery_role.arn
+  handler          = "handler.handler"
+  source_code_hash = data.archive_file.slack_delivery_zip.output_base64sha256
+  runtime          = "python3.9"
+  layers           = [aws_lambda_layer_version.common.arn]
+  timeout          = 60
+
+  environment {
+    variables = {
+      SLACK_WEBHOOK_URL      = var.slack_webhook_url
+      SLACK_OUTBOX_QUEUE_URL = aws_sqs_queue.slack_outbox.url
+      SLACK_OUTBOX_DLQ_URL   = aws_sqs_queue.slack_outbox_dlq.url
+      SLACK_RATE_PER_SECOND  = var.slack_rate_per_second
     }
   }
 }
@@ -0,0 +1,119 @@
+# Live dashboard updates: the dashboard holds a WebSocket open and the
+# incidents/approvals streams push changes to it, instead of polling
+# GET /approval/{id} every 3 seconds.
+
+# One item per (connection, topic); topics are approval#<id> and incident#<id>
+resource "aws_dynamodb_table" "live_connections" {
+  name         = "${var.project_name}-live-connections"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "connection_id"
+  range_key    = "topic"
+
+  attribute {
+    name = "connection_id"
+    type = "S"
+  }
+
+  attribute {
+    name = "topic"
+    type = "S"
+  }
+
+  global_secondary_index {
+    name            = "topic-index"
+    hash_key        = "topic"
+    range_key       = "connection_id"
+    projection_type = "KEYS_ONLY"
+  }
+
+  ttl {
+    attribute_name = "expires_at"
+    enabled        = true
+  }
+
+  tags = {
+    Project = var.project_name
+  }
+}
+
+resource "aws_apigatewayv2_api" "live_updates" {
+  name                       = "${var.project_name}-live-updates"
+  protocol_type              = "WEBSOCKET"
+  route_selection_expression = "$request.body.action"
+}
+
+resource "aws_apigatewayv2_integration" "live_updates" {
+  api_id           = aws_apigatewayv2_api.live_updates.id
+  integration_type = "AWS_PROXY"
+  integration_uri  = aws_lambda_function.live_updates.invoke_arn
+}
+
+resource "aws_apigatewayv2_route" "live_updates_connect" {
+  api_id    = aws_apigatewayv2_api.live_updates.id
+  route_key = "$connect"
+  target    = "integrations/${aws_apigatewayv2_integration.live_updates.id}"
+}
+
+resource "aws_apigatewayv2_route" "live_updates_disconnect" {
+  api_id    = aws_apigatewayv2_api.live_updates.id
+  route_key = "$disconnect"
+  target    = "integrations/${aws_apigatewayv2_integration.live_updates.id}"
+}
+
+resource "aws_apigatewayv2_route" "live_updates_default" {
+  api_id    = aws_apigatewayv2_api.live_updates.id
+  route_key = "$default"
+  target    = "integrations/${aws_apigatewayv2_integration.live_updates.id}"
+}
+
+resource "aws_apigatewayv2_stage" "live_updates" {
+  api_id      = aws_apigatewayv2_api.live_updates.id
+  name        = "live"
+  auto_deploy = true
+}
+
+resource "aws_lambda_permission" "allow_apigateway_live_updates" {
+  statement_id  = "AllowExecutionFromAPIGatewayLiveUpdates"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.live_updates.function_name
+  principal     = "apigateway.amazonaws.com"
+  source_arn    = "${aws_apigatewayv2_api.live_updates.execution_arn}/*/*"
+}
+
+# No batching window: updates should reach dashboards within a second.
+# TTL deletes on approvals are filtered out before they invoke anything.
+resource "aws_lambda_event_source_mapping" "live_updates_incidents" {
+  event_source_arn                   = aws_dynamodb_table.incidents.stream_arn
+  function_name                      = aws_lambda_function.live_updates.arn
+  starting_position                  = "LATEST"
+  batch_size                         = 100
+  maximum_batching_window_in_seconds = 0
+  maximum_retry_attempts             = 2
+  maximum_record_age_in_seconds      = 60
+
+  filter_criteria {
+    filter {
+      pattern = jsonencode({ eventName = ["INSERT", "MODIFY"] })
+    }
+  }
+}
+
+resource "aws_lambda_event_source_mapping" "live_updates_approvals" {
+  event_source_arn                   = aws_dynamodb_table.approvals.stream_arn
+  function_name                      = aws_lambda_function.live_updates.arn
+  starting_position                  = "LATEST"
+  batch_size                         = 100
+  maximum_batching_window_in_seconds = 0
+  maximum_retry_attempts             = 2
+  maximum_record_age_in_seconds      = 60
+
+  filter_criteria {
+    filter {
+      pattern = jsonencode({ eventName = ["INSERT", "MODIFY"] })
+    }
+  }
+}
+
+output "live_updates_url" {
+  value = aws_apigatewayv2_stage.live_updates.invoke_url
+}
@@ -23,3 +23,25 @@ resource "aws_s3_bucket_server_side_encryption_configuration" "incident_logs" {
     }
   }
 }
+
+resource "aws_s3_bucket_lifecycle_configuration" "incident_logs" {
+  bucket = aws_s3_bucket.incident_logs.id
+
+  # Log snapshots only live for the duration of one workflow run
+  rule {
+    id     = "expire-log-snapshots"
+    status = "Enabled"
+
+    filter {
+      prefix = "snapshots/"
+    }
+
+    expiration {
+      days = 1
+    }
+
+    noncurrent_version_expiration {
+      noncurrent_days = 1
+    }
+  }
+}
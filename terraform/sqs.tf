@@ -0,0 +1,90 @@
+# Alarm ingestion queue: EventBridge buffers alarm events here so the detector
+# receives them in batches instead of one invocation per alarm.
+resource "aws_sqs_queue" "alarm_ingest_dlq" {
+  name                      = "${var.project_name}-alarm-ingest-dlq"
+  message_retention_seconds = 1209600
+
+  tags = {
+    Project = var.project_name
+  }
+}
+
+resource "aws_sqs_queue" "alarm_ingest" {
+  name                       = "${var.project_name}-alarm-ingest"
+  visibility_timeout_seconds = 180 # 6x the detector timeout
+
+  redrive_policy = jsonencode({
+    deadLetterTargetArn = aws_sqs_queue.alarm_ingest_dlq.arn
+    maxReceiveCount     = 5
+  })
+
+  tags = {
+    Project = var.project_name
+  }
+}
+
+resource "aws_sqs_queue_policy" "alarm_ingest" {
+  queue_url = aws_sqs_queue.alarm_ingest.id
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect    = "Allow"
+        Principal = { Service = "events.amazonaws.com" }
+        Action    = "sqs:SendMessage"
+        Resource  = aws_sqs_queue.alarm_ingest.arn
+        Condition = {
+          ArnEquals = { "aws:SourceArn" = aws_cloudwatch_event_rule.alarm_trigger.arn }
+        }
+      }
+    ]
+  })
+}
+
+resource "aws_lambda_event_source_mapping" "detector_alarm_ingest" {
+  event_source_arn                   = aws_sqs_queue.alarm_ingest.arn
+  function_name                      = aws_lambda_function.detector.arn
+  batch_size                         = 50
+  maximum_batching_window_in_seconds = 2
+  function_response_types            = ["ReportBatchItemFailures"]
+}
+
+# Slack outbox: notifier and send_approval_request queue messages here and
+# slack_delivery posts them at a rate Slack accepts, coalescing per incident.
+resource "aws_sqs_queue" "slack_outbox_dlq" {
+  name                      = "${var.project_name}-slack-outbox-dlq"
+  message_retention_seconds = 1209600
+
+  tags = {
+    Project = var.project_name
+  }
+}
+
+resource "aws_sqs_queue" "slack_outbox" {
+  name                       = "${var.project_name}-slack-outbox"
+  visibility_timeout_seconds = 360 # 6x the slack_delivery timeout
+
+  redrive_policy = jsonencode({
+    deadLetterTargetArn = aws_sqs_queue.slack_outbox_dlq.arn
+    # Throttled messages come back here on purpose, so allow plenty of receives
+    maxReceiveCount = 20
+  })
+
+  tags = {
+    Project = var.project_name
+  }
+}
+
+resource "aws_lambda_event_source_mapping" "slack_delivery_outbox" {
+  event_source_arn                   = aws_sqs_queue.slack_outbox.arn
+  function_name                      = aws_lambda_function.slack_delivery.arn
+  batch_size                         = 100
+  maximum_batching_window_in_seconds = var.slack_coalesce_window_seconds
+  function_response_types            = ["ReportBatchItemFailures"]
+
+  # Bounds the total send rate: each consumer has its own token bucket
+  scaling_config {
+    maximum_concurrency = var.slack_delivery_concurrency
+  }
+}
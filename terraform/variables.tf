@@ -21,3 +21,75 @@ variable "slack_signing_secret" {
   default     = "" # Optional for demo
   sensitive   = true
 }
+
+variable "alarm_suppression_window_seconds" {
+  description = "Window during which repeat alarms are coalesced into the open incident"
+  type        = number
+  default     = 900
+}
+
+variable "analysis_cache_ttl_seconds" {
+  description = "How long a memoized Bedrock analysis can be reused"
+  type        = number
+  default     = 86400
+}
+
+variable "analysis_cache_confidence_floor" {
+  description = "Minimum model confidence for an analysis to be memoized"
+  type        = number
+  default     = 0.8
+}
+
+variable "use_combined_analysis" {
+  description = "Use the workflow variant that runs root cause and predictive analysis in one Bedrock call"
+  type        = bool
+  default     = false
+}
+
+variable "verify_healthy_datapoints" {
+  description = "Consecutive healthy alarm datapoints required before healing counts as verified"
+  type        = number
+  default     = 3
+}
+
+variable "verify_max_seconds" {
+  description = "Longest the analyzer will poll the alarm metric while verifying healing"
+  type        = number
+  default     = 240
+}
+
+variable "healing_timeout_seconds" {
+  description = "How long the workflow waits for a healing automation to report completion"
+  type        = number
+  default     = 3600
+}
+
+variable "healing_lease_ttl_seconds" {
+  description = "How long a healing lease on a resource lasts if it is never released"
+  type        = number
+  default     = 900
+}
+
+variable "slack_rate_per_second" {
+  description = "Slack posts per second per delivery consumer; total is this times slack_delivery_concurrency"
+  type        = number
+  default     = 0.5
+}
+
+variable "slack_delivery_concurrency" {
+  description = "Most slack_delivery consumers running at once (minimum 2)"
+  type        = number
+  default     = 2
+}
+
+variable "slack_coalesce_window_seconds" {
+  description = "How long the outbox batches messages, so updates for one incident go out as one Slack message"
+  type        = number
+  default     = 5
+}
+
+variable "default_instance_type" {
+  description = "Instance type the cost estimator prices a SCALE_UP at when the event does not name one"
+  type        = string
+  default     = "m5.large"
+}
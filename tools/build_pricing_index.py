@@ -0,0 +1,147 @@
+"""
+Builds the cost estimator's pricing index from AWS Price List bulk offer files.
+
+Run offline whenever prices should be refreshed; the Lambda never sees the raw
+offer JSON. Download the offer files first, e.g.
+
+    curl -O https://pricing.us-east-1.amazonaws.com/offers/v1.0/aws/AmazonEC2/current/us-east-1/index.json
+
+then
+
+    python3 tools/build_pricing_index.py index.json [more offer files ...]
+
+which writes src/lambdas/cost_estimator/pricing.idx (see pricing_index.py for
+the format). Only on-demand hourly prices of instance-type products are kept:
+EC2 instances with no pre-installed software, no licence bundled and used
+capacity, plus node types of services such as ElastiCache and RDS.
+
+Offer files can be gigabytes; if the optional ijson package is installed they
+are streamed, otherwise loaded with json (needs a few times the file size in
+memory). tools/fixtures/pricing_offer_sample.json is a small offer file in the
+same format for tests and local runs.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT, 'src', 'lambdas', 'cost_estimator'))
+
+from pricing_index import PricingIndex, make_key, write_index  # noqa: E402
+
+DEFAULT_OUTPUT = os.path.join(ROOT, 'src', 'lambdas', 'cost_estimator', 'pricing.idx')
+
+
+def iter_section(path, section):
+    """
+    Yields (key, value) pairs of a top-level object ('products' or 'terms.OnDemand').
+    """
+    try:
+        import ijson
+    except ImportError:
+        ijson = None
+
+    if ijson:
+        with open(path, 'rb') as f:
+            yield from ijson.kvitems(f, section, use_float=True)
+        return
+
+    with open(path) as f:
+        document = json.load(f)
+    value = document
+    for part in section.split('.'):
+        value = value.get(part, {})
+    yield from value.items()
+
+
+def wanted(attributes):
+    if not attributes.get('instanceType') or not attributes.get('regionCode'):
+        return False
+    # EC2 lists the same instance several times; keep the plain on-demand one
+    if attributes.get('capacitystatus', 'Used') != 'Used':
+        return False
+    if attributes.get('preInstalledSw', 'NA') != 'NA':
+        return False
+    if attributes.get('licenseModel', 'No License required') not in ('No License required', 'License included'):
+        return False
+    return True
+
+
+def product_key(attributes):
+    return make_key(
+        attributes['servicecode'],
+        attributes['regionCode'],
+        attributes['instanceType'],
+        attributes.get('operatingSystem') or attributes.get('databaseEngine') or attributes.get('cacheEngine') or '',
+        attributes.get('tenancy') or ''
+    )
+
+
+def hourly_usd(term):
+    for dimension in term.get('priceDimensions', {}).values():
+        if dimension.get('unit') in ('Hrs', 'Hours') and 'USD' in dimension.get('pricePerUnit', {}):
+            return float(dimension['pricePerUnit']['USD'])
+    return None
+
+
+def read_offer(path, prices, stats):
+    skus = {}
+    for sku, product in iter_section(path, 'products'):
+        attributes = product.get('attributes', {})
+        if wanted(attributes):
+            skus[sku] = product_key(attributes)
+        else:
+            stats['skipped_products'] += 1
+
+    for sku, terms in iter_section(path, 'terms.OnDemand'):
+        key = skus.get(sku)
+        if not key:
+            continue
+        for term in terms.values():
+            price = hourly_usd(term)
+            if price is None:
+                continue
+            # Some products carry several on-demand rates; the highest is the safe estimate
+            prices[key] = max(price, prices.get(key, 0.0))
+            break
+
+    with open(path, 'rb') as f:
+        head = f.read(4096).decode('utf-8', errors='ignore')
+    for field in ('offerCode', 'version', 'publicationDate'):
+        marker = f'"{field}"'
+        if marker in head:
+            value = head.split(marker, 1)[1].split('"')[1]
+            stats['sources'].setdefault(os.path.basename(path), {})[field] = value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('offers', nargs='+', help='Price List bulk offer files (index.json)')
+    parser.add_argument('-o', '--output', default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    prices = {}
+    stats = {'skipped_products': 0, 'sources': {}}
+    for path in args.offers:
+        started = time.perf_counter()
+        before = len(prices)
+        read_offer(path, prices, stats)
+        print(f"{path}: {len(prices) - before} prices in {time.perf_counter() - started:.1f}s")
+
+    metadata = {
+        'built_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'entries': len(prices),
+        'sources': stats['sources'],
+    }
+    write_index(prices, args.output, metadata)
+
+    index = PricingIndex(args.output)
+    size = os.path.getsize(args.output)
+    print(f"Wrote {args.output}: {index.entry_count} prices, {index.slot_count} slots, {size} bytes")
+    index.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Local fake Slack incoming webhook, stdlib only.
+
+Accepts POSTs like hooks.slack.com does, and rate limits them: beyond
+--rate posts per second (with a --burst allowance) it answers 429 with a
+Retry-After header, as Slack does. --error-rate makes a fraction of posts
+fail with 500. GET /stats returns what it has seen; POST /reset clears it.
+
+    python3 tools/fake_slack_webhook.py --port 8766 --rate 1 --burst 3
+
+Then point SLACK_WEBHOOK_URL at http://127.0.0.1:8766/services/fake.
+benchmarks/slack_delivery_bench.py runs it in-process for throughput tests.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeSlack:
+    def __init__(self, rate=1.0, burst=3, retry_after=1, error_rate=0.0):
+        self.rate = rate
+        self.burst = burst
+        self.retry_after = retry_after
+        self.error_rate = error_rate
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.tokens = self.burst
+            self.updated = time.monotonic()
+            self.stats = {'accepted': 0, 'throttled': 0, 'errors': 0, 'blocks': 0}
+            self.messages = []
+
+    def receive(self, payload):
+        """
+        Returns (status, headers) for one post.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                self.stats['throttled'] += 1
+                return 429, {'Retry-After': str(self.retry_after)}
+            self.tokens -= 1
+            if random.random() < self.error_rate:
+                self.stats['errors'] += 1
+                return 500, {}
+            self.stats['accepted'] += 1
+            self.stats['blocks'] += len(payload.get('blocks', []))
+            self.messages.append(payload)
+            return 200, {}
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.stats)
+
+
+def make_handler(fake):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _reply(self, status, body, headers=None):
+            data = body.encode('utf-8')
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header('Content-Type', 'text/plain')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == '/stats':
+                return self._reply(200, json.dumps(fake.snapshot()))
+            self._reply(404, 'not_found')
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            if self.path == '/reset':
+                fake.reset()
+                return self._reply(200, 'ok')
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                return self._reply(400, 'invalid_payload')
+            status, headers = fake.receive(payload)
+            self._reply(status, {200: 'ok', 429: 'rate_limited'}.get(status, 'internal_error'), headers)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def serve(fake, host='127.0.0.1', port=0):
+    """
+    Starts the fake in a background thread; returns (server, base_url).
+    """
+    server = ThreadingHTTPServer((host, port), make_handler(fake))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--rate', type=float, default=1.0, help='posts per second before 429s')
+    parser.add_argument('--burst', type=int, default=3)
+    parser.add_argument('--retry-after', type=int, default=1)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    fake = FakeSlack(args.rate, args.burst, args.retry_after, args.error_rate)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(fake))
+    print(f"Fake Slack webhook on http://{args.host}:{args.port}/services/fake (GET /stats)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
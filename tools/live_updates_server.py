@@ -0,0 +1,222 @@
+"""
+Local stand-in for the live updates WebSocket API, stdlib only.
+
+Speaks the same protocol as the deployed API Gateway stage and builds its
+messages with the Lambda's own messages.py, so the dashboard can be tested
+without AWS:
+
+    python3 tools/live_updates_server.py --port 8765
+
+  - ws://127.0.0.1:8765/?approvalId=<id>  dashboard connection (set CONFIG.WS_URL to ws://127.0.0.1:8765)
+  - GET  /approval/<id>                   merged view, with ETag / If-None-Match like the real endpoint (set CONFIG.API_URL)
+  - POST /stream                          a DynamoDB stream event ({"Records": [...]}); its updates are pushed to subscribers
+
+Example, marking an incident healed:
+
+    curl -X POST localhost:8765/stream -d '{"Records": [{"eventName": "MODIFY", "dynamodb": {"NewImage":
+      {"incident_id": {"S": "inc-1"}, "healing_status": {"S": "SUCCESS"}}}}]}'
+"""
+import argparse
+import base64
+import hashlib
+import json
+import os
+import socket
+import struct
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path[:0] = [os.path.join(os.path.dirname(__file__), '..', 'src', 'lambdas', 'live_updates'),
+                os.path.join(os.path.dirname(__file__), '..', 'src', 'layers', 'common', 'python')]
+from messages import approval_topic, incident_topic, messages_for_records  # noqa: E402
+
+WEBSOCKET_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC11B06'
+
+
+class Hub:
+    """
+    In-memory connection registry and approval views, standing in for the
+    connections table and the incidents/approvals tables.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = {}  # topic -> set of sockets
+        self.views = {}          # approval_id -> merged view
+        self.incidents = {}      # incident_id -> approval_id
+
+    def subscribe(self, sock, approval_id):
+        with self.lock:
+            topics = [approval_topic(approval_id)]
+            incident_id = self.views.get(approval_id, {}).get('incident_id')
+            if incident_id:
+                topics.append(incident_topic(incident_id))
+            for topic in topics:
+                self.subscriptions.setdefault(topic, set()).add(sock)
+
+    def unsubscribe(self, sock):
+        with self.lock:
+            for sockets in self.subscriptions.values():
+                sockets.discard(sock)
+
+    def apply(self, message):
+        """
+        Folds an update into the stored views; returns the sockets to push it to.
+        """
+        topic, fields = message['topic'], message['fields']
+        with self.lock:
+            if topic.startswith('approval#'):
+                approval_id = topic.split('#', 1)[1]
+                self.views.setdefault(approval_id, {'approval_id': approval_id}).update(fields)
+                incident_id = fields.get('incident_id')
+                if incident_id:
+                    self.incidents[incident_id] = approval_id
+                    # Like $connect does, subscribe the approval's viewers to its incident
+                    viewers = self.subscriptions.get(topic, set())
+                    self.subscriptions.setdefault(incident_topic(incident_id), set()).update(viewers)
+            else:
+                approval_id = self.incidents.get(topic.split('#', 1)[1])
+                if approval_id:
+                    self.views[approval_id].update(fields)
+            return list(self.subscriptions.get(topic, ()))
+
+    def view(self, approval_id):
+        with self.lock:
+            view = self.views.get(approval_id)
+            return dict(view) if view else None
+
+
+def send_text(sock, text):
+    payload = text.encode('utf-8')
+    if len(payload) < 126:
+        header = struct.pack('!BB', 0x81, len(payload))
+    elif len(payload) < 65536:
+        header = struct.pack('!BBH', 0x81, 126, len(payload))
+    else:
+        header = struct.pack('!BBQ', 0x81, 127, len(payload))
+    sock.sendall(header + payload)
+
+
+def read_frame(rfile):
+    """
+    Returns (opcode, payload) for one client frame, or (None, None) on EOF.
+    """
+    head = rfile.read(2)
+    if len(head) < 2:
+        return None, None
+    opcode = head[0] & 0x0F
+    length = head[1] & 0x7F
+    if length == 126:
+        length, = struct.unpack('!H', rfile.read(2))
+    elif length == 127:
+        length, = struct.unpack('!Q', rfile.read(8))
+    mask = rfile.read(4) if head[1] & 0x80 else b'\x00' * 4
+    data = rfile.read(length)
+    return opcode, bytes(b ^ mask[i % 4] for i, b in enumerate(data))
+
+
+class Handler(BaseHTTPRequestHandler):
+    # Browsers refuse a WebSocket upgrade answered over HTTP/1.0
+    protocol_version = 'HTTP/1.1'
+    hub = None
+
+    def _send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode('utf-8') if body is not None else b''
+        self.send_response(status)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Expose-Headers', 'ETag')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if data:
+            self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_OPTIONS(self):
+        self.send_response(204)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization, If-None-Match')
+        self.end_headers()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if self.headers.get('Upgrade', '').lower() == 'websocket':
+            return self._websocket(parse_qs(url.query).get('approvalId', [None])[0])
+
+        if url.path.startswith('/approval/'):
+            view = self.hub.view(url.path.split('/')[2])
+            if not view:
+                return self._send_json(404, {'error': 'Not found'})
+            body = json.dumps(view, sort_keys=True)
+            etag = '"' + hashlib.sha256(body.encode('utf-8')).hexdigest()[:32] + '"'
+            if etag in (self.headers.get('If-None-Match') or ''):
+                return self._send_json(304, None, {'ETag': etag})
+            return self._send_json(200, view, {'ETag': etag})
+        self._send_json(404, {'error': 'Not found'})
+
+    def do_POST(self):
+        if urlparse(self.path).path != '/stream':
+            return self._send_json(404, {'error': 'Not found'})
+        event = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        pushed = 0
+        for message in messages_for_records(event.get('Records', [])):
+            text = json.dumps(message, default=str)
+            for sock in self.hub.apply(message):
+                try:
+                    send_text(sock, text)
+                    pushed += 1
+                except OSError:
+                    self.hub.unsubscribe(sock)
+        self._send_json(200, {'pushed': pushed})
+
+    def _websocket(self, approval_id):
+        if not approval_id:
+            return self._send_json(400, {'error': 'Missing approvalId'})
+        accept = base64.b64encode(
+            hashlib.sha1((self.headers['Sec-WebSocket-Key'] + WEBSOCKET_GUID).encode()).digest()
+        ).decode()
+        self.send_response(101, 'Switching Protocols')
+        self.send_header('Upgrade', 'websocket')
+        self.send_header('Connection', 'Upgrade')
+        self.send_header('Sec-WebSocket-Accept', accept)
+        self.end_headers()
+
+        sock = self.connection
+        self.hub.subscribe(sock, approval_id)
+        self.log_message("subscribed to approval %s", approval_id)
+        try:
+            while True:
+                opcode, payload = read_frame(self.rfile)
+                if opcode is None or opcode == 0x8:
+                    break
+                if opcode == 0x9:
+                    sock.sendall(struct.pack('!BB', 0x8A, len(payload)) + payload)
+                # Text frames are keep-alive pings from the dashboard; nothing to do
+        except (OSError, socket.timeout):
+            pass
+        finally:
+            self.hub.unsubscribe(sock)
+            self.close_connection = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    Handler.hub = Hub()
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    print(f"Live updates stand-in on ws://{args.host}:{args.port} (POST /stream to push)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()